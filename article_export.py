@@ -0,0 +1,92 @@
+"""
+Streaming article export shared by both database backends.
+
+Rows are written one by one as they come from the database cursor (named
+server-side cursor on PostgreSQL, fetchmany() on SQLite), so memory stays
+constant no matter how many articles are exported. Output is JSON Lines
+(one article per line) or a JSON array streamed element by element; a
+filename ending in .gz (or compress=True) gzips the output on the fly.
+read_sentiment_results() reads the analyzer's answer (JSONL, one result
+per article) for mark_articles_as_analyzed().
+"""
+
+import gzip
+import json
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def export_format_for(filename, fmt=None):
+    """Returns 'jsonl' or 'json' (explicit fmt, else from the file extension)"""
+    if fmt:
+        if fmt not in ('json', 'jsonl'):
+            raise ValueError(f"Unknown export format: {fmt}")
+        return fmt
+
+    name = filename[:-3] if filename.endswith('.gz') else filename
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson')) else 'json'
+
+
+def select_columns(requested, available):
+    """Validates a column projection against the table columns; returns the column list for SELECT"""
+    if not requested:
+        return list(available)
+
+    unknown = [column for column in requested if column not in available]
+    if unknown:
+        raise ValueError(f"Unknown article columns: {', '.join(unknown)} (available: {', '.join(available)})")
+    return list(requested)
+
+
+def open_export_file(filename, compress=None):
+    """Opens the output file for text writing, gzipped if compress (default: filename ends with .gz)"""
+    if compress is None:
+        compress = filename.endswith('.gz')
+    if compress:
+        return gzip.open(filename, 'wt', encoding='utf-8')
+    return open(filename, 'w', encoding='utf-8')
+
+
+def write_articles(rows, filename, fmt=None, compress=None):
+    """Streams article dicts to a JSON / JSONL file; returns the number of articles written"""
+    fmt = export_format_for(filename, fmt)
+    count = 0
+
+    with open_export_file(filename, compress) as f:
+        if fmt == 'jsonl':
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=str))
+                f.write('\n')
+                count += 1
+        else:
+            f.write('[')
+            for row in rows:
+                f.write(',\n' if count else '\n')
+                f.write(json.dumps(row, ensure_ascii=False, indent=2, default=str))
+                count += 1
+            f.write('\n]\n' if count else ']\n')
+
+    return count
+
+
+def read_sentiment_results(filename):
+    """Reads {"id": ..., "sentiment_result": ...} lines (.gz allowed); returns {article_id: result}
+
+    Lines without a "sentiment_result" key store the whole object except "id".
+    """
+    opener = gzip.open if filename.endswith('.gz') else open
+    results = {}
+
+    with opener(filename, 'rt', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'id' not in record:
+                raise ValueError(f"{filename}:{line_number}: result without an article id")
+
+            article_id = int(record.pop('id'))
+            results[article_id] = record['sentiment_result'] if 'sentiment_result' in record else record
+
+    return results
@@ -0,0 +1,8 @@
+"""
+Offline benchmarks for the extraction hot path.
+
+generate_fixtures.py builds a fixed corpus of synthetic, CoinDesk-shaped
+article and listing pages in benchmarks/fixtures (committed, so results are
+comparable between runs). run_benchmarks.py times both scraper classes
+over that corpus and saves the results as JSON.
+"""
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Generates the synthetic HTML fixture corpus used by run_benchmarks.py
+Usage: python -m benchmarks.generate_fixtures
+
+The output is deterministic (fixed random seed), so regenerating the
+corpus only changes it when this script changes.
+"""
+
+import json
+import random
+from pathlib import Path
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+WORDS = (
+    "bitcoin ether market traders price rally etf inflows regulators exchange stablecoin "
+    "liquidity volatility futures options funding rate treasury yields analysts investors "
+    "blockchain protocol network token supply demand institutional custody approval filing "
+    "week session gains losses record high support resistance level billion million"
+).split()
+
+BOILERPLATE = [
+    "Sign up for our daily newsletter to get the latest crypto news.",
+    "By signing up, you will receive emails about CoinDesk products and you agree to our terms of use and privacy policy.",
+    "See all newsletters",
+    "Don't miss another story. Subscribe to the Crypto Daybook Americas newsletter today.",
+    "Advertisement",
+    "Read more: Bitcoin ETFs see record inflows",
+]
+
+CATEGORIES = ['markets', 'policy', 'tech', 'business', 'web3']
+
+
+def sentence(rng, min_words=8, max_words=22):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def paragraph(rng, sentences=4):
+    return ' '.join(sentence(rng) for _ in range(sentences))
+
+
+def article_url(rng, day):
+    slug = '-'.join(rng.choice(WORDS) for _ in range(6))
+    return f"/{rng.choice(CATEGORIES)}/2025/06/{day:02d}/{slug}"
+
+
+def head(rng, title, url):
+    return f"""<head>
+<meta charset="utf-8">
+<title>{title} | CoinDesk</title>
+<meta property="og:title" content="{title}">
+<meta property="article:published_time" content="2025-06-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:15:00Z">
+<meta name="author" content="{rng.choice(['Jane Doe', 'John Smith', 'Omkar Godbole'])}">
+<link rel="canonical" href="https://www.coindesk.com{url}">
+<script>window.__NEXT_DATA__ = {{"props": {{"page": "article", "items": [{', '.join(str(i) for i in range(200))}]}}}};</script>
+<style>body {{ font-family: sans-serif; }} .article-content p {{ margin: 0 0 1em; }}</style>
+</head>"""
+
+
+def navigation(rng, links=60):
+    items = []
+    for _ in range(links):
+        items.append(f'<li><a href="{article_url(rng, rng.randint(1, 28))}">{sentence(rng, 4, 9)}</a></li>')
+    items.append('<li><a href="/newsletters/daybook-us">Newsletters</a></li>')
+    items.append('<li><a href="/podcasts/markets-daily">Podcasts</a></li>')
+    return f"<nav><ul>{''.join(items)}</ul></nav>"
+
+
+def footer(rng):
+    return "<footer>" + ''.join(f"<p>{text}</p>" for text in BOILERPLATE) + "</footer>"
+
+
+def main_container_article(rng, paragraphs):
+    """Typical article: everything inside <main> (strategy 1)"""
+    url = article_url(rng, rng.randint(1, 28))
+    title = sentence(rng, 8, 14)[:-1]
+    body = [f"<h1>{title}</h1>", '<p>What to know:</p>']
+    for index in range(paragraphs):
+        body.append(f"<p>{paragraph(rng)}</p>")
+        if index % 4 == 3:
+            body.append(f"<p>{rng.choice(BOILERPLATE)}</p>")
+            body.append(f'<div class="ad"><a href="/price/bitcoin">[BTC $104,000]</a></div>')
+
+    html = f"""<!DOCTYPE html><html lang="en">{head(rng, title, url)}
+<body>{navigation(rng)}
+<main><article><div class="byline">By <a href="/author/jane-doe">Jane Doe</a></div>
+<div class="article-content">{''.join(body)}</div></article></main>
+{footer(rng)}</body></html>"""
+    return url, html
+
+
+def scattered_paragraphs_article(rng, paragraphs):
+    """No main/article container: paragraphs spread over plain divs (strategy 2)"""
+    url = article_url(rng, rng.randint(1, 28))
+    title = sentence(rng, 8, 14)[:-1]
+    blocks = [f"<div class='block-{i}'><p>{paragraph(rng, 2)}</p></div>" for i in range(paragraphs)]
+
+    html = f"""<!DOCTYPE html><html lang="en">{head(rng, title, url)}
+<body>{navigation(rng)}<div class="page"><h1>{title}</h1>{''.join(blocks)}</div>{footer(rng)}</body></html>"""
+    return url, html
+
+
+def div_text_article(rng, blocks):
+    """No <p> tags at all: text sits directly in short divs (strategy 3)"""
+    url = article_url(rng, rng.randint(1, 28))
+    title = sentence(rng, 8, 14)[:-1]
+    divs = [f"<div class='text'>{paragraph(rng, 3)}</div>" for _ in range(blocks)]
+
+    html = f"""<!DOCTYPE html><html lang="en">{head(rng, title, url)}
+<body><h1>{title}</h1>{''.join(divs)}</body></html>"""
+    return url, html
+
+
+def body_fallback_article(rng, lines):
+    """Worst case: one huge div of loose lines and spans, nothing else matches (strategy 4)"""
+    url = article_url(rng, rng.randint(1, 28))
+    title = sentence(rng, 8, 14)[:-1]
+    content = []
+    for index in range(lines):
+        content.append(f"<span>{sentence(rng)}</span><br>\n")
+        if index % 10 == 0:
+            content.append(f"<script>track({index});</script>\n")
+
+    html = f"""<!DOCTYPE html><html lang="en">{head(rng, title, url)}
+<body><header>{title}</header>{navigation(rng, 200)}<div class="wall">{''.join(content)}</div>
+<footer>{' '.join(BOILERPLATE)}</footer></body></html>"""
+    return url, html
+
+
+def latest_news_listing(rng, day):
+    """latest-crypto-news page: 16 <article> cards among site navigation"""
+    cards = []
+    for _ in range(16):
+        url = article_url(rng, day)
+        cards.append(f"""<article class="card"><a href="{url}"><h3>{sentence(rng, 8, 14)[:-1]}</h3></a>
+<p>{sentence(rng)}</p><span class="date">Jun {day}, 2025</span></article>""")
+
+    return f"""<!DOCTYPE html><html lang="en"><head><title>Latest Crypto News | CoinDesk</title></head>
+<body>{navigation(rng, 120)}<main><h1>Latest Crypto News</h1>{''.join(cards)}</main>{footer(rng)}</body></html>"""
+
+
+def main_page(rng):
+    """Home page: hundreds of links, most of them article links"""
+    sections = []
+    for category in CATEGORIES:
+        links = ''.join(
+            f'<a href="{article_url(rng, rng.randint(1, 28))}"><span>{sentence(rng, 6, 12)[:-1]}</span></a>'
+            for _ in range(30)
+        )
+        extra = ''.join([
+            '<a href="/price/bitcoin">BTC</a>', '<a href="#top">Top</a>',
+            '<a href="https://twitter.com/coindesk">Twitter</a>', '<a href="/tag/etf/">ETF</a>',
+        ] * 5)
+        sections.append(f"<section><h2>{category}</h2>{links}{extra}</section>")
+
+    return f"""<!DOCTYPE html><html lang="en"><head><title>CoinDesk</title></head>
+<body>{navigation(rng, 150)}<main>{''.join(sections)}</main>{footer(rng)}</body></html>"""
+
+
+def generate():
+    """Writes all fixtures and the manifest describing them"""
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(20250609)
+    manifest = []
+
+    def add(name, kind, html, url=None, strategy=None):
+        (FIXTURES_DIR / name).write_text(html, encoding='utf-8')
+        manifest.append({'file': name, 'kind': kind, 'url': url, 'strategy': strategy})
+
+    for index, paragraphs in enumerate([8, 16, 40]):
+        url, html = main_container_article(rng, paragraphs)
+        add(f'article_main_{index}.html', 'article', html, 'https://www.coindesk.com' + url, 'main_container')
+
+    for index, paragraphs in enumerate([6, 12]):
+        url, html = scattered_paragraphs_article(rng, paragraphs)
+        add(f'article_paragraphs_{index}.html', 'article', html, 'https://www.coindesk.com' + url, 'all_paragraphs')
+
+    for index, blocks in enumerate([6, 12]):
+        url, html = div_text_article(rng, blocks)
+        add(f'article_divs_{index}.html', 'article', html, 'https://www.coindesk.com' + url, 'div_containers')
+
+    for index, lines in enumerate([400, 1500]):
+        url, html = body_fallback_article(rng, lines)
+        add(f'article_fallback_{index}.html', 'article', html, 'https://www.coindesk.com' + url, 'body_fallback')
+
+    for index, day in enumerate([10, 9]):
+        add(f'listing_latest_{index}.html', 'latest_news', latest_news_listing(rng, day))
+
+    add('listing_main_page.html', 'main_page', main_page(rng))
+
+    with open(FIXTURES_DIR / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"✅ Generated {len(manifest)} fixtures in {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    generate()
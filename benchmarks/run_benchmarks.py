@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Extraction hot-path benchmarks over the committed fixture corpus (no network)
+Usage: python -m benchmarks.run_benchmarks [--repeat 5] [--output results.json]
+
+Reports pages/sec, latency percentiles (overall and per content-extraction
+strategy) and peak Python memory for CoinDeskScraper and
+CoinDeskLatestNewsScraper, and saves everything as JSON.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import requests
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import COINDESK_MAIN_PAGE, SCRAPING_CONFIG
+from rate_limiter import TokenBucketRateLimiter
+from scraper import CoinDeskScraper
+from improved_latest_news_scraper import CoinDeskLatestNewsScraper
+from transport import SyncTransport
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+class FixtureAdapter(requests.adapters.BaseAdapter):
+    """Serves fixture pages to a requests.Session instead of the network"""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+
+        if request.url in self.pages:
+            response.status_code = 200
+            response._content = self.pages[request.url]
+        else:
+            response.status_code = 404
+            response._content = b''
+        return response
+
+    def close(self):
+        pass
+
+
+def load_fixtures():
+    """Returns the manifest entries with each fixture's bytes under 'html'"""
+    with open(FIXTURES_DIR / 'manifest.json', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    for entry in manifest:
+        entry['html'] = (FIXTURES_DIR / entry['file']).read_bytes()
+    return manifest
+
+
+def percentiles(latencies):
+    """Nearest-rank p50/p90/p99/max in milliseconds"""
+    ordered = sorted(latencies)
+
+    def rank(p):
+        index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {'p50': rank(50), 'p90': rank(90), 'p99': rank(99), 'max': round(ordered[-1] * 1000, 3)}
+
+
+def run_case(name, items, call, repeat, prepare=None):
+    """Times call(item) for every item, repeat times; returns the result dict for one case
+
+    items are (label, payload) pairs; prepare(payload) runs untimed before each call.
+    """
+    latencies = []
+    by_label = {}
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        # Warm-up pass (imports, regex compilation, caches)
+        for _, payload in items:
+            call(prepare(payload) if prepare else payload)
+
+        for _ in range(repeat):
+            for label, payload in items:
+                argument = prepare(payload) if prepare else payload
+                start = time.perf_counter()
+                call(argument)
+                elapsed = time.perf_counter() - start
+
+                latencies.append(elapsed)
+                by_label.setdefault(label, []).append(elapsed)
+
+        # Separate pass for memory, tracemalloc slows everything down
+        tracemalloc.start()
+        for _, payload in items:
+            call(prepare(payload) if prepare else payload)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    total_time = sum(latencies)
+    result = {
+        'pages': len(latencies),
+        'pages_per_second': round(len(latencies) / total_time, 1) if total_time else None,
+        'latency_ms': percentiles(latencies),
+        'by_strategy': {label: percentiles(values) for label, values in sorted(by_label.items())},
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+    print(f"⏱️ {name}: {result['pages_per_second']} pages/sec, "
+          f"p50 {result['latency_ms']['p50']} ms, p99 {result['latency_ms']['p99']} ms, "
+          f"peak {result['peak_memory_kb']} KB")
+    for label, stats in result['by_strategy'].items():
+        print(f"      {label}: p50 {stats['p50']} ms, p90 {stats['p90']} ms, p99 {stats['p99']} ms")
+
+    return result
+
+
+def build_scrapers(fixtures):
+    """Creates both scrapers wired to the fixture adapter, without DB or throttling"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        coindesk_scraper = CoinDeskScraper(use_database=False)
+        latest_scraper = CoinDeskLatestNewsScraper(use_database=False)
+
+    pages = {entry['url']: entry['html'] for entry in fixtures if entry['url']}
+    listings = [entry for entry in fixtures if entry['kind'] == 'latest_news']
+    for offset, entry in enumerate(listings):
+        url = latest_scraper.latest_news_url
+        pages[f"{url}?offset={offset * 16}" if offset else url] = entry['html']
+    pages[COINDESK_MAIN_PAGE] = next(entry['html'] for entry in fixtures if entry['kind'] == 'main_page')
+
+    unlimited = TokenBucketRateLimiter(requests_per_second=1e9, burst_size=1e9)
+    for scraper in (coindesk_scraper, latest_scraper):
+        scraper.session.mount('https://', FixtureAdapter(pages))
+        scraper.transport = SyncTransport(scraper.session)
+        scraper.rate_limiter = unlimited
+        scraper.html_cache = None
+
+    return coindesk_scraper, latest_scraper
+
+
+def run_benchmarks(repeat=5):
+    """Runs every case and returns the full results dict"""
+    fixtures = load_fixtures()
+    coindesk_scraper, latest_scraper = build_scrapers(fixtures)
+
+    articles = [(entry['strategy'], entry) for entry in fixtures if entry['kind'] == 'article']
+    listing_offsets = [('latest_news', offset * 16) for offset, entry in
+                       enumerate(e for e in fixtures if e['kind'] == 'latest_news')]
+
+    print(f"📦 Corpus: {len(articles)} article pages, {len(listing_offsets) + 1} listing pages, repeat={repeat}")
+    cases = {}
+    original_engine = SCRAPING_CONFIG['parser_engine']
+
+    try:
+        for engine in ('bs4', 'lxml'):
+            SCRAPING_CONFIG['parser_engine'] = engine
+            cases[f'CoinDeskScraper.extract_article_fields[{engine}]'] = run_case(
+                f'CoinDeskScraper.extract_article_fields[{engine}]', articles,
+                lambda entry: coindesk_scraper.extract_article_fields(entry['html']), repeat
+            )
+    finally:
+        SCRAPING_CONFIG['parser_engine'] = original_engine
+
+    # Content strategies alone: the soup is rebuilt untimed because the fallback strategy mutates it
+    cases['CoinDeskScraper._extract_content_improved'] = run_case(
+        'CoinDeskScraper._extract_content_improved', articles,
+        coindesk_scraper._extract_content_improved, repeat,
+        prepare=lambda entry: BeautifulSoup(entry['html'].decode('utf-8', errors='ignore'), 'html.parser')
+    )
+
+    cases['CoinDeskScraper.get_article_links'] = run_case(
+        'CoinDeskScraper.get_article_links', [('main_page', None)],
+        lambda _: coindesk_scraper.get_article_links(), repeat
+    )
+
+    cases['CoinDeskLatestNewsScraper._scrape_latest_news_page'] = run_case(
+        'CoinDeskLatestNewsScraper._scrape_latest_news_page', listing_offsets,
+        latest_scraper._scrape_latest_news_page, repeat
+    )
+
+    cases['CoinDeskLatestNewsScraper.scrape_single_article'] = run_case(
+        'CoinDeskLatestNewsScraper.scrape_single_article', articles,
+        lambda entry: latest_scraper.scrape_single_article(entry['url']), repeat
+    )
+
+    return {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'fixtures': [entry['file'] for entry in fixtures],
+        'cases': cases,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline extraction benchmarks")
+    parser.add_argument('--repeat', type=int, default=5, help='Timed passes over the corpus (default: 5)')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/benchmark_<time>.json)')
+    args = parser.parse_args()
+
+    results = run_benchmarks(repeat=args.repeat)
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n💾 Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,13 +28,13 @@ def cleanup_analyzed_articles(days_to_keep=7, dry_run=False):
         print(f"   {key}: {value}")
 
     try:
-        with db.get_connection() as conn:
-            with conn.cursor() as cursor:
+        if dry_run:
+            with db.connection() as conn:
+                with conn.cursor() as cursor:
 
-                # Find articles to delete
-                cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+                    # Find articles to delete
+                    cutoff_date = datetime.now() - timedelta(days=days_to_keep)
 
-                if dry_run:
                     print(f"\n🔍 DRY RUN: Articles to delete (analyzed before {days_to_keep} days):")
                     cursor.execute('''
                         SELECT id, title, scraped_at
@@ -53,27 +53,22 @@ def cleanup_analyzed_articles(days_to_keep=7, dry_run=False):
                     else:
                         print("   No articles to delete")
 
-                else:
-                    print(f"\n🗑️ Deleting analyzed articles older than {days_to_keep} days...")
+                    return 0
 
-                    cursor.execute('''
-                        DELETE FROM articles 
-                        WHERE is_analyzed = TRUE 
-                        AND scraped_at < %s
-                    ''', (cutoff_date,))
+        print(f"\n🗑️ Deleting analyzed articles older than {days_to_keep} days...")
 
-                    deleted_count = cursor.rowcount
-                    conn.commit()
+        # Whole expired partitions are dropped, the rest is deleted in short batches
+        deleted_count = db.cleanup_old_analyzed_articles(days_to_keep=days_to_keep)
 
-                    print(f"✅ Deleted {deleted_count} analyzed articles")
+        print(f"✅ Deleted {deleted_count} analyzed articles")
 
-                    # Show statistics after cleanup
-                    print("\n📊 Statistics after cleanup:")
-                    stats_after = db.get_database_stats()
-                    for key, value in stats_after.items():
-                        print(f"   {key}: {value}")
+        # Show statistics after cleanup
+        print("\n📊 Statistics after cleanup:")
+        stats_after = db.get_database_stats()
+        for key, value in stats_after.items():
+            print(f"   {key}: {value}")
 
-                    return deleted_count
+        return deleted_count
 
     except Exception as e:
         print(f"❌ Error during cleanup: {e}")
@@ -88,10 +83,9 @@ def cleanup_all_analyzed_articles(dry_run=False):
     db = PostgreSQLDatabaseManager()
 
     try:
-        with db.get_connection() as conn:
-            with conn.cursor() as cursor:
-
-                if dry_run:
+        if dry_run:
+            with db.connection() as conn:
+                with conn.cursor() as cursor:
                     print("🔍 DRY RUN: All analyzed articles:")
                     cursor.execute('''
                         SELECT id, title, scraped_at
@@ -109,13 +103,13 @@ def cleanup_all_analyzed_articles(dry_run=False):
                     else:
                         print("   No analyzed articles to delete")
 
-                else:
-                    cursor.execute('DELETE FROM articles WHERE is_analyzed = TRUE')
-                    deleted_count = cursor.rowcount
-                    conn.commit()
+                    return 0
+
+        # A cutoff of now: every analyzed article, through the same batched retention
+        deleted_count = db.cleanup_old_analyzed_articles(days_to_keep=0)
 
-                    print(f"✅ Deleted {deleted_count} analyzed articles")
-                    return deleted_count
+        print(f"✅ Deleted {deleted_count} analyzed articles")
+        return deleted_count
 
     except Exception as e:
         print(f"❌ Error during cleanup: {e}")
@@ -130,7 +124,7 @@ def show_cleanup_status():
     db = PostgreSQLDatabaseManager()
 
     try:
-        with db.get_connection() as conn:
+        with db.connection() as conn:
             with conn.cursor() as cursor:
 
                 # General statistics
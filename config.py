@@ -26,9 +26,11 @@ NEWS_URL_PATTERNS = [
     '/news/',  # Общи новини
     '/layer2/',  # Layer 2 технологии
     '/web3/',  # Web3 новини
+    '/daybook',  # Daybook статии
 ]
 
 # Patterns за изключване (избягваме podcast-и, newsletters, etc.)
+# Patterns с '/' в началото съвпадат с цял сегмент от пътя ('/terms' не изключва '/markets/.../terms-of-...')
 EXCLUDE_PATTERNS = [
     '/podcasts/',
     '/newsletters/',
@@ -37,18 +39,101 @@ EXCLUDE_PATTERNS = [
     '/about/',
     '/careers/',
     '/advertise/',
+    '/price/',  # Страници с цени
+    '/author/',  # Профили на автори
+    '/tag/',  # Страници с тагове
+    '/_next/',  # Next.js ресурси
+    '/api/',
+    '/search',
+    '/privacy',
+    '/terms',
+    # Patterns без '/' в началото се проверяват само в началото на href
     '#',  # Anchor links
     'mailto:',  # Email links
     'tel:',  # Phone links
 ]
 
+# Фрази, по които разпознаваме параграфи без съдържание (реклами, абонаменти, навигация)
+BOILERPLATE_PHRASES = [
+    'Sign up', 'Subscribe', 'Newsletter', 'See all newsletters',
+    'Don\'t miss', 'By signing up', 'privacy policy', 'terms of use',
+    'Cookie', 'Advertisement', 'Sponsored', 'Follow us', 'Share this',
+    'Read more', 'Click here', 'Download', 'Watch', 'Listen',
+]
+
+# Допълнителни фрази за по-строгия филтър (навигация в latest news страниците)
+BOILERPLATE_EXTRA_PHRASES = [
+    'Back to menu', 'What to know:', 'See more',
+]
+
 # Настройки за scraping
 SCRAPING_CONFIG = {
     'request_timeout': 15,  # Timeout за HTTP requests (секунди)
-    'delay_between_requests': 2,  # Пауза между заявки (секунди)
     'max_articles_per_session': 30,  # Максимален брой статии за един session
     'max_retries': 3,  # Максимален брой опити при грешка
     'min_article_length': 100,  # Минимална дължина на статия (символи)
+    'parser_engine': 'bs4',  # 'bs4' (BeautifulSoup) или 'lxml' (по-бърз парсер с едно обхождане)
+    'max_workers': 4,  # Брой паралелни нишки за изтегляне на статии (1 = последователно)
+    'use_parse_pool': False,  # Парсване в отделни процеси (ProcessPoolExecutor), отделено от изтеглянето
+    'parse_workers': None,  # Брой процеси за парсване (None = брой ядра)
+    'db_write_batch_size': 20,  # Колко статии записваме наведнъж в pipeline режим
+    'transport': 'sync',  # 'sync' (requests.Session) или 'async' (aiohttp, keep-alive пул от връзки)
+}
+
+# Повторни опити при временни грешки (timeout, 429, 5xx, прекъсната връзка)
+RETRY_CONFIG = {
+    'base_delay': 1.0,  # Изчакване преди първия повторен опит (секунди), удвоява се при всеки следващ
+    'max_delay': 30.0,  # Максимално изчакване между опитите
+    'max_retry_after': 120,  # Ако сървърът поиска повече (Retry-After), се отказваме за този run
+}
+
+# Опашка с откритите, но още неизтеглени статии (таблица pending_urls)
+QUEUE_CONFIG = {
+    'lease_seconds': 300,  # Колко време един worker държи взетите URL-и, после друг може да ги поеме
+    'max_attempts': 3,  # Максимален брой опити за един URL (между отделните runs)
+    'retry_failed_after': 600,  # След колко секунди неуспешен URL може да се опита отново
+    'claim_batch_size': 10,  # Колко URL-а взима worker наведнъж
+}
+
+# Координация на няколко worker-а (процеси или машини) върху обща база (таблица scrape_workers)
+WORKER_CONFIG = {
+    'heartbeat_timeout': 120,  # Worker без heartbeat толкова секунди се смята за мъртъв, URL-ите му се освобождават
+    'idle_sleep': 30,  # Колко секунди чака worker, когато опашката е празна
+    'use_shards': True,  # Всеки worker взима първо URL-и от своя shard (hash(url) mod брой живи worker-и)
+}
+
+# Настройки за async transport (aiohttp)
+ASYNC_TRANSPORT_CONFIG = {
+    'per_host_limit': 4,  # Максимален брой едновременни заявки към един host
+    'total_limit': 20,  # Максимален брой отворени връзки общо
+    'keepalive_timeout': 30,  # Колко секунди пазим неизползвана връзка отворена
+}
+
+# Rate limiting (token bucket за всеки host)
+RATE_LIMIT_CONFIG = {
+    'requests_per_second': 2.0,  # Общ лимит на заявките към един host
+    'burst_size': 4,  # Максимален брой заявки наведнъж (размер на bucket-а)
+    'shared_state_file': None,  # SQLite файл за споделяне на лимита между процеси (напр. 'rate_limiter.db')
+}
+
+# Кеш на суровия HTML (conditional GET с ETag / Last-Modified)
+HTML_CACHE_CONFIG = {
+    'enabled': False,  # Включва кеша
+    'cache_dir': '.html_cache',  # Директория за кеша
+    'max_size_mb': 200,  # Максимален размер (компресиран), после LRU изтриване
+    'ttl_seconds': {  # Колко време записът е валиден без заявка (None = завинаги)
+        'listing': 60,  # Главна страница и latest-crypto-news
+        'article': None,  # Статии с дата в URL-а
+    },
+}
+
+# Watch режим (непрекъснато следене с адаптивен интервал)
+WATCH_CONFIG = {
+    'min_interval': 60,  # Най-краткият интервал между проверките (секунди), когато има нови статии
+    'max_interval': 900,  # Най-дългият интервал, когато дълго време няма нищо ново
+    'backoff_factor': 1.5,  # С колко умножаваме интервала след проверка без нови статии
+    'jitter': 0.1,  # Случайно отклонение (+/- 10%), за да не удряме точно в една и съща секунда
+    'use_html_cache': True,  # Conditional GET за listing страниците (вижте HTML_CACHE_CONFIG)
 }
 
 # HTML селектори за CoinDesk (обновени след debugging)
@@ -89,6 +174,32 @@ HTML_SELECTORS = {
 DATABASE_CONFIG = {
     'sqlite_file': 'crypto_news.db',
     'table_name': 'articles',
+    'sqlite_persistent_connection': True,  # Една постоянна връзка на нишка вместо нова за всяка заявка
+    'sqlite_statement_cache_size': 256,  # Брой кеширани prepared statements на връзка
+    'unprocessed_batch_size': 500,  # Колко неанализирани статии се четат с една заявка (keyset страница)
+}
+
+# PostgreSQL connection pool
+POSTGRES_POOL_CONFIG = {
+    'min_size': 1,  # Минимален брой отворени връзки
+    'max_size': 10,  # Максимален брой връзки
+    'max_lifetime': 1800,  # Връзките се подменят след толкова секунди
+    'health_check_after': 30,  # Проверка (SELECT 1) за връзки, неизползвани толкова секунди
+    'acquire_timeout': 30,  # Колко секунди да чакаме свободна връзка
+}
+
+# Разделяне на таблицата articles по месеци (PostgreSQL declarative partitioning по published_on)
+POSTGRES_PARTITION_CONFIG = {
+    'enabled': False,  # При True съществуващата таблица се преобразува еднократно при стартиране
+    'months_ahead': 2,  # За колко месеца напред създаваме празни partition-и
+    'maintenance_interval': 3600,  # Колко често (секунди) watch / worker процесите създават новите partition-и
+}
+
+# Изтриване на стари анализирани статии (retention.py)
+RETENTION_CONFIG = {
+    'batch_size': 1000,  # Колко реда изтриваме в една кратка транзакция
+    'pause_seconds': 0.05,  # Пауза между транзакциите, за да не блокираме записа на нови статии
+    'lock_timeout_ms': 5000,  # Колко чакаме lock за изтриване на цял partition, после го пропускаме
 }
 
 # Logging настройки
@@ -100,8 +211,10 @@ LOGGING_CONFIG = {
 
 # Debug настройки
 DEBUG_CONFIG = {
-    'save_html_files': False,  # Запазва HTML файлове за debugging
+    'save_html_files': False,  # Запазва HTML файлове за debugging (и за reparse)
+    'html_dir': 'html_pages',  # Директория за запазените HTML файлове
     'verbose_logging': True,  # Подробно логване
+    'log_rejected_paragraphs': False,  # Показва защо всеки параграф е отхвърлен от boilerplate филтъра
     'test_mode': False,  # Test mode (ограничава заявките)
 }
 
@@ -118,16 +231,14 @@ def get_full_url(relative_url):
 
 def is_valid_article_url(url):
     """Проверява дали URL е валиден за статия"""
-    # Проверяваме дали съдържа някой от новинарските patterns
-    has_news_pattern = any(pattern in url for pattern in NEWS_URL_PATTERNS)
-
-    # Проверяваме дали НЕ съдържа изключените patterns
-    has_exclude_pattern = any(pattern in url for pattern in EXCLUDE_PATTERNS)
+    # Импортираме тук, защото url_classifier импортира patterns от този модул
+    from url_classifier import classify_url
 
-    # Проверяваме дали съдържа актуална дата (2025)
-    has_current_year = '/2025/' in url
+    # Изключените patterns са в самия regex (None = изключен URL)
+    info = classify_url(url)
 
-    return has_news_pattern and not has_exclude_pattern and has_current_year
+    # Трябва да има новинарска категория и актуална дата (2025)
+    return info is not None and info.category is not None and info.year == 2025
 
 
 # Test функция за config
@@ -0,0 +1,190 @@
+"""
+Coordination of several scraper workers sharing one database.
+
+Workers (processes on one or more machines) pull article URLs from the
+pending_urls queue. Every worker registers in the scrape_workers table and
+refreshes its heartbeat while it works; each heartbeat also renews the
+leases on the URLs it holds, so a slow batch is never claimed twice. The
+live workers, sorted by id, split the queue into shards: worker i of N
+claims the URLs with crc32(url) % N == i first and only then helps with
+the other shards.
+Claims are leases (FOR UPDATE SKIP LOCKED on PostgreSQL, BEGIN IMMEDIATE on
+SQLite), so no two workers ever hold the same URL. When a worker stops
+sending heartbeats, the next worker that notices releases its leases
+without waiting for them to expire.
+
+A SQLite file works as a stand-in for PostgreSQL when all workers run on
+one machine (see test_sharded_workers()).
+"""
+
+import os
+import socket
+import time
+import uuid
+
+from config import QUEUE_CONFIG, WORKER_CONFIG
+
+
+class ShardCoordinator:
+    def __init__(self, db, worker_id=None, heartbeat_timeout=None, use_shards=None):
+        """Initializes the coordinator for one worker (values default to WORKER_CONFIG)"""
+        self.db = db
+        self.hostname = socket.gethostname()
+        self.pid = os.getpid()
+        # The random suffix keeps ids unique when a pid is reused after a crash
+        self.worker_id = worker_id or f"{self.hostname}:{self.pid}:{uuid.uuid4().hex[:6]}"
+        self.heartbeat_timeout = heartbeat_timeout or WORKER_CONFIG['heartbeat_timeout']
+        self.use_shards = WORKER_CONFIG['use_shards'] if use_shards is None else use_shards
+
+        self.shard = None
+        self._last_heartbeat = 0.0
+
+    def heartbeat(self, force=False):
+        """Refreshes the heartbeat and leases (at most every timeout / 4 s); returns the shard (index, count) or None"""
+        now = time.monotonic()
+        if not force and self.shard is not None and now - self._last_heartbeat < self.heartbeat_timeout / 4:
+            return self.shard if self.use_shards else None
+
+        live_workers = self.db.heartbeat_worker(self.worker_id, self.hostname, self.pid, self.heartbeat_timeout)
+        self._last_heartbeat = now
+        # Long-lived workers also keep the monthly partitions ahead of the calendar (throttled by the db)
+        self.db.maintain_partitions()
+
+        if self.worker_id in live_workers:
+            shard = (live_workers.index(self.worker_id), len(live_workers))
+            if shard != self.shard:
+                print(f"🧩 Worker {self.worker_id}: shard {shard[0] + 1}/{shard[1]}")
+            self.shard = shard
+
+        return self.shard if self.use_shards else None
+
+    def reap_dead_workers(self):
+        """Releases the URLs leased by workers without a heartbeat; returns their ids"""
+        dead = self.db.reap_dead_workers(self.heartbeat_timeout)
+        for worker_id in dead:
+            print(f"💀 Worker {worker_id} stopped sending heartbeats, its URLs are back in the queue")
+        return dead
+
+    def unregister(self):
+        """Leaves the worker group (the remaining workers take over this shard)"""
+        self.db.unregister_worker(self.worker_id)
+        self.shard = None
+
+
+def run_worker(scraper, coordinator, batch_size=None, max_articles=None, idle_sleep=None, exit_when_idle=False):
+    """Scrapes queued URLs until interrupted, max_articles or (exit_when_idle) an empty queue; returns a summary
+
+    scraper: CoinDeskLatestNewsScraper whose db is the shared database
+    """
+    batch_size = batch_size or QUEUE_CONFIG['claim_batch_size']
+    idle_sleep = WORKER_CONFIG['idle_sleep'] if idle_sleep is None else idle_sleep
+    summary = {'worker_id': coordinator.worker_id, 'claimed': 0, 'scraped': 0}
+
+    print(f"👷 Worker {coordinator.worker_id} started (Ctrl+C to stop)")
+    coordinator.heartbeat(force=True)
+
+    try:
+        while max_articles is None or summary['claimed'] < max_articles:
+            coordinator.reap_dead_workers()
+
+            limit = batch_size if max_articles is None else min(batch_size, max_articles - summary['claimed'])
+            articles = scraper.scrape_pending_urls(limit=limit, coordinator=coordinator)
+            summary['claimed'] += scraper._last_claimed_count
+            summary['scraped'] += len(articles)
+
+            if scraper._last_claimed_count == 0:
+                if exit_when_idle:
+                    break
+                print(f"💤 Queue empty, checking again in {idle_sleep}s")
+                time.sleep(idle_sleep)
+                coordinator.heartbeat(force=True)
+
+    except KeyboardInterrupt:
+        print("\n⏹️ Worker stopped")
+    finally:
+        coordinator.unregister()
+
+    print(f"📊 Worker {coordinator.worker_id}: {summary['claimed']} claimed, {summary['scraped']} scraped")
+    return summary
+
+
+def _test_worker_process(db_path, results):
+    """One worker process of test_sharded_workers()"""
+    import contextlib
+    import io
+
+    from improved_latest_news_scraper import CoinDeskLatestNewsScraper
+    from rate_limiter import TokenBucketRateLimiter
+    from sqlite_database import DatabaseManager
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper = CoinDeskLatestNewsScraper(use_database=False)
+        scraper.db = DatabaseManager(db_path)
+        scraper.html_cache = None
+        scraper.rate_limiter = TokenBucketRateLimiter(requests_per_second=1e9, burst_size=1e9)
+
+        coordinator = ShardCoordinator(scraper.db, heartbeat_timeout=5)
+        results.put(run_worker(scraper, coordinator, batch_size=5, exit_when_idle=True))
+
+
+def test_sharded_workers(workers=4, urls_per_page=15):
+    """Runs several worker processes against one SQLite file and the local stub server"""
+    import multiprocessing
+    import sqlite3
+    import tempfile
+
+    from sqlite_database import DatabaseManager
+    from stub_server import start_stub_server
+
+    server, base_url, paths = start_stub_server(latency=0.01)
+    article_paths = [path for path in paths if path not in ('/', '/latest-crypto-news')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'workers.db')
+        db = DatabaseManager(db_path)
+
+        # Distinct queue URLs for the same stub pages (the stub ignores the query string)
+        links = [{'url': f"{base_url}{path}?copy={i}", 'title': path}
+                 for path in article_paths for i in range(urls_per_page)]
+        db.enqueue_pending_urls(links, source='test')
+
+        # A crashed worker holding a lease that would only expire after 5 minutes
+        db.heartbeat_worker('crashed-worker', timeout=5)
+        db.claim_pending_urls('crashed-worker', limit=3)
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE scrape_workers SET heartbeat_at = datetime('now', '-1 hour')")
+
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_test_worker_process, args=(db_path, results))
+                     for _ in range(workers)]
+
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        summaries = [results.get(timeout=120) for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        with sqlite3.connect(db_path) as conn:
+            statuses = dict(conn.execute("SELECT status, COUNT(*) FROM pending_urls GROUP BY status").fetchall())
+            repeated = conn.execute("SELECT COUNT(*) FROM pending_urls WHERE attempts > 1").fetchone()[0]
+            remaining_workers = conn.execute("SELECT COUNT(*) FROM scrape_workers").fetchone()[0]
+        db.close()
+
+    server.shutdown()
+
+    for summary in summaries:
+        print(f"   {summary['worker_id']}: {summary['claimed']} claimed")
+    claimed = sum(summary['claimed'] for summary in summaries)
+    print(f"🧪 {workers} workers, {len(links)} URLs in {elapsed:.2f}s, queue: {statuses}")
+
+    ok = claimed == len(links) and statuses == {'done': len(links)} and remaining_workers == 0
+    # Only the 3 URLs of the crashed worker may have a second attempt
+    ok = ok and repeated == 3
+    print("✅ Every URL scraped exactly once (dead worker's leases reclaimed)" if ok
+          else f"❌ claimed {claimed}, repeated {repeated}, workers left {remaining_workers}")
+
+
+if __name__ == "__main__":
+    test_sharded_workers()
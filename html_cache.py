@@ -0,0 +1,187 @@
+"""
+On-disk raw HTML cache with conditional GET support.
+
+Responses are stored gzip-compressed, one file per URL, with their ETag and
+Last-Modified headers in a small SQLite index. While an entry is within the
+TTL of its URL class it is served without any request; after that the
+fetch sends If-None-Match / If-Modified-Since and a 304 reuses the stored
+body. The cache is trimmed by size in least-recently-used order.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from config import HTML_CACHE_CONFIG
+
+# Dated CoinDesk article URLs (/markets/2025/06/09/slug) never change much
+ARTICLE_URL_RE = re.compile(r'/\d{4}/\d{2}/\d{2}/')
+
+CacheEntry = namedtuple('CacheEntry', ['url', 'path', 'etag', 'last_modified', 'fetched_at', 'size'])
+
+# Result of fetch_with_cache: from_cache=True means no body was downloaded
+FetchResult = namedtuple('FetchResult', ['url', 'content', 'from_cache', 'not_modified'])
+
+
+def url_class(url):
+    """Returns the TTL class of a URL: 'article' for dated article pages, else 'listing'"""
+    return 'article' if ARTICLE_URL_RE.search(url) else 'listing'
+
+
+class HtmlCache:
+    def __init__(self, cache_dir=None, max_size_mb=None, ttl_seconds=None):
+        """Initializes the cache (values default to HTML_CACHE_CONFIG)"""
+        self.cache_dir = Path(cache_dir or HTML_CACHE_CONFIG['cache_dir'])
+        self.max_size_bytes = int((max_size_mb or HTML_CACHE_CONFIG['max_size_mb']) * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds or HTML_CACHE_CONFIG['ttl_seconds']
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / 'index.db'
+
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    url TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_last_access ON cache_entries(last_access)')
+
+    def _connect(self):
+        return sqlite3.connect(self.index_path, timeout=30.0)
+
+    def _body_path(self, url):
+        return self.cache_dir / (hashlib.sha1(url.encode('utf-8')).hexdigest() + '.html.gz')
+
+    def lookup(self, url):
+        """Returns the cache entry for a URL or None"""
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT url, path, etag, last_modified, fetched_at, size
+                FROM cache_entries WHERE url = ?
+            ''', (url,)).fetchone()
+
+        if row is None or not Path(row[1]).exists():
+            return None
+        return CacheEntry(*row)
+
+    def is_fresh(self, entry):
+        """Checks if an entry is still within the TTL of its URL class (None = never expires)"""
+        ttl = self.ttl_seconds.get(url_class(entry.url))
+        return ttl is None or time.time() - entry.fetched_at < ttl
+
+    def read_body(self, entry):
+        """Returns the decompressed body and marks the entry as recently used"""
+        body = gzip.decompress(Path(entry.path).read_bytes())
+        with self._connect() as conn:
+            conn.execute("UPDATE cache_entries SET last_access = ? WHERE url = ?", (time.time(), entry.url))
+        return body
+
+    def conditional_headers(self, entry):
+        """Returns If-None-Match / If-Modified-Since headers for revalidating an entry"""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def mark_revalidated(self, entry, response_headers):
+        """Restarts the TTL of an entry after a 304 response"""
+        with self._connect() as conn:
+            conn.execute('''
+                UPDATE cache_entries
+                SET fetched_at = ?, last_access = ?,
+                    etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                WHERE url = ?
+            ''', (time.time(), time.time(), response_headers.get('ETag'),
+                  response_headers.get('Last-Modified'), entry.url))
+
+    def store(self, url, body, response_headers):
+        """Stores a downloaded body with its validators and evicts old entries if needed"""
+        path = self._body_path(url)
+        compressed = gzip.compress(body)
+
+        # Written next to the final file and renamed over it, so a concurrent reader
+        # (another thread or process) sees either the old body or the new one, never a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=path.name + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                tmp_file.write(compressed)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO cache_entries (url, path, etag, last_modified, fetched_at, last_access, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    path = excluded.path, etag = excluded.etag, last_modified = excluded.last_modified,
+                    fetched_at = excluded.fetched_at, last_access = excluded.last_access, size = excluded.size
+            ''', (url, str(path), response_headers.get('ETag'), response_headers.get('Last-Modified'),
+                  now, now, len(compressed)))
+
+        self._evict()
+
+    def _evict(self):
+        """Removes least recently used entries until the cache fits in max_size_bytes"""
+        with self._lock, self._connect() as conn:
+            total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            if total_size <= self.max_size_bytes:
+                return
+
+            rows = conn.execute("SELECT url, path, size FROM cache_entries ORDER BY last_access").fetchall()
+            for url, path, size in rows:
+                if total_size <= self.max_size_bytes:
+                    break
+                Path(path).unlink(missing_ok=True)
+                conn.execute("DELETE FROM cache_entries WHERE url = ?", (url,))
+                total_size -= size
+
+    def get_stats(self):
+        """Returns the number of entries and their compressed size"""
+        with self._connect() as conn:
+            count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        return {'entries': count, 'size_bytes': size, 'max_size_bytes': self.max_size_bytes}
+
+
+def fetch_with_cache(session, url, timeout, cache=None, rate_limiter=None):
+    """GETs a URL, serving fresh entries from the cache and revalidating stale ones"""
+    entry = cache.lookup(url) if cache else None
+
+    if entry and cache.is_fresh(entry):
+        return FetchResult(url, cache.read_body(entry), from_cache=True, not_modified=True)
+
+    headers = cache.conditional_headers(entry) if entry else {}
+
+    if rate_limiter:
+        rate_limiter.acquire(url)
+
+    response = session.get(url, timeout=timeout, headers=headers)
+
+    if entry and response.status_code == 304:
+        cache.mark_revalidated(entry, response.headers)
+        return FetchResult(url, cache.read_body(entry), from_cache=True, not_modified=True)
+
+    response.raise_for_status()
+
+    if cache:
+        cache.store(url, response.content, response.headers)
+
+    return FetchResult(url, response.content, from_cache=False, not_modified=False)
@@ -1,4 +1,3 @@
-import sqlite3
 import requests
 from bs4 import BeautifulSoup
 import time
@@ -6,14 +5,23 @@ from datetime import datetime, timedelta
 from urllib.parse import urljoin
 import re
 import json
+import os
+import socket
 
 from config import (
     COINDESK_BASE_URL,
     REQUEST_HEADERS,
     SCRAPING_CONFIG,
-    HTML_SELECTORS
+    HTML_SELECTORS,
+    HTML_CACHE_CONFIG,
+    QUEUE_CONFIG
 )
-from database import DatabaseManager
+from sqlite_database import DatabaseManager
+from rate_limiter import get_rate_limiter
+from html_cache import HtmlCache
+from transport import create_transport
+from url_classifier import classify_url, is_article_url
+from boilerplate_filter import DEFAULT_FILTER, STRICT_FILTER
 
 def _extract_content_improved(self, soup):
     """RADICALLY IMPROVED content extraction for CoinDesk"""
@@ -163,51 +171,8 @@ def _process_paragraphs_fixed(self, paragraphs):
 def _is_meaningful_paragraph_fixed(self, text):
     """Improved check for meaningful paragraphs"""
 
-    # Basic checks
-    if len(text) < 20:
-        return False
-
-    # Exclude price links and navigation
-    if text.startswith('[') and text.endswith(']'):
-        return False
-
-    # Exclude unwanted phrases
-    exclude_phrases = [
-        'Sign up', 'Subscribe', 'Newsletter', 'See all newsletters',
-        'Don\'t miss', 'By signing up', 'privacy policy', 'terms of use',
-        'Cookie', 'Advertisement', 'Sponsored', 'Follow us', 'Share this',
-        'Read more', 'Click here', 'Download', 'Watch', 'Listen',
-        'Back to menu', 'What to know:', 'See more'
-    ]
-
-
-def _is_meaningful_paragraph_fixed(self, text):
-    """Improved check for meaningful paragraphs"""
-
-    # Basic checks
-    if len(text) < 20:
-        return False
-
-    # Exclude price links and navigation
-    if text.startswith('[') and text.endswith(']'):
-        return False
-
-    # Exclude unwanted phrases
-    exclude_phrases = [
-        'Sign up', 'Subscribe', 'Newsletter', 'See all newsletters',
-        'Don\'t miss', 'By signing up', 'privacy policy', 'terms of use',
-        'Cookie', 'Advertisement', 'Sponsored', 'Follow us', 'Share this',
-        'Read more', 'Click here', 'Download', 'Watch', 'Listen',
-        'Back to menu', 'What to know:', 'See more'
-    ]
-
-    text_lower = text.lower()
-    for phrase in exclude_phrases:
-        if phrase.lower() in text_lower:
-            return False
-
-    # Must have at least one sentence
-    if text.count('.') < 1 and text.count('!') < 1 and text.count('?') < 1:
+    # Length, price links/navigation, unwanted phrases and sentence checks
+    if not STRICT_FILTER.is_meaningful(text):
         return False
 
     # Shouldn't be just numbers or short phrases
@@ -232,9 +197,25 @@ class CoinDeskLatestNewsScraper:
         }
         self.session.headers.update(simple_headers)
 
+        # Sync (requests) or async (aiohttp) downloads, see SCRAPING_CONFIG['transport']
+        self.transport = create_transport(self.session)
+
+        # Per-host politeness budget (shared with other scrapers in this process)
+        self.rate_limiter = get_rate_limiter()
+
+        # Raw HTML cache (conditional GET) and parsed listing pages by URL
+        self.html_cache = HtmlCache() if HTML_CACHE_CONFIG['enabled'] else None
+        self._parsed_listing_pages = {}
+
         # URL for latest news
         self.latest_news_url = "https://www.coindesk.com/latest-crypto-news"
 
+        # Did the last get_articles_by_date_filter() walk the listing to its end (not truncated)?
+        self._last_listing_complete = False
+
+        # How many queued URLs the last scrape_pending_urls() claimed (successful or not)
+        self._last_claimed_count = 0
+
         # Database integration
         self.use_database = use_database
         if use_database:
@@ -244,7 +225,7 @@ class CoinDeskLatestNewsScraper:
 
         print("✅ Latest News Scraper ready!")
 
-    def get_articles_by_date_filter(self, date_filter='today', max_articles=50):
+    def get_articles_by_date_filter(self, date_filter='today', max_articles=50, stop_at_watermark=False):
         """
         Gets articles from latest-crypto-news with date filter
 
@@ -254,6 +235,9 @@ class CoinDeskLatestNewsScraper:
         - '2025-06-10' - specific date
         - 'last_3_days' - last 3 days
         - 'all' - all (up to max_articles)
+
+        stop_at_watermark: stop paging at the newest article of the last complete
+        crawl with the same filter (everything after it is already known)
         """
         print(f"🔍 Searching for articles with filter: {date_filter}")
 
@@ -261,11 +245,19 @@ class CoinDeskLatestNewsScraper:
         target_dates = self._get_target_dates(date_filter)
         print(f"📅 Target dates: {target_dates}")
 
+        watermark = None
+        if stop_at_watermark and self.db:
+            watermark = self.db.get_crawl_watermark(self._watermark_feed(date_filter))
+            if watermark:
+                print(f"🔖 Watermark: {watermark['newest_url']}")
+        watermark_date = watermark and watermark['newest_published_date']
+
         # Start scraping pages
         all_articles = []
         page_offset = 0
         pages_checked = 0
         max_pages = 10  # Safety limit
+        self._last_listing_complete = False
 
         while len(all_articles) < max_articles and pages_checked < max_pages:
             print(f"📄 Processing page {pages_checked + 1}...")
@@ -273,19 +265,38 @@ class CoinDeskLatestNewsScraper:
             # Scrape current page
             page_articles = self._scrape_latest_news_page(page_offset)
 
+            if page_articles is None:
+                # Unfetched pages may hold unseen articles; an incomplete listing keeps the watermark
+                print("❌ Listing page could not be fetched, stopping (listing incomplete)")
+                break
+
             if not page_articles:
                 print("❌ No more articles")
+                self._last_listing_complete = True
                 break
 
             # Filter by date
             filtered_articles = []
             for article in page_articles:
                 article_date = self._extract_date_from_article_data(article)
+
+                # Known territory: the watermark article or anything published before it
+                if watermark and (article['url'] == watermark['newest_url']
+                                  or (watermark_date and article_date.isoformat() < watermark_date)):
+                    print(f"🔖 Reached watermark after {pages_checked + 1} page(s), stopping")
+                    all_articles.extend(filtered_articles)
+                    # Articles cut off by max_articles were not listed, so the watermark must not pass them
+                    self._last_listing_complete = len(all_articles) <= max_articles
+                    return all_articles[:max_articles]
+
                 if article_date in target_dates or date_filter == 'all':
                     filtered_articles.append(article)
                 elif date_filter != 'all' and article_date < min(target_dates):
                     # If article is older than oldest target date, stop
                     print(f"⏹️ Reached old articles ({article_date}), stopping")
+                    all_articles.extend(filtered_articles)
+                    # Articles cut off by max_articles were not listed, so the watermark must not pass them
+                    self._last_listing_complete = len(all_articles) <= max_articles
                     return all_articles[:max_articles]
 
             all_articles.extend(filtered_articles)
@@ -294,12 +305,23 @@ class CoinDeskLatestNewsScraper:
 
             print(f"📊 Page {pages_checked}: {len(filtered_articles)} relevant articles")
 
-            # Small pause between pages
-            time.sleep(2)
-
         print(f"✅ Found {len(all_articles)} articles with filter '{date_filter}'")
         return all_articles[:max_articles]
 
+    def _watermark_feed(self, date_filter):
+        """Crawl state key: one watermark per listing feed and date filter"""
+        return f"latest-crypto-news:{date_filter}"
+
+    def _update_crawl_watermark(self, date_filter, article_links):
+        """Moves the watermark to the newest listed article"""
+        if not article_links:
+            return
+
+        newest = article_links[0]
+        newest_date = self._extract_date_from_article_data(newest)
+        self.db.set_crawl_watermark(self._watermark_feed(date_filter), newest['url'], newest_date.isoformat())
+        print(f"🔖 Watermark moved to {newest['url']}")
+
     def _get_target_dates(self, date_filter):
         """Returns list of target dates for filtering"""
         today = datetime.now().date()
@@ -322,15 +344,20 @@ class CoinDeskLatestNewsScraper:
             return []
 
     def _scrape_latest_news_page(self, offset=0):
-        """Scrapes one page from latest-crypto-news"""
+        """Scrapes one page from latest-crypto-news; returns None if the page could not be fetched"""
         try:
             # URL for pagination might use offset parameter
             url = f"{self.latest_news_url}?offset={offset}" if offset > 0 else self.latest_news_url
 
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            result = self.transport.fetch(url, timeout=15,
+                                          cache=self.html_cache, rate_limiter=self.rate_limiter)
+
+            # Unchanged page: skip parsing and reuse the articles from last time
+            if result.not_modified and url in self._parsed_listing_pages:
+                print("♻️ Page not modified, reusing parsed articles")
+                return list(self._parsed_listing_pages[url])
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(result.content, 'html.parser')
 
             # Look for articles - usually in article elements or specific containers
             articles = []
@@ -359,11 +386,13 @@ class CoinDeskLatestNewsScraper:
                         if article_data['title'] and len(article_data['title']) > 15:
                             articles.append(article_data)
 
-            return articles[:16]  # CoinDesk shows 16 per page
+            articles = articles[:16]  # CoinDesk shows 16 per page
+            self._parsed_listing_pages[url] = articles
+            return articles
 
         except Exception as e:
             print(f"❌ Error scraping page: {e}")
-            return []
+            return None
 
     def _extract_article_data_from_element(self, article_elem):
         """Extracts article data from article element"""
@@ -405,38 +434,7 @@ class CoinDeskLatestNewsScraper:
 
     def _is_valid_article_url(self, href):
         """Checks if URL is valid for article"""
-        if not href or href in ['#', '/', '']:
-            return False
-
-        if href.startswith('http') and 'coindesk.com' not in href:
-            return False
-
-        if href.startswith('#') or href.startswith('mailto:') or href.startswith('tel:'):
-            return False
-
-        # Exclude system pages
-        exclude_patterns = [
-            '/newsletters/', '/podcasts/', '/events/', '/about/', '/careers/',
-            '/advertise/', '/price/', '/author/', '/tag/', '/sponsored-content/',
-            '/_next/', '/api/', '/search', '/privacy', '/terms'
-        ]
-
-        for pattern in exclude_patterns:
-            if pattern in href:
-                return False
-
-        # Accept articles with date or from news categories
-        date_patterns = [
-            r'/\d{4}/\d{2}/\d{2}/',  # /2025/06/10/
-            r'/2025/', r'/2024/'
-        ]
-
-        has_date = any(re.search(pattern, href) for pattern in date_patterns)
-
-        news_categories = ['/markets/', '/policy/', '/tech/', '/business/', '/layer2/', '/web3/', '/daybook']
-        has_category = any(category in href for category in news_categories)
-
-        return has_date or has_category
+        return is_article_url(href)
 
     def _make_full_url(self, href):
         """Makes full URL from relative href"""
@@ -452,18 +450,14 @@ class CoinDeskLatestNewsScraper:
         url = article_data['url']
 
         # Try to extract from URL
-        date_match = re.search(r'/(\d{4})/(\d{2})/(\d{2})/', url)
-        if date_match:
-            year, month, day = date_match.groups()
-            try:
-                return datetime(int(year), int(month), int(day)).date()
-            except:
-                pass
+        url_info = classify_url(url)
+        if url_info and url_info.date:
+            return url_info.date
 
         # If no date in URL, assume it's from today (latest news)
         return datetime.now().date()
 
-    def scrape_articles_smart(self, date_filter='today', limit=10, save_to_db=True):
+    def scrape_articles_smart(self, date_filter='today', limit=10, save_to_db=True, resume=False):
         """
         Smart scraping with date filtering
 
@@ -472,41 +466,34 @@ class CoinDeskLatestNewsScraper:
         - 'yesterday' - yesterday's articles
         - '2025-06-10' - specific date
         - 'last_3_days' - last 3 days
+
+        With the database, new links go to the pending_urls queue first and are
+        scraped from there. resume=True skips the listing and only continues
+        with the queue left by earlier (e.g. crashed) runs.
         """
+        use_queue = bool(self.db and save_to_db)
+
+        if resume:
+            if not use_queue:
+                print("❌ Resume needs the database")
+                return []
+            print("⏯️ Resuming from the pending URL queue (no listing requests)")
+            return self.scrape_pending_urls(limit)
+
         print(f"🎯 Smart scraping: {limit} articles with filter '{date_filter}'")
 
-        # Get articles with filter
-        article_links = self.get_articles_by_date_filter(date_filter, max_articles=limit * 2)
+        if use_queue:
+            self.queue_new_articles(date_filter, max_articles=limit * 2)
+            return self.scrape_pending_urls(limit)
 
+        # Without the database: scrape the first `limit` links directly
+        article_links = self.get_articles_by_date_filter(date_filter, max_articles=limit * 2)
         if not article_links:
             print("❌ No articles found with this filter")
             return []
 
-        # Database filtering
-        if self.db and save_to_db:
-            print("🔍 Checking for duplicate URLs...")
-            new_article_links = []
-            skipped_count = 0
-
-            for link_info in article_links:
-                url = link_info['url']
-                if not self.db.is_url_scraped_before(url):
-                    new_article_links.append(link_info)
-                else:
-                    skipped_count += 1
-                    self.db.record_scraped_url(url)
-
-            print(f"📊 {len(new_article_links)} new articles, {skipped_count} already scraped")
-            article_links = new_article_links
-
-        # Limit to specified number
         article_links = article_links[:limit]
 
-        if not article_links:
-            print("ℹ️ All articles already scraped")
-            return []
-
-        # Scraping articles
         scraped_articles = []
         successful_count = 0
         failed_count = 0
@@ -519,9 +506,6 @@ class CoinDeskLatestNewsScraper:
             if article_data:
                 scraped_articles.append(article_data)
                 successful_count += 1
-
-                if self.db and save_to_db:
-                    self.db.save_article(article_data)
             else:
                 failed_count += 1
 
@@ -530,17 +514,107 @@ class CoinDeskLatestNewsScraper:
 
         return scraped_articles
 
+    def queue_new_articles(self, date_filter='today', max_articles=20):
+        """Adds the not yet scraped listing links to the pending_urls queue; returns how many were new"""
+        # Get articles with filter (only the ones newer than the crawl watermark)
+        article_links = self.get_articles_by_date_filter(date_filter, max_articles=max_articles, stop_at_watermark=True)
+        listing_complete = self._last_listing_complete
+
+        if not article_links:
+            print("❌ No articles found with this filter")
+            return 0
+
+        # Database filtering
+        print("🔍 Checking for duplicate URLs...")
+        seen_urls = self.db.get_scraped_urls([link_info['url'] for link_info in article_links])
+        new_article_links = [link_info for link_info in article_links if link_info['url'] not in seen_urls]
+        skipped_count = len(article_links) - len(new_article_links)
+
+        if seen_urls:
+            self.db.record_scraped_urls(seen_urls)
+
+        print(f"📊 {len(new_article_links)} new articles, {skipped_count} already scraped")
+
+        # Queue everything new before fetching anything, so a crash loses nothing
+        queued_count = self.db.enqueue_pending_urls(new_article_links, source=self._watermark_feed(date_filter))
+        if queued_count is None:
+            return 0
+
+        print(f"📥 {queued_count} URL(s) added to the pending queue")
+
+        # Every listed article is now scraped or queued, the watermark can move
+        if listing_complete:
+            self._update_crawl_watermark(date_filter, article_links)
+
+        return queued_count
+
+    def scrape_pending_urls(self, limit=10, worker_id=None, coordinator=None):
+        """Claims URLs from the pending queue in batches, scrapes and saves them
+
+        With a ShardCoordinator (coordinator.py) the worker sends heartbeats and
+        claims URLs of its own shard first, then helps with the other shards.
+        """
+        if coordinator:
+            worker_id = coordinator.worker_id
+        worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+        scraped_articles = []
+        successful_count = 0
+        failed_count = 0
+
+        while successful_count + failed_count < limit:
+            batch_size = min(QUEUE_CONFIG['claim_batch_size'], limit - successful_count - failed_count)
+            if coordinator:
+                shard = coordinator.heartbeat()
+                batch = (self.db.claim_pending_urls(worker_id, limit=batch_size, shard=shard)
+                         or self.db.claim_pending_urls(worker_id, limit=batch_size))
+            else:
+                batch = self.db.claim_pending_urls(worker_id, limit=batch_size)
+            if not batch:
+                break
+
+            for item in batch:
+                if coordinator:
+                    coordinator.heartbeat()
+                processed = successful_count + failed_count + 1
+                print(f"\n[{processed}/{limit}] {(item['title'] or item['url'])[:60]}... (attempt {item['attempts']})")
+
+                article_data = self.scrape_single_article(item['url'])
+                if article_data and self.db.save_article(article_data):
+                    self.db.complete_pending_urls([item['url']], worker_id)
+                    scraped_articles.append(article_data)
+                    successful_count += 1
+                elif article_data and self.db.is_article_exists(item['url']):
+                    # Saved before (e.g. by another run); fetching it again would not help
+                    self.db.complete_pending_urls([item['url']], worker_id)
+                    successful_count += 1
+                else:
+                    error = 'scrape failed' if not article_data else 'save failed'
+                    self.db.fail_pending_url(item['url'], worker_id, error)
+                    failed_count += 1
+
+        self._last_claimed_count = successful_count + failed_count
+        if successful_count + failed_count == 0:
+            print("ℹ️ No pending URLs to scrape")
+
+        print(f"\n🎉 Smart scraping completed!")
+        print(f"📊 Result: {successful_count} successful, {failed_count} failed articles")
+
+        pending = self.db.get_pending_stats()
+        if pending.get('discovered') or pending.get('failed'):
+            print(f"📥 Still queued: {pending.get('discovered', 0)} new, {pending.get('failed', 0)} failed")
+
+        return scraped_articles
+
     def scrape_single_article(self, article_url):
         """Extracts content of one article (uses same logic as old scraper)"""
         print(f"📄 Scraping article: {article_url}")
 
         try:
-            time.sleep(SCRAPING_CONFIG['delay_between_requests'])
-
-            response = self.session.get(article_url, timeout=15)
-            response.raise_for_status()
+            result = self.transport.fetch(article_url, timeout=15,
+                                          cache=self.html_cache, rate_limiter=self.rate_limiter)
 
-            content_text = response.content.decode('utf-8', errors='ignore')
+            content_text = result.content.decode('utf-8', errors='ignore')
             soup = BeautifulSoup(content_text, 'html.parser')
 
             # Use same extraction methods as old scraper
@@ -671,27 +745,7 @@ class CoinDeskLatestNewsScraper:
 
     def _is_meaningful_paragraph(self, text):
         """Checks if paragraph is meaningful"""
-        if len(text) < 20:  # Too short
-            return False
-
-        # Exclude unwanted phrases
-        exclude_phrases = [
-            'Sign up', 'Subscribe', 'Newsletter', 'See all newsletters',
-            'Don\'t miss', 'By signing up', 'privacy policy', 'terms of use',
-            'Cookie', 'Advertisement', 'Sponsored', 'Follow us', 'Share this',
-            'Read more', 'Click here', 'Download', 'Watch', 'Listen'
-        ]
-
-        text_lower = text.lower()
-        for phrase in exclude_phrases:
-            if phrase.lower() in text_lower:
-                return False
-
-        # Check for normal sentences
-        if text.count('.') < 1:  # No sentences
-            return False
-
-        return True
+        return DEFAULT_FILTER.is_meaningful(text)
 
     def _extract_date_improved(self, soup):
         published_meta = soup.find('meta', property='article:published_time')
@@ -715,28 +769,15 @@ class CoinDeskLatestNewsScraper:
             return {'error': 'Database not active'}
 
         try:
-            conn = self.db.get_connection() if hasattr(self.db, 'get_connection') else sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-
-            # Articles from this date
-            cursor.execute("""
-                SELECT COUNT(*) FROM articles 
-                WHERE url LIKE ? OR published_date = ?
-            """, (f'%{date_str.replace("-", "/")}%', date_str))
-
-            scraped_count = cursor.fetchone()[0]
+            # Articles from this date (indexed published_on instead of url LIKE scans)
+            scraped_count = self.db.count_articles_published_on(date_str)
 
             # Find potential articles from latest news
             potential_articles = self.get_articles_by_date_filter(date_str, max_articles=50)
             potential_count = len(potential_articles)
 
-            new_count = 0
-            for article in potential_articles:
-                cursor.execute("SELECT 1 FROM scraped_urls WHERE url = ?", (article['url'],))
-                if not cursor.fetchone():
-                    new_count += 1
-
-            conn.close()
+            seen_urls = self.db.get_scraped_urls([article['url'] for article in potential_articles])
+            new_count = sum(1 for article in potential_articles if article['url'] not in seen_urls)
 
             return {
                 'date': date_str,
@@ -0,0 +1,267 @@
+"""
+Single-pass lxml article parser.
+
+Parses an article page once with lxml and collects everything the
+CoinDeskScraper extraction methods look for (h1/title, meta tags, <time>,
+canonical link, author candidates, main containers and paragraphs) in one
+tree walk. The selection rules mirror the BeautifulSoup path, so both
+engines return the same fields.
+"""
+
+import re
+from datetime import datetime
+
+from lxml import etree
+from lxml import html as lxml_html
+
+# Same order (= priority) as CoinDeskScraper._extract_content_improved
+MAIN_CONTAINER_SELECTORS = [
+    ('main', lambda el: el.tag == 'main'),
+    ('article', lambda el: el.tag == 'article'),
+    ('[role="main"]', lambda el: el.get('role') == 'main'),
+    ('.article-content', lambda el: _has_class(el, 'article-content')),
+    ('.post-content', lambda el: _has_class(el, 'post-content')),
+]
+
+# Same order (= priority) as CoinDeskScraper._extract_author_improved
+AUTHOR_SELECTORS = [
+    ('a[href*="/author/"]', lambda el: el.tag == 'a' and '/author/' in el.get('href', '')),
+    ('.author-name', lambda el: _has_class(el, 'author-name')),
+    ('.byline', lambda el: _has_class(el, 'byline')),
+    ('[data-author]', lambda el: el.get('data-author') is not None),
+    ('.post-author', lambda el: _has_class(el, 'post-author')),
+]
+
+# Tags whose text BeautifulSoup's get_text() leaves out
+NON_TEXT_TAGS = {'script', 'style', 'template'}
+
+FALLBACK_REMOVED_TAGS = ('script', 'style', 'nav', 'header', 'footer')
+
+TITLE_SUFFIX_RE = re.compile(r'\s*\|\s*CoinDesk.*$')
+URL_DATE_RE = re.compile(r'/(\d{4})/(\d{2})/(\d{2})/')
+
+
+def _has_class(element, class_name):
+    """Checks if the element's class attribute contains class_name"""
+    classes = element.get('class')
+    return bool(classes) and class_name in classes.split()
+
+
+def _text_content(element):
+    """Returns the element's text without script/style contents (like get_text())"""
+    parts = []
+    _collect_text(element, parts)
+    return ''.join(parts)
+
+
+def _collect_text(element, parts):
+    if element.text:
+        parts.append(element.text)
+
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+            _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+
+
+class ArticlePage:
+    """Everything the extractors need, collected in a single walk over the tree"""
+
+    def __init__(self, raw_html):
+        self.root = lxml_html.document_fromstring(raw_html)
+
+        self.h1_texts = []
+        self.title_text = None
+        self.meta = {}
+        self.time_datetimes = []
+        self.canonical_href = None
+        self.body = None
+        self.divs = []
+
+        # Paragraph texts with the set of main containers (by index) they are inside
+        self.paragraphs = []
+        self.containers = [None] * len(MAIN_CONTAINER_SELECTORS)
+        self.authors = [None] * len(AUTHOR_SELECTORS)
+
+        self._walk()
+
+    def _walk(self):
+        open_containers = set()
+
+        for event, element in etree.iterwalk(self.root, events=('start', 'end')):
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue  # Comments and processing instructions
+
+            if event == 'end':
+                if tag == 'p':
+                    self.paragraphs.append((_text_content(element).strip(), frozenset(open_containers)))
+                elif tag == 'h1':
+                    self.h1_texts.append(_text_content(element).strip())
+
+                for index in list(open_containers):
+                    if self.containers[index] is element:
+                        open_containers.discard(index)
+                continue
+
+            if tag == 'meta':
+                self._collect_meta(element)
+            elif tag == 'time':
+                if element.get('datetime'):
+                    self.time_datetimes.append(element.get('datetime'))
+            elif tag == 'link':
+                if self.canonical_href is None and 'canonical' in element.get('rel', '').split():
+                    self.canonical_href = element.get('href', '')
+            elif tag == 'title':
+                if self.title_text is None:
+                    self.title_text = _text_content(element)
+            elif tag == 'body':
+                if self.body is None:
+                    self.body = element
+            elif tag == 'div':
+                self.divs.append(element)
+
+            for index, (_, matches) in enumerate(MAIN_CONTAINER_SELECTORS):
+                if self.containers[index] is None and matches(element):
+                    self.containers[index] = element
+                    open_containers.add(index)
+
+            for index, (_, matches) in enumerate(AUTHOR_SELECTORS):
+                if self.authors[index] is None and matches(element):
+                    self.authors[index] = element
+
+    def _collect_meta(self, element):
+        """Keeps the first meta tag for every property/name (like soup.find)"""
+        content = element.get('content')
+        for key in (element.get('property'), element.get('name')):
+            if key and key not in self.meta:
+                self.meta[key] = content
+
+
+def extract_title(page):
+    """Title: first long h1, then og:title, then <title> without the site suffix"""
+    for text in page.h1_texts:
+        if text and len(text) > 10:
+            return text
+
+    og_title = page.meta.get('og:title')
+    if og_title:
+        return og_title.strip()
+
+    if page.title_text is not None:
+        title = TITLE_SUFFIX_RE.sub('', page.title_text.strip())
+        if title:
+            return title
+
+    return "Unknown title"
+
+
+def extract_content(page, is_meaningful_paragraph):
+    """Content with the same four strategies as the BeautifulSoup path"""
+
+    # Strategy 1: Main containers
+    for index, (selector, _) in enumerate(MAIN_CONTAINER_SELECTORS):
+        if page.containers[index] is None:
+            continue
+
+        content = _join_paragraphs(
+            [text for text, containers in page.paragraphs if index in containers],
+            is_meaningful_paragraph
+        )
+        if len(content) > 200:
+            print(f"✅ Extracted {len(content)} chars from {selector}")
+            return content
+
+    # Strategy 2: All <p> tags
+    if page.paragraphs:
+        content = _join_paragraphs([text for text, _ in page.paragraphs], is_meaningful_paragraph)
+        if len(content) > 100:
+            print(f"✅ Extracted {len(content)} chars from all <p> tags")
+            return content
+
+    # Strategy 3: Div containers
+    meaningful_text = []
+    for div in page.divs:
+        direct_text = _text_content(div).strip()
+        if 50 < len(direct_text) < 1000:
+            meaningful_text.append(direct_text)
+            if len(meaningful_text) == 10:
+                break
+
+    if meaningful_text:
+        content = '\n\n'.join(meaningful_text)
+        if len(content) > 100:
+            print(f"✅ Extracted {len(content)} chars from div containers")
+            return content
+
+    # Strategy 4: Fallback
+    if page.body is not None:
+        for unwanted in list(page.body.iter(*FALLBACK_REMOVED_TAGS)):
+            unwanted.drop_tree()
+
+        body_text = _text_content(page.body)
+        lines = [line.strip() for line in body_text.split('\n') if line.strip()]
+        content = '\n'.join(lines[:50])
+
+        if len(content) > 100:
+            print(f"✅ Fallback extracted {len(content)} chars from body")
+            return content
+
+    print("❌ Failed to extract content")
+    return "Content cannot be extracted"
+
+
+def _join_paragraphs(texts, is_meaningful_paragraph):
+    return '\n\n'.join(text for text in texts if is_meaningful_paragraph(text))
+
+
+def extract_date(page):
+    """Date: article:published_time, then <time datetime>, then the canonical URL"""
+    published = page.meta.get('article:published_time')
+    if published:
+        try:
+            return datetime.fromisoformat(published.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+        except ValueError:
+            pass
+
+    for datetime_attr in page.time_datetimes:
+        try:
+            return datetime.fromisoformat(datetime_attr.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+        except ValueError:
+            pass
+
+    if page.canonical_href is not None:
+        url_date_match = URL_DATE_RE.search(page.canonical_href)
+        if url_date_match:
+            year, month, day = url_date_match.groups()
+            return f"{year}-{month}-{day}"
+
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def extract_author(page):
+    """Author: meta author, then the first element of each author selector"""
+    author_meta = page.meta.get('author')
+    if author_meta:
+        return author_meta.strip()
+
+    for element in page.authors:
+        if element is not None:
+            author_text = _text_content(element).strip()
+            if author_text and len(author_text) < 100:
+                return author_text
+
+    return "Unknown author"
+
+
+def parse_article(raw_html, is_meaningful_paragraph):
+    """Parses a page once and returns its title, content, date and author"""
+    page = ArticlePage(raw_html)
+
+    return {
+        'title': extract_title(page),
+        'content': extract_content(page, is_meaningful_paragraph),
+        'date': extract_date(page),
+        'author': extract_author(page),
+    }
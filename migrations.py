@@ -0,0 +1,266 @@
+"""
+Versioned schema changes for both database backends.
+
+init_database() creates the base tables and then applies every migration
+whose version is not yet in the schema_migrations table, in order.
+Optional migrations (e.g. ones that need a PostgreSQL extension) are
+skipped with a warning when they fail and retried on the next start.
+
+Run this file to check that the hot queries use the intended indexes
+(query-plan regression test on SQLite, and on PostgreSQL if reachable).
+"""
+
+import sys
+from collections import namedtuple
+
+Migration = namedtuple('Migration', ['version', 'name', 'statements', 'optional'], defaults=[False])
+
+SCHEMA_MIGRATIONS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+SQLITE_MIGRATIONS = [
+    Migration(1, 'indexes_for_hot_queries', [
+        # Duplicates of the UNIQUE(url) autoindexes
+        'DROP INDEX IF EXISTS idx_articles_url',
+        'DROP INDEX IF EXISTS idx_scraped_urls_url',
+        # A boolean index only helps the rare side; replaced by the partial indexes below
+        'DROP INDEX IF EXISTS idx_articles_processed',
+        # iter_unprocessed_articles(): keyset pages ordered by (scraped_at, id), count of unanalyzed
+        'CREATE INDEX IF NOT EXISTS idx_articles_unprocessed ON articles(scraped_at DESC, id DESC) '
+        'WHERE processed = FALSE',
+        # cleanup_old_analyzed_articles(): analyzed before a cutoff
+        'CREATE INDEX IF NOT EXISTS idx_articles_analyzed_at ON articles(analyzed_at) WHERE processed = TRUE',
+    ]),
+    # Typed publish date (URL date, else the page's date, else the scrape day); published_on_for() is
+    # registered as an SQL function on every connection
+    Migration(2, 'published_on_date', [
+        'ALTER TABLE articles ADD COLUMN published_on DATE',
+        'UPDATE articles SET published_on = published_on_for(url, published_date, scraped_at) '
+        'WHERE published_on IS NULL',
+        'CREATE INDEX IF NOT EXISTS idx_articles_published_on ON articles(published_on)',
+    ]),
+]
+
+POSTGRES_MIGRATIONS = [
+    Migration(1, 'indexes_for_hot_queries', [
+        # Duplicates of the UNIQUE(url) constraint indexes
+        'DROP INDEX IF EXISTS idx_articles_url',
+        'DROP INDEX IF EXISTS idx_scraped_urls_url',
+        # A boolean index only helps the rare side; replaced by the partial indexes below
+        'DROP INDEX IF EXISTS idx_articles_is_analyzed',
+        # iter_unprocessed_articles(): keyset pages, index-only for id / title projections
+        'CREATE INDEX IF NOT EXISTS idx_articles_unanalyzed ON articles(scraped_at DESC, id DESC) '
+        'INCLUDE (title) WHERE is_analyzed = FALSE',
+        # retention.py batches: is_analyzed AND scraped_at < cutoff
+        'CREATE INDEX IF NOT EXISTS idx_articles_analyzed_scraped_at ON articles(scraped_at) '
+        'WHERE is_analyzed = TRUE',
+        # date-status: published_date = ...
+        'CREATE INDEX IF NOT EXISTS idx_articles_published_date ON articles(published_date)',
+    ]),
+    # date-status: url LIKE '%2025/06/10%' (needs the pg_trgm extension)
+    Migration(2, 'url_trigram_index', [
+        'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+        'CREATE INDEX IF NOT EXISTS idx_articles_url_trgm ON articles USING gin (url gin_trgm_ops)',
+    ], optional=True),
+    # Typed publish date (URL date, else the page's date, else the scrape day); date-status and
+    # retention use it instead of url LIKE / published_date text, and it is the partition key
+    Migration(3, 'published_on_date', [
+        'ALTER TABLE articles ADD COLUMN IF NOT EXISTS published_on DATE',
+        r"""
+        UPDATE articles SET published_on = COALESCE(
+            to_date(substring(url from '/(20\d{2}/\d{2}/\d{2})/'), 'YYYY/MM/DD'),
+            CASE WHEN published_date ~ '^\d{4}-\d{2}-\d{2}' THEN left(published_date, 10)::date END,
+            scraped_at::date,
+            CURRENT_DATE
+        )
+        WHERE published_on IS NULL
+        """,
+        'CREATE INDEX IF NOT EXISTS idx_articles_published_on ON articles(published_on)',
+        # Only served the old date-status query
+        'DROP INDEX IF EXISTS idx_articles_published_date',
+        'DROP INDEX IF EXISTS idx_articles_url_trgm',
+    ]),
+    # One row per article URL ever saved; unpartitioned, so URLs stay unique even when articles is
+    # partitioned (its unique constraints must include published_on). Kept after retention deletes.
+    Migration(4, 'article_urls_registry', [
+        'CREATE TABLE IF NOT EXISTS article_urls (url TEXT PRIMARY KEY, '
+        'created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)',
+        'INSERT INTO article_urls (url) SELECT url FROM articles ON CONFLICT (url) DO NOTHING',
+    ]),
+]
+
+
+def pending_migrations(migrations, applied_versions):
+    """Returns the migrations not applied yet, in version order"""
+    return sorted((m for m in migrations if m.version not in applied_versions), key=lambda m: m.version)
+
+
+def _sqlite_plan(conn, sql):
+    return ' | '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql).fetchall())
+
+
+def test_query_plans():
+    """Runs the hot SQLite queries through the real DatabaseManager methods and checks their plans"""
+    import contextlib
+    import io
+    import os
+    import tempfile
+
+    from sqlite_database import DatabaseManager
+
+    # (marker in the executed SQL, index the plan must use)
+    expectations = [
+        ('WHERE processed = FALSE\n', 'idx_articles_unprocessed'),
+        ('WHERE processed = FALSE AND (scraped_at, id) <', 'idx_articles_unprocessed'),
+        ('DELETE FROM articles', 'idx_articles_analyzed_at'),
+        ('SELECT url FROM scraped_urls WHERE url IN', 'sqlite_autoindex_scraped_urls_1'),
+        ('SELECT 1 FROM articles WHERE url =', 'sqlite_autoindex_articles_1'),
+        ('WHERE published_on =', 'idx_articles_published_on'),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        db = DatabaseManager(os.path.join(tmp, 'plans.db'), persistent=True)
+        with db.connection() as conn:
+            conn.executemany(
+                "INSERT INTO articles (url, title, content, scraped_at, processed) VALUES (?, ?, ?, ?, ?)",
+                [(f"https://example.com/{i}", f"Title {i}", 'Text', f"2025-06-{i % 28 + 1:02d} 10:00:00", i % 2)
+                 for i in range(2000)]
+            )
+            conn.execute("ANALYZE")
+
+            statements = []
+            conn.set_trace_callback(statements.append)
+
+        list(db.iter_unprocessed_articles(columns=['id', 'title'], batch_size=100, limit=250))
+        db.cleanup_old_analyzed_articles(days_to_keep=7)
+        db.get_scraped_urls(['https://example.com/1'])
+        db.is_article_exists('https://example.com/1')
+        db.count_articles_published_on('2025-06-10')
+
+        with db.connection() as conn:
+            conn.set_trace_callback(None)
+            results = []
+            for marker, index in expectations:
+                sql = next((s for s in statements if marker in s and not s.startswith('EXPLAIN')), None)
+                plan = _sqlite_plan(conn, sql) if sql else 'query not executed'
+                results.append((marker, index, plan))
+        db.close()
+
+    failures = 0
+    for marker, index, plan in results:
+        ok = index in plan
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {marker.strip()[:45]:<45} {plan}")
+
+    print("✅ All hot queries use their indexes" if not failures else f"❌ {failures} query plan(s) regressed")
+    return failures == 0
+
+
+def test_postgres_query_plans():
+    """Same check for PostgreSQL, in a scratch schema (skipped when the database is not reachable)"""
+    import contextlib
+    import io
+
+    try:
+        import psycopg2
+        import psycopg2.extensions
+        from postgres_database import PostgreSQLConnectionPool, PostgreSQLDatabaseManager
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = PostgreSQLDatabaseManager()
+    except Exception as e:
+        print(f"⚠️ PostgreSQL not available, plan check skipped ({e})")
+        return None
+
+    statements = []
+
+    class TracingConnection(psycopg2.extensions.connection):
+        """Records every statement the manager executes, with its parameters filled in"""
+
+        def cursor(self, *args, **kwargs):
+            base = kwargs.pop('cursor_factory', None) or self.cursor_factory or psycopg2.extensions.cursor
+
+            class TracingCursor(base):
+                def execute(self, query, vars=None):
+                    statements.append(self.mogrify(query, vars).decode())
+                    return super().execute(query, vars)
+
+            return super().cursor(*args, cursor_factory=TracingCursor, **kwargs)
+
+    # (marker in the executed SQL, index the plan must use)
+    expectations = [
+        ('WHERE is_analyzed = FALSE\n', 'idx_articles_unanalyzed'),
+        ('WHERE is_analyzed = FALSE AND (scraped_at, id) <', 'idx_articles_unanalyzed'),
+        ('DELETE FROM articles WHERE ctid', 'idx_articles_analyzed_scraped_at'),
+        ('SELECT url FROM scraped_urls WHERE url = ANY', 'scraped_urls_url_key'),
+        ('WHERE published_on =', 'idx_articles_published_on'),
+    ]
+
+    schema = 'query_plan_test'
+    schema_config = dict(db.db_config, options=f"-c search_path={schema}")
+    with db.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {schema}")
+    db.pool.closeall()
+    db.pool = PostgreSQLConnectionPool(dict(schema_config, connection_factory=TracingConnection), max_size=2)
+
+    results = []
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.init_database()
+            with db.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute('''
+                        INSERT INTO articles (url, title, content, scraped_at, is_analyzed, published_on)
+                        SELECT 'https://example.com/' || i, 'Title ' || i, 'Text',
+                               TIMESTAMP '2025-06-01' + i * INTERVAL '1 hour', i % 2 = 0, DATE '2025-06-01' + i % 28
+                        FROM generate_series(1, 2000) AS i
+                    ''')
+                    cursor.execute("ANALYZE articles")
+            del statements[:]
+
+            list(db.iter_unprocessed_articles(columns=['id', 'title'], batch_size=100, limit=250))
+            db.cleanup_old_analyzed_articles(days_to_keep=7)
+            db.get_scraped_urls(['https://example.com/1'])
+            db.count_articles_published_on('2025-06-10')
+
+        with psycopg2.connect(**schema_config) as conn:
+            with conn.cursor() as cursor:
+                # Tiny test tables would always be scanned; this asks whether an index CAN serve the query
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                for marker, index in expectations:
+                    sql = next((s for s in statements if marker in s), None)
+                    plan = 'query not executed'
+                    if sql:
+                        cursor.execute('EXPLAIN ' + sql)
+                        plan = ' '.join(row[0].strip() for row in cursor.fetchall())
+                    results.append((marker, index, plan))
+            conn.rollback()
+        conn.close()
+    finally:
+        db.pool.closeall()
+        with psycopg2.connect(**db.db_config) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        conn.close()
+
+    failures = 0
+    for marker, index, plan in results:
+        ok = index in plan
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {marker.strip()[:45]:<45} {index if ok else plan}")
+
+    print("✅ All hot queries use their indexes" if not failures else f"❌ {failures} query plan(s) regressed")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    sqlite_ok = test_query_plans()
+    postgres_ok = test_postgres_query_plans()
+    # A plan that lost its index fails the run (None = PostgreSQL skipped)
+    sys.exit(0 if sqlite_ok and postgres_ok is not False else 1)
@@ -0,0 +1,183 @@
+"""
+Two-stage scraping pipeline: network fetch and HTML parsing run separately.
+
+Fetcher threads download raw HTML and push (index, url, bytes) onto a
+bounded queue. A ProcessPoolExecutor runs the CoinDeskArticleParser extraction
+methods on those bytes, so parsing uses every core instead of sharing the
+GIL with the fetchers. The calling thread is the single DB writer: it
+consumes parse results in link order and saves them in batches.
+"""
+
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from config import SCRAPING_CONFIG
+
+# Marks the end of the fetch stage on the queue
+_FETCH_DONE = object()
+
+# Parser instance owned by each parse worker process
+_worker_parser = None
+
+
+def _init_parse_worker(parser_engine=None):
+    """Creates the parser once per worker process
+
+    The engine comes from the parent through initargs: spawn-started workers
+    re-import config and would not see a runtime override otherwise.
+    """
+    global _worker_parser
+    from scraper import CoinDeskArticleParser
+
+    if parser_engine:
+        SCRAPING_CONFIG['parser_engine'] = parser_engine
+
+    _worker_parser = CoinDeskArticleParser()
+
+
+def parse_article_worker(url, raw_html):
+    """Runs the extraction methods on raw HTML inside a worker process"""
+    try:
+        return _worker_parser.build_article_data(url, raw_html)
+    except Exception as e:
+        print(f"❌ Error parsing {url}: {str(e)}")
+        return None
+
+
+def iter_parsed_pages(pages, parse_workers=None, parser_engine=None):
+    """Parses (url, raw_html) pairs in a process pool; yields (url, article_data) in input order
+
+    At most a few pages per worker are in flight, so memory stays flat for large corpora.
+    """
+    parse_workers = parse_workers or SCRAPING_CONFIG['parse_workers'] or os.cpu_count() or 1
+    max_in_flight = parse_workers * 4
+    in_flight = deque()
+
+    with ProcessPoolExecutor(max_workers=parse_workers, initializer=_init_parse_worker,
+                             initargs=(parser_engine or SCRAPING_CONFIG['parser_engine'],)) as pool:
+        for url, raw_html in pages:
+            in_flight.append((url, pool.submit(parse_article_worker, url, raw_html)))
+
+            if len(in_flight) >= max_in_flight:
+                url, future = in_flight.popleft()
+                yield url, future.result()
+
+        while in_flight:
+            url, future = in_flight.popleft()
+            yield url, future.result()
+
+
+class ScrapePipeline:
+    def __init__(self, scraper, fetch_workers=None, parse_workers=None, write_batch_size=None):
+        """Initializes the pipeline around an existing CoinDeskScraper"""
+        self.scraper = scraper
+        self.fetch_workers = fetch_workers or SCRAPING_CONFIG['max_workers']
+        self.parse_workers = parse_workers or SCRAPING_CONFIG['parse_workers'] or os.cpu_count() or 1
+        self.write_batch_size = write_batch_size or SCRAPING_CONFIG['db_write_batch_size']
+
+    def run(self, article_links, save_to_db=True):
+        """Fetches, parses and saves the given links; returns article_data in link order"""
+        urls = [link['url'] for link in article_links]
+        print(f"⚙️ Pipeline: {self.fetch_workers} fetch thread(s), {self.parse_workers} parse process(es)")
+
+        raw_queue = queue.Queue(maxsize=self.fetch_workers * 4)
+        stop = threading.Event()
+        fetch_thread = threading.Thread(
+            target=self._fetch_stage, args=(urls, raw_queue, stop), daemon=True
+        )
+        fetch_thread.start()
+
+        try:
+            articles = self._parse_and_write(len(urls), self._iter_queue(raw_queue), save_to_db)
+        except BaseException:
+            # The consumer is gone (BrokenProcessPool, a failed write, Ctrl+C): stop the
+            # fetchers and empty the queue so none of them stays blocked on put()
+            stop.set()
+            while fetch_thread.is_alive():
+                try:
+                    raw_queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            raise
+
+        fetch_thread.join()
+        return articles
+
+    def _fetch_stage(self, urls, raw_queue, stop):
+        """Downloads every URL with a thread pool and pushes the raw bytes onto the queue"""
+
+        def fetch(index, url):
+            if stop.is_set():
+                return
+            try:
+                raw_html = self.scraper.fetch_article_html(url)
+            except Exception as e:
+                print(f"❌ Error fetching {url}: {str(e)}")
+                raw_html = None
+            raw_queue.put((index, url, raw_html))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+                for index, url in enumerate(urls):
+                    executor.submit(fetch, index, url)
+        finally:
+            raw_queue.put(_FETCH_DONE)
+
+    @staticmethod
+    def _iter_queue(raw_queue):
+        while True:
+            item = raw_queue.get()
+            if item is _FETCH_DONE:
+                return
+            yield item
+
+    def _parse_and_write(self, total, raw_items, save_to_db):
+        """Submits raw pages to the process pool and writes results in index order"""
+        results = [None] * total
+        pending = {}
+        next_index = 0
+        write_buffer = []
+
+        def drain(block):
+            nonlocal next_index
+            while next_index in pending:
+                future = pending[next_index]
+                if future is not None and not block and not future.done():
+                    return
+
+                article_data = future.result() if future is not None else None
+                del pending[next_index]
+                results[next_index] = article_data
+
+                if article_data:
+                    if save_to_db:
+                        write_buffer.append(article_data)
+                        if len(write_buffer) >= self.write_batch_size:
+                            self._flush(write_buffer)
+                else:
+                    print(f"❌ Failed to extract article {next_index + 1}")
+
+                next_index += 1
+                if next_index % 5 == 0:
+                    print(f"📊 Progress: {next_index}/{total} articles processed")
+
+        with ProcessPoolExecutor(max_workers=self.parse_workers, initializer=_init_parse_worker,
+                                 initargs=(SCRAPING_CONFIG['parser_engine'],)) as pool:
+            for index, url, raw_html in raw_items:
+                pending[index] = pool.submit(parse_article_worker, url, raw_html) if raw_html else None
+                drain(block=False)
+
+            drain(block=True)
+
+        if save_to_db and write_buffer:
+            self._flush(write_buffer)
+
+        return [article_data for article_data in results if article_data]
+
+    def _flush(self, write_buffer):
+        """Saves the buffered articles with the bulk insert path"""
+        self.scraper.db.save_multiple_articles(list(write_buffer))
+        write_buffer.clear()
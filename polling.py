@@ -0,0 +1,93 @@
+"""
+Long-running watch mode for the scrapers.
+
+One process keeps both scrapers (HTTP sessions, rate limiter, DB
+connections) alive and polls the main page and the latest-news feed.
+AdaptivePollSchedule drops back to the shortest interval as soon as a poll
+finds new articles and stretches the interval after every quiet poll.
+"""
+
+import random
+import time
+
+from config import WATCH_CONFIG
+
+
+class AdaptivePollSchedule:
+    def __init__(self, min_interval=None, max_interval=None, backoff_factor=None, jitter=None):
+        """Initializes the schedule (values default to WATCH_CONFIG)"""
+        self.min_interval = min_interval or WATCH_CONFIG['min_interval']
+        self.max_interval = max(max_interval or WATCH_CONFIG['max_interval'], self.min_interval)
+        self.backoff_factor = backoff_factor or WATCH_CONFIG['backoff_factor']
+        self.jitter = WATCH_CONFIG['jitter'] if jitter is None else jitter
+        self.interval = self.min_interval
+
+    def record_poll(self, new_articles):
+        """Adjusts the interval after a poll; returns the new base interval"""
+        if new_articles > 0:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+        return self.interval
+
+    def next_delay(self):
+        """Seconds to sleep before the next poll (base interval with jitter)"""
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def watch(main_scraper=None, latest_scraper=None, schedule=None, date_filter='today',
+          limit=10, max_polls=None):
+    """Polls the sources until interrupted (or max_polls); returns a summary dict
+
+    main_scraper: CoinDeskScraper for the main page (None = skip)
+    latest_scraper: CoinDeskLatestNewsScraper for latest-crypto-news (None = skip)
+    """
+    schedule = schedule or AdaptivePollSchedule()
+    summary = {'polls': 0, 'new_articles': 0, 'errors': 0}
+
+    print(f"👀 Watching for new articles every {schedule.min_interval}-{schedule.max_interval}s "
+          f"(Ctrl+C to stop)")
+
+    try:
+        while max_polls is None or summary['polls'] < max_polls:
+            summary['polls'] += 1
+            print(f"\n🔄 Poll {summary['polls']} at {time.strftime('%H:%M:%S')}")
+            new_articles = 0
+
+            if latest_scraper:
+                try:
+                    new_articles += len(latest_scraper.scrape_articles_smart(
+                        date_filter=date_filter, limit=limit, save_to_db=True
+                    ))
+                except Exception as e:
+                    summary['errors'] += 1
+                    print(f"❌ Latest news poll failed: {str(e)}")
+
+            if main_scraper:
+                try:
+                    new_articles += len(main_scraper.scrape_multiple_articles(max_articles=limit, save_to_db=True))
+                except Exception as e:
+                    summary['errors'] += 1
+                    print(f"❌ Main page poll failed: {str(e)}")
+
+            summary['new_articles'] += new_articles
+            schedule.record_poll(new_articles)
+
+            # New month partitions for a long-running watch (throttled by the db manager)
+            for scraper in (latest_scraper, main_scraper):
+                if scraper and scraper.db:
+                    scraper.db.maintain_partitions()
+
+            if max_polls is not None and summary['polls'] >= max_polls:
+                break
+
+            delay = schedule.next_delay()
+            print(f"📰 {new_articles} new article(s), next poll in {delay:.0f}s")
+            time.sleep(delay)
+
+    except KeyboardInterrupt:
+        print("\n⏹️ Watch stopped")
+
+    print(f"📊 Watch summary: {summary['polls']} polls, {summary['new_articles']} new articles, "
+          f"{summary['errors']} errors")
+    return summary
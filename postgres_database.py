@@ -1,12 +1,178 @@
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 import json
-from datetime import datetime
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 import os
 
+from article_export import EXPORT_BATCH_SIZE, select_columns, write_articles
+from config import DATABASE_CONFIG, POSTGRES_POOL_CONFIG, POSTGRES_PARTITION_CONFIG, QUEUE_CONFIG
+from migrations import SCHEMA_MIGRATIONS_TABLE_SQL, POSTGRES_MIGRATIONS, pending_migrations
+from retention import PostgresRetention
+from url_classifier import published_on_for
+
+
+class PostgreSQLConnectionPool:
+    """Thread-safe psycopg2 connection pool with health checks and recycling"""
+
+    def __init__(self, db_config, min_size=1, max_size=10, max_lifetime=1800,
+                 health_check_after=30, acquire_timeout=30):
+        self.db_config = db_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+
+        # Idle connections as (connection, returned_at); creation times by id(connection)
+        self._idle = deque()
+        self._created_at = {}
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self.stats = {
+            'connections_created': 0,
+            'connections_recycled': 0,
+            'failed_health_checks': 0,
+            'borrows': 0,
+            'waits': 0,
+        }
+
+        for _ in range(min_size):
+            self._idle.append((self._new_connection(), time.monotonic()))
+
+    def _new_connection(self):
+        """Opens a new physical connection"""
+        conn = psycopg2.connect(**self.db_config)
+        with self._condition:
+            self._created_at[id(conn)] = time.monotonic()
+            self.stats['connections_created'] += 1
+        return conn
+
+    def _close_connection(self, conn):
+        """Closes a physical connection and forgets it"""
+        with self._condition:
+            self._created_at.pop(id(conn), None)
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _validate(self, conn, returned_at):
+        """Returns a usable connection: recycles old ones and pings ones idle for too long"""
+        now = time.monotonic()
+        created_at = self._created_at.get(id(conn), now)
+
+        if conn.closed or now - created_at > self.max_lifetime:
+            self._close_connection(conn)
+            with self._condition:
+                self.stats['connections_recycled'] += 1
+            return self._new_connection()
+
+        if now - returned_at > self.health_check_after:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                conn.rollback()
+            except psycopg2.Error:
+                self._close_connection(conn)
+                with self._condition:
+                    self.stats['failed_health_checks'] += 1
+                return self._new_connection()
+
+        return conn
+
+    def getconn(self):
+        """Borrows a connection, waiting up to acquire_timeout if the pool is exhausted"""
+        deadline = time.monotonic() + self.acquire_timeout
+
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise psycopg2.pool.PoolError("connection pool is closed")
+
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+
+                if self._in_use + len(self._idle) < self.max_size:
+                    conn, returned_at = None, None
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise psycopg2.pool.PoolError(
+                        f"connection pool exhausted ({self.max_size} connections in use)")
+
+                self.stats['waits'] += 1
+                self._condition.wait(remaining)
+
+            self._in_use += 1
+            self.stats['borrows'] += 1
+
+        try:
+            if conn is None:
+                return self._new_connection()
+            return self._validate(conn, returned_at)
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+    def putconn(self, conn, discard=False):
+        """Returns a borrowed connection to the pool"""
+        if not discard and not conn.closed:
+            try:
+                # Never hand out a connection with an open transaction
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        if discard or conn.closed or self._closed:
+            self._close_connection(conn)
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            return
+
+        with self._condition:
+            self._in_use -= 1
+            self._idle.append((conn, time.monotonic()))
+            self._condition.notify()
+
+    def closeall(self):
+        """Closes every idle connection; borrowed ones are closed when returned"""
+        with self._condition:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for conn in idle:
+            self._close_connection(conn)
+
+    def get_stats(self):
+        """Returns pool usage statistics"""
+        with self._condition:
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                **self.stats,
+            }
+
 
 class PostgreSQLDatabaseManager:
-        def __init__(self):
+        def __init__(self, pool_min_size=None, pool_max_size=None):
             print("🐘 Connecting to PostgreSQL...")
 
             # Database configuration
@@ -20,7 +186,20 @@ class PostgreSQLDatabaseManager:
 
             # Test the connection
             self._test_connection()
+
+            # Shared connection pool for all methods
+            self.pool = PostgreSQLConnectionPool(
+                self.db_config,
+                min_size=pool_min_size or POSTGRES_POOL_CONFIG['min_size'],
+                max_size=pool_max_size or POSTGRES_POOL_CONFIG['max_size'],
+                max_lifetime=POSTGRES_POOL_CONFIG['max_lifetime'],
+                health_check_after=POSTGRES_POOL_CONFIG['health_check_after'],
+                acquire_timeout=POSTGRES_POOL_CONFIG['acquire_timeout']
+            )
+
             self.init_database()
+            # init_database() has just created the upcoming partitions
+            self._partitions_maintained_at = time.monotonic()
             print("✅ PostgreSQL ready!")
 
         def _test_connection(self):
@@ -34,12 +213,33 @@ class PostgreSQLDatabaseManager:
                 raise
 
         def get_connection(self):
-            """Returns a new connection to the database"""
+            """Returns a new (unpooled) connection to the database"""
             return psycopg2.connect(**self.db_config)
 
+        @contextmanager
+        def connection(self):
+            """Borrows a pooled connection; commits on success, rolls back on error"""
+            conn = self.pool.getconn()
+            discard = False
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+                raise
+            finally:
+                self.pool.putconn(conn, discard=discard)
+
+        def close(self):
+            """Closes all pooled connections"""
+            self.pool.closeall()
+
         def init_database(self):
             """Creates tables for database A (articles for scraping)"""
-            with self.get_connection() as conn:
+            with self.connection() as conn:
                 with conn.cursor() as cursor:
                     # Articles table
                     cursor.execute('''
@@ -52,10 +252,16 @@ class PostgreSQLDatabaseManager:
                             published_date TEXT,
                             scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                             content_length INTEGER,
-                            is_analyzed BOOLEAN DEFAULT FALSE
+                            is_analyzed BOOLEAN DEFAULT FALSE,
+                            analyzed_at TIMESTAMP NULL,
+                            sentiment_result TEXT NULL
                         )
                     ''')
 
+                    # Columns added after the first release
+                    cursor.execute('ALTER TABLE articles ADD COLUMN IF NOT EXISTS analyzed_at TIMESTAMP NULL')
+                    cursor.execute('ALTER TABLE articles ADD COLUMN IF NOT EXISTS sentiment_result TEXT NULL')
+
                     # Scraped URLs table (to avoid duplicates)
                     cursor.execute('''
                         CREATE TABLE IF NOT EXISTS scraped_urls (
@@ -67,101 +273,356 @@ class PostgreSQLDatabaseManager:
                         )
                     ''')
 
-                    # Indexes for faster queries
-                    cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_url ON articles(url)')
-                    cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_is_analyzed ON articles(is_analyzed)')
-                    cursor.execute('CREATE INDEX IF NOT EXISTS idx_scraped_urls_url ON scraped_urls(url)')
+                    # Crawl watermark per listing feed (newest article seen by the last complete run)
+                    cursor.execute('''
+                        CREATE TABLE IF NOT EXISTS crawl_state (
+                            feed TEXT PRIMARY KEY,
+                            newest_url TEXT NOT NULL,
+                            newest_published_date TEXT,
+                            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )
+                    ''')
+
+                    # Work queue: discovered URLs waiting to be fetched (shared by worker processes)
+                    cursor.execute('''
+                        CREATE TABLE IF NOT EXISTS pending_urls (
+                            id SERIAL PRIMARY KEY,
+                            url TEXT UNIQUE NOT NULL,
+                            title TEXT,
+                            source TEXT,
+                            status TEXT NOT NULL DEFAULT 'discovered',
+                            attempts INTEGER NOT NULL DEFAULT 0,
+                            lease_owner TEXT,
+                            lease_expires_at TIMESTAMP NULL,
+                            last_error TEXT,
+                            url_hash BIGINT,
+                            discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )
+                    ''')
+
+                    # Queues created before sharding have no url_hash (those rows stay claimable by any shard)
+                    cursor.execute('ALTER TABLE pending_urls ADD COLUMN IF NOT EXISTS url_hash BIGINT')
+
+                    # Live scraper workers sharing this database (heartbeats decide the shard assignment)
+                    cursor.execute('''
+                        CREATE TABLE IF NOT EXISTS scrape_workers (
+                            worker_id TEXT PRIMARY KEY,
+                            hostname TEXT,
+                            pid INTEGER,
+                            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            heartbeat_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )
+                    ''')
+
+                    # Indexes for faster queries (article indexes: see migrations.py)
+                    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pending_urls_status ON pending_urls(status, id)')
+
+                    self._apply_migrations(cursor)
+
+                    # Optional monthly partitions of articles (by published_on)
+                    if POSTGRES_PARTITION_CONFIG['enabled']:
+                        if not self._articles_partitioned(cursor):
+                            self._partition_articles_by_month(cursor)
+                        self._ensure_article_partitions(cursor, POSTGRES_PARTITION_CONFIG['months_ahead'])
 
                     print("✅ Tables for database A created")
                     conn.commit()
 
+        def _apply_migrations(self, cursor):
+            """Applies the pending POSTGRES_MIGRATIONS and records them in schema_migrations"""
+            cursor.execute(SCHEMA_MIGRATIONS_TABLE_SQL)
+            cursor.execute("SELECT version FROM schema_migrations")
+            applied = {row[0] for row in cursor.fetchall()}
+
+            for migration in pending_migrations(POSTGRES_MIGRATIONS, applied):
+                cursor.execute("SAVEPOINT migration")
+                try:
+                    for statement in migration.statements:
+                        cursor.execute(statement)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                        (migration.version, migration.name)
+                    )
+                except psycopg2.Error as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT migration")
+                    if not migration.optional:
+                        raise
+                    print(f"⚠️ Optional migration {migration.version} ({migration.name}) skipped: {e}")
+                    continue
+
+                cursor.execute("RELEASE SAVEPOINT migration")
+                print(f"🔧 Applied migration {migration.version}: {migration.name}")
+
+        def _articles_partitioned(self, cursor):
+            """Checks if articles is a partitioned table"""
+            cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass('articles')")
+            row = cursor.fetchone()
+            return bool(row) and row[0] == 'p'
+
+        def _create_month_partition(self, cursor, parent, month_start):
+            """Creates the partition for one month (articles_yYYYYmMM) if it does not exist
+
+            Rows of that month already in articles_default would make CREATE ... PARTITION OF
+            fail, so they are moved into the new table before it is attached.
+            """
+            name = f"articles_y{month_start:%Y}m{month_start:%m}"
+            next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            bounds = (month_start.isoformat(), next_month.isoformat())
+
+            cursor.execute("SELECT to_regclass(%s), to_regclass('articles_default')", (name,))
+            existing, default_partition = cursor.fetchone()
+            if existing:
+                return
+
+            if default_partition is None:
+                cursor.execute(f"CREATE TABLE {name} PARTITION OF {parent} FOR VALUES FROM (%s) TO (%s)", bounds)
+                return
+
+            cursor.execute(f"CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)")
+            cursor.execute(f'''
+                WITH moved AS (
+                    DELETE FROM articles_default WHERE published_on >= %s AND published_on < %s RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+            ''', bounds)
+            if cursor.rowcount:
+                print(f"   📦 {cursor.rowcount} articles moved from articles_default to {name}")
+            cursor.execute(f"ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", bounds)
+
+        def _ensure_article_partitions(self, cursor, months_ahead):
+            """Creates the partitions for this month and the next months_ahead months"""
+            month_start = date.today().replace(day=1)
+            for _ in range(months_ahead + 1):
+                self._create_month_partition(cursor, 'articles', month_start)
+                month_start = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+        def maintain_partitions(self, force=False):
+            """Creates the upcoming month partitions (at most every maintenance_interval seconds)
+
+            Long-running watch / worker processes call this, so new articles never pile
+            up in articles_default once the months created at startup run out.
+            """
+            if not POSTGRES_PARTITION_CONFIG['enabled']:
+                return False
+
+            now = time.monotonic()
+            if not force and now - self._partitions_maintained_at < POSTGRES_PARTITION_CONFIG['maintenance_interval']:
+                return False
+
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        if self._articles_partitioned(cursor):
+                            self._ensure_article_partitions(cursor, POSTGRES_PARTITION_CONFIG['months_ahead'])
+                self._partitions_maintained_at = now
+                return True
+            except psycopg2.Error as e:
+                print(f"❌ Partition maintenance error: {e}")
+                return False
+
+        def _partition_articles_by_month(self, cursor):
+            """One-time conversion of articles into a table partitioned by month of published_on
+
+            UNIQUE(url) becomes UNIQUE(url, published_on) (unique constraints must contain
+            the partition key); URL uniqueness is kept by the unpartitioned article_urls
+            table that every save goes through. The id sequence and the secondary indexes
+            are carried over.
+            """
+            print("🔧 Converting articles into monthly partitions...")
+            cursor.execute('''
+                CREATE TABLE articles_partitioned (
+                    id INTEGER NOT NULL,
+                    url TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    author TEXT,
+                    published_date TEXT,
+                    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    content_length INTEGER,
+                    is_analyzed BOOLEAN DEFAULT FALSE,
+                    analyzed_at TIMESTAMP NULL,
+                    sentiment_result TEXT NULL,
+                    published_on DATE NOT NULL DEFAULT CURRENT_DATE,
+                    PRIMARY KEY (id, published_on),
+                    UNIQUE (url, published_on)
+                ) PARTITION BY RANGE (published_on)
+            ''')
+
+            cursor.execute("SELECT MIN(published_on) FROM articles")
+            first_day = cursor.fetchone()[0] or date.today()
+            month_start = first_day.replace(day=1)
+            while month_start <= date.today():
+                self._create_month_partition(cursor, 'articles_partitioned', month_start)
+                month_start = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            # Dates beyond the created months (e.g. a wrong future date) land here
+            cursor.execute("CREATE TABLE articles_default PARTITION OF articles_partitioned DEFAULT")
+
+            cursor.execute('''
+                INSERT INTO articles_partitioned
+                (id, url, title, content, author, published_date, scraped_at, content_length,
+                 is_analyzed, analyzed_at, sentiment_result, published_on)
+                SELECT id, url, title, content, author, published_date, scraped_at, content_length,
+                       is_analyzed, analyzed_at, sentiment_result, COALESCE(published_on, CURRENT_DATE)
+                FROM articles
+            ''')
+            print(f"   📦 {cursor.rowcount} articles copied")
+
+            # Secondary indexes (not the constraint ones) are recreated on the new table
+            cursor.execute('''
+                SELECT indexdef FROM pg_indexes
+                WHERE schemaname = current_schema() AND tablename = 'articles'
+                AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = 'articles'::regclass)
+            ''')
+            index_definitions = [row[0] for row in cursor.fetchall()]
+
+            # Keep the id sequence when the old table is dropped
+            cursor.execute("SELECT pg_get_serial_sequence('articles', 'id')")
+            id_sequence = cursor.fetchone()[0]
+            cursor.execute(f"ALTER TABLE articles_partitioned ALTER COLUMN id SET DEFAULT nextval('{id_sequence}')")
+            cursor.execute(f"ALTER SEQUENCE {id_sequence} OWNED BY articles_partitioned.id")
+
+            cursor.execute("DROP TABLE articles")
+            cursor.execute("ALTER TABLE articles_partitioned RENAME TO articles")
+
+            cursor.execute("SELECT current_schema()")
+            old_target = f" ON {cursor.fetchone()[0]}.articles "
+            for definition in index_definitions:
+                cursor.execute(definition.replace(old_target, ' ON articles '))
+
+            print("✅ articles is now partitioned by month")
+
         def save_article(self, article_data):
             try:
-                with self.get_connection() as conn:
+                with self.connection() as conn:
                     with conn.cursor() as cursor:
-                        # Check if article already exists
-                        cursor.execute("SELECT 1 FROM articles WHERE url = %s", (article_data['url'],))
-                        if cursor.fetchone():
+                        # Claim the URL; article_urls keeps URLs unique even on a partitioned articles table
+                        cursor.execute(
+                            "INSERT INTO article_urls (url) VALUES (%s) ON CONFLICT (url) DO NOTHING RETURNING url",
+                            (article_data['url'],)
+                        )
+                        if not cursor.fetchone():
                             print(f"⚠️ Article already exists: {article_data['title'][:50]}...")
                             return False
 
                         # Save the article
                         cursor.execute('''
                             INSERT INTO articles 
-                            (url, title, content, author, published_date, content_length)
-                            VALUES (%s, %s, %s, %s, %s, %s)
+                            (url, title, content, author, published_date, content_length, published_on)
+                            VALUES (%s, %s, %s, %s, %s, %s, %s)
                         ''', (
                             article_data['url'],
                             article_data['title'],
                             article_data['content'],
                             article_data['author'],
                             str(article_data['date']),
-                            article_data['content_length']
+                            article_data['content_length'],
+                            published_on_for(article_data['url'], article_data['date'])
                         ))
 
+                        # Record URL history in the same transaction
+                        cursor.execute('''
+                            INSERT INTO scraped_urls (url) 
+                            VALUES (%s)
+                            ON CONFLICT (url) 
+                            DO UPDATE SET 
+                                last_seen_at = CURRENT_TIMESTAMP,
+                                scrape_count = scraped_urls.scrape_count + 1
+                        ''', (article_data['url'],))
+
                         conn.commit()
                         print(f"✅ Saved article: {article_data['title'][:50]}...")
-
-                        # ADD THIS LINE:
-                        self.record_scraped_url(article_data['url'])
-
                         return True
 
             except psycopg2.Error as e:
                 print(f"❌ Save error: {e}")
                 return False
 
-
-            except psycopg2.Error as e:
-                print(f"❌ Save error: {e}")
-                return False
-
         def save_multiple_articles(self, articles):
-            """Saves multiple articles at once (faster)"""
+            """Saves multiple articles with one bulk INSERT (plus one URL history UPSERT)"""
             print(f"💾 Saving {len(articles)} articles...")
 
             saved_count = 0
             duplicate_count = 0
 
+            rows = [(
+                article['url'],
+                article['title'],
+                article['content'],
+                article['author'],
+                str(article['date']),
+                article['content_length'],
+                published_on_for(article['url'], article['date'])
+            ) for article in articles]
+
+            if not rows:
+                return saved_count, duplicate_count
+
             try:
-                with self.get_connection() as conn:
+                with self.connection() as conn:
                     with conn.cursor() as cursor:
+                        # Claim the URLs in article_urls (unique even when articles is partitioned);
+                        # only the URLs claimed here are new articles
+                        claimed = psycopg2.extras.execute_values(cursor, '''
+                            INSERT INTO article_urls (url)
+                            VALUES %s
+                            ON CONFLICT (url) DO NOTHING
+                            RETURNING url
+                        ''', [(url,) for url in dict.fromkeys(row[0] for row in rows)], page_size=1000, fetch=True)
+                        new_urls = {row[0] for row in claimed}
 
-                        for article in articles:
-                            # Check for duplicate articles
-                            cursor.execute("SELECT 1 FROM articles WHERE url = %s", (article['url'],))
-                            if cursor.fetchone():
-                                duplicate_count += 1
-                                continue
+                        # First occurrence of each new URL (the batch itself may repeat a URL)
+                        new_rows = []
+                        for row in rows:
+                            if row[0] in new_urls:
+                                new_urls.discard(row[0])
+                                new_rows.append(row)
 
-                            # Save the article
-                            cursor.execute('''
+                        inserted = []
+                        if new_rows:
+                            inserted = psycopg2.extras.execute_values(cursor, '''
                                 INSERT INTO articles 
-                                (url, title, content, author, published_date, content_length)
-                                VALUES (%s, %s, %s, %s, %s, %s)
-                            ''', (
-                                article['url'],
-                                article['title'],
-                                article['content'],
-                                article['author'],
-                                str(article['date']),
-                                article['content_length']
-                            ))
-
-                            saved_count += 1
+                                (url, title, content, author, published_date, content_length, published_on)
+                                VALUES %s
+                                RETURNING url
+                            ''', new_rows, page_size=1000, fetch=True)
+
+                        # URL history for every article, in the same transaction
+                        urls = list(dict.fromkeys(article['url'] for article in articles))
+                        psycopg2.extras.execute_values(cursor, '''
+                            INSERT INTO scraped_urls (url)
+                            VALUES %s
+                            ON CONFLICT (url)
+                            DO UPDATE SET
+                                last_seen_at = CURRENT_TIMESTAMP,
+                                scrape_count = scraped_urls.scrape_count + 1
+                        ''', [(url,) for url in urls], page_size=1000)
 
                         conn.commit()
 
+                        saved_count = len(inserted)
+                        duplicate_count = len(rows) - saved_count
+
             except psycopg2.Error as e:
                 print(f"❌ Save error: {e}")
 
             print(f"📊 Result: {saved_count} new articles, {duplicate_count} duplicates")
             return saved_count, duplicate_count
 
+        def is_article_exists(self, url):
+            """Checks if the article was saved before (article_urls also remembers articles removed by retention)"""
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT 1 FROM article_urls WHERE url = %s", (url,))
+                        return cursor.fetchone() is not None
+            except psycopg2.Error:
+                return False
+
         def is_url_scraped_before(self, url):
             """Checks if URL has been scraped before"""
             try:
-                with self.get_connection() as conn:
+                with self.connection() as conn:
                     with conn.cursor() as cursor:
                         cursor.execute("SELECT 1 FROM scraped_urls WHERE url = %s", (url,))
                         return cursor.fetchone() is not None
@@ -171,7 +632,7 @@ class PostgreSQLDatabaseManager:
         def record_scraped_url(self, url):
             """Records URL in history (so we don't scrape it again)"""
             try:
-                with self.get_connection() as conn:
+                with self.connection() as conn:
                     with conn.cursor() as cursor:
                         # PostgreSQL UPSERT syntax
                         cursor.execute('''
@@ -189,10 +650,445 @@ class PostgreSQLDatabaseManager:
                 print(f"❌ URL record error: {e}")
                 return False
 
+        def get_scraped_urls(self, urls):
+            """Returns the subset of URLs that have been scraped before (single query)"""
+            urls = list(dict.fromkeys(urls))
+            if not urls:
+                return set()
+
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT url FROM scraped_urls WHERE url = ANY(%s)", (urls,))
+                        return {row[0] for row in cursor.fetchall()}
+            except psycopg2.Error as e:
+                print(f"❌ URL check error: {e}")
+                return set()
+
+        def record_scraped_urls(self, urls):
+            """Records many URLs in history with a single UPSERT"""
+            urls = list(dict.fromkeys(urls))
+            if not urls:
+                return True
+
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        psycopg2.extras.execute_values(cursor, '''
+                            INSERT INTO scraped_urls (url)
+                            VALUES %s
+                            ON CONFLICT (url)
+                            DO UPDATE SET
+                                last_seen_at = CURRENT_TIMESTAMP,
+                                scrape_count = scraped_urls.scrape_count + 1
+                        ''', [(url,) for url in urls])
+
+                        conn.commit()
+                        return True
+            except psycopg2.Error as e:
+                print(f"❌ URL record error: {e}")
+                return False
+
+        def get_crawl_watermark(self, feed):
+            """Returns {'newest_url', 'newest_published_date'} for a listing feed or None"""
+            try:
+                with self.connection() as conn:
+                    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                        cursor.execute(
+                            "SELECT newest_url, newest_published_date FROM crawl_state WHERE feed = %s", (feed,)
+                        )
+                        row = cursor.fetchone()
+                        return dict(row) if row else None
+            except psycopg2.Error as e:
+                print(f"❌ Crawl watermark read error: {e}")
+                return None
+
+        def set_crawl_watermark(self, feed, newest_url, newest_published_date=None):
+            """Stores the newest article seen by a complete crawl of a listing feed"""
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute('''
+                            INSERT INTO crawl_state (feed, newest_url, newest_published_date)
+                            VALUES (%s, %s, %s)
+                            ON CONFLICT (feed)
+                            DO UPDATE SET
+                                newest_url = EXCLUDED.newest_url,
+                                newest_published_date = EXCLUDED.newest_published_date,
+                                updated_at = CURRENT_TIMESTAMP
+                        ''', (feed, newest_url, newest_published_date))
+
+                        conn.commit()
+                        return True
+            except psycopg2.Error as e:
+                print(f"❌ Crawl watermark save error: {e}")
+                return False
+
+        def enqueue_pending_urls(self, links, source=None):
+            """Adds discovered links ({'url', 'title'}) to the work queue; returns how many were new"""
+            rows = [(link['url'], link.get('title'), source, zlib.crc32(link['url'].encode('utf-8')))
+                    for link in links]
+            if not rows:
+                return 0
+
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        inserted = psycopg2.extras.execute_values(cursor, '''
+                            INSERT INTO pending_urls (url, title, source, url_hash)
+                            VALUES %s
+                            ON CONFLICT (url) DO NOTHING
+                            RETURNING url
+                        ''', rows, fetch=True, page_size=1000)
+
+                        conn.commit()
+                        return len(inserted)
+            except psycopg2.Error as e:
+                print(f"❌ Queue insert error: {e}")
+                return None
+
+        def claim_pending_urls(self, worker_id, limit=None, lease_seconds=None, max_attempts=None, shard=None):
+            """Leases up to `limit` queued URLs to a worker; returns [{'id', 'url', 'title', 'attempts'}]
+
+            FOR UPDATE SKIP LOCKED lets concurrent workers claim disjoint rows without waiting.
+            Expired leases with no attempts left are marked failed.
+            shard=(index, count) only claims URLs with url_hash % count == index.
+            """
+            limit = limit or QUEUE_CONFIG['claim_batch_size']
+            lease_seconds = lease_seconds or QUEUE_CONFIG['lease_seconds']
+            max_attempts = max_attempts or QUEUE_CONFIG['max_attempts']
+
+            shard_sql = ''
+            shard_params = ()
+            if shard and shard[1] > 1:
+                shard_sql = 'AND (url_hash IS NULL OR url_hash %% %s = %s)'
+                shard_params = (shard[1], shard[0])
+
+            try:
+                with self.connection() as conn:
+                    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                        # The CTE retires expired leases with no attempts left; they never match the claim below
+                        cursor.execute(f'''
+                            WITH exhausted AS (
+                                UPDATE pending_urls
+                                SET status = 'failed',
+                                    last_error = COALESCE(last_error, 'lease expired, no attempts left'),
+                                    lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                                WHERE attempts >= %s AND (
+                                    status = 'discovered'
+                                    OR (status = 'in_progress' AND lease_expires_at < CURRENT_TIMESTAMP)
+                                )
+                            )
+                            UPDATE pending_urls
+                            SET status = 'in_progress', lease_owner = %s,
+                                lease_expires_at = CURRENT_TIMESTAMP + %s * INTERVAL '1 second',
+                                attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                            WHERE id IN (
+                                SELECT id FROM pending_urls
+                                WHERE attempts < %s AND (
+                                    status = 'discovered'
+                                    OR (status = 'in_progress' AND lease_expires_at < CURRENT_TIMESTAMP)
+                                    OR (status = 'failed'
+                                        AND updated_at < CURRENT_TIMESTAMP - %s * INTERVAL '1 second')
+                                ) {shard_sql}
+                                ORDER BY id
+                                LIMIT %s
+                                FOR UPDATE SKIP LOCKED
+                            )
+                            RETURNING id, url, title, attempts
+                        ''', (max_attempts, worker_id, lease_seconds, max_attempts, QUEUE_CONFIG['retry_failed_after'])
+                            + shard_params + (limit,))
+
+                        claimed = sorted((dict(row) for row in cursor.fetchall()), key=lambda row: row['id'])
+                        conn.commit()
+                        return claimed
+            except psycopg2.Error as e:
+                print(f"❌ Queue claim error: {e}")
+                return []
+
+        def complete_pending_urls(self, urls, worker_id):
+            """Marks queued URLs leased by worker_id as done (URLs whose lease passed to another worker are left alone)"""
+            urls = list(dict.fromkeys(urls))
+            if not urls:
+                return True
+
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute('''
+                            UPDATE pending_urls
+                            SET status = 'done', lease_owner = NULL, lease_expires_at = NULL,
+                                updated_at = CURRENT_TIMESTAMP
+                            WHERE url = ANY(%s) AND lease_owner = %s AND status = 'in_progress'
+                        ''', (urls, worker_id))
+
+                        conn.commit()
+                        return True
+            except psycopg2.Error as e:
+                print(f"❌ Queue update error: {e}")
+                return False
+
+        def fail_pending_url(self, url, worker_id, error=None):
+            """Marks a queued URL leased by worker_id as failed (it is retried later until max_attempts)"""
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute('''
+                            UPDATE pending_urls
+                            SET status = 'failed', last_error = %s, lease_owner = NULL, lease_expires_at = NULL,
+                                updated_at = CURRENT_TIMESTAMP
+                            WHERE url = %s AND lease_owner = %s AND status = 'in_progress'
+                        ''', (error, url, worker_id))
+
+                        conn.commit()
+                        return True
+            except psycopg2.Error as e:
+                print(f"❌ Queue update error: {e}")
+                return False
+
+        def heartbeat_worker(self, worker_id, hostname=None, pid=None, timeout=None, lease_seconds=None):
+            """Registers / refreshes a worker and renews its leases; returns the ids of all live workers, sorted"""
+            lease_seconds = lease_seconds or QUEUE_CONFIG['lease_seconds']
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute('''
+                            INSERT INTO scrape_workers (worker_id, hostname, pid) VALUES (%s, %s, %s)
+                            ON CONFLICT (worker_id) DO UPDATE SET heartbeat_at = CURRENT_TIMESTAMP
+                        ''', (worker_id, hostname, pid))
+                        # A live worker keeps its URLs however slow the batch is
+                        cursor.execute('''
+                            UPDATE pending_urls SET lease_expires_at = CURRENT_TIMESTAMP + %s * INTERVAL '1 second'
+                            WHERE lease_owner = %s AND status = 'in_progress'
+                        ''', (lease_seconds, worker_id))
+                        cursor.execute('''
+                            SELECT worker_id FROM scrape_workers
+                            WHERE heartbeat_at >= CURRENT_TIMESTAMP - %s * INTERVAL '1 second'
+                            ORDER BY worker_id
+                        ''', (timeout,))
+                        live_workers = [row[0] for row in cursor.fetchall()]
+
+                        conn.commit()
+                        return live_workers
+            except psycopg2.Error as e:
+                print(f"❌ Worker heartbeat error: {e}")
+                return []
+
+        def reap_dead_workers(self, timeout):
+            """Removes workers without a heartbeat for `timeout` seconds and releases their leases; returns their ids"""
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute('''
+                            DELETE FROM scrape_workers
+                            WHERE heartbeat_at < CURRENT_TIMESTAMP - %s * INTERVAL '1 second'
+                            RETURNING worker_id
+                        ''', (timeout,))
+                        dead = [row[0] for row in cursor.fetchall()]
+
+                        if dead:
+                            cursor.execute('''
+                                UPDATE pending_urls
+                                SET status = 'discovered', lease_owner = NULL, lease_expires_at = NULL,
+                                    updated_at = CURRENT_TIMESTAMP
+                                WHERE status = 'in_progress' AND lease_owner = ANY(%s)
+                            ''', (dead,))
+
+                        conn.commit()
+                        return dead
+            except psycopg2.Error as e:
+                print(f"❌ Worker cleanup error: {e}")
+                return []
+
+        def unregister_worker(self, worker_id):
+            """Removes a worker and puts its unfinished URLs back in the queue"""
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute('''
+                            UPDATE pending_urls
+                            SET status = 'discovered', lease_owner = NULL, lease_expires_at = NULL,
+                                updated_at = CURRENT_TIMESTAMP
+                            WHERE status = 'in_progress' AND lease_owner = %s
+                        ''', (worker_id,))
+                        cursor.execute("DELETE FROM scrape_workers WHERE worker_id = %s", (worker_id,))
+
+                        conn.commit()
+                        return True
+            except psycopg2.Error as e:
+                print(f"❌ Worker removal error: {e}")
+                return False
+
+        def get_pending_stats(self):
+            """Returns the number of queued URLs per status"""
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT status, COUNT(*) FROM pending_urls GROUP BY status")
+                        return dict(cursor.fetchall())
+            except psycopg2.Error as e:
+                print(f"❌ Queue statistics error: {e}")
+                return {}
+
+        def get_articles_by_urls(self, urls):
+            """Returns {url: article dict} for the stored articles among the given URLs"""
+            urls = list(dict.fromkeys(urls))
+            if not urls:
+                return {}
+
+            try:
+                with self.connection() as conn:
+                    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                        cursor.execute('''
+                            SELECT id, url, title, content, author, published_date, content_length
+                            FROM articles WHERE url = ANY(%s)
+                        ''', (urls,))
+                        return {row['url']: dict(row) for row in cursor.fetchall()}
+            except psycopg2.Error as e:
+                print(f"❌ Article lookup error: {e}")
+                return {}
+
+        def _article_columns(self, conn):
+            """Returns the column names of the articles table"""
+            with conn.cursor() as cursor:
+                cursor.execute('''
+                    SELECT column_name FROM information_schema.columns
+                    WHERE table_schema = current_schema() AND table_name = 'articles'
+                    ORDER BY ordinal_position
+                ''')
+                return [row[0] for row in cursor.fetchall()]
+
+        def iter_unprocessed_articles(self, columns=None, batch_size=None, limit=None):
+            """Yields unanalyzed articles, newest first, one keyset page of batch_size rows per query
+
+            Pages continue after the last (scraped_at, id), so marking articles as
+            analyzed between pages neither skips nor repeats any.
+            """
+            batch_size = batch_size or DATABASE_CONFIG['unprocessed_batch_size']
+            with self.connection() as conn:
+                available = self._article_columns(conn)
+            columns = select_columns(columns or ['id', 'url', 'title', 'content', 'author', 'published_date',
+                                                 'content_length', 'scraped_at'], available)
+            keyset_columns = [column for column in ('scraped_at', 'id') if column not in columns]
+            column_sql = ', '.join(columns + keyset_columns)
+
+            last_key = None
+            yielded = 0
+            while limit is None or yielded < limit:
+                page_size = batch_size if limit is None else min(batch_size, limit - yielded)
+                with self.connection() as conn:
+                    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                        if last_key is None:
+                            cursor.execute(f'''
+                                SELECT {column_sql} FROM articles
+                                WHERE is_analyzed = FALSE
+                                ORDER BY scraped_at DESC, id DESC
+                                LIMIT %s
+                            ''', (page_size,))
+                        else:
+                            cursor.execute(f'''
+                                SELECT {column_sql} FROM articles
+                                WHERE is_analyzed = FALSE AND (scraped_at, id) < (%s, %s)
+                                ORDER BY scraped_at DESC, id DESC
+                                LIMIT %s
+                            ''', (*last_key, page_size))
+                        rows = cursor.fetchall()
+
+                if not rows:
+                    break
+                last_key = (rows[-1]['scraped_at'], rows[-1]['id'])
+
+                for row in rows:
+                    yield {column: row[column] for column in columns}
+                yielded += len(rows)
+                if len(rows) < page_size:
+                    break
+
+        def get_unprocessed_articles(self, limit=None, columns=None):
+            """Returns unanalyzed articles for the sentiment analyzer"""
+            return list(self.iter_unprocessed_articles(columns, limit=limit))
+
+        def count_articles_published_on(self, day):
+            """Returns how many stored articles were published on a day (only its partition is read)"""
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT COUNT(*) FROM articles WHERE published_on = %s", (str(day),))
+                        return cursor.fetchone()[0]
+            except psycopg2.Error as e:
+                print(f"❌ Date count error: {e}")
+                return 0
+
+        def mark_articles_as_analyzed(self, article_ids, results=None):
+            """Marks articles as analyzed in one UPDATE ... FROM (VALUES ...); returns how many were updated
+
+            results: optional {article_id: sentiment result}, stored as JSON
+            """
+            results = results or {}
+            rows = [(article_id, json.dumps(results[article_id]) if results.get(article_id) else None)
+                    for article_id in dict.fromkeys(article_ids)]
+            if not rows:
+                return 0
+
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cursor:
+                        # page_size = all rows: a single statement and round trip
+                        updated = psycopg2.extras.execute_values(cursor, '''
+                            UPDATE articles AS a
+                            SET is_analyzed = TRUE,
+                                analyzed_at = CURRENT_TIMESTAMP,
+                                sentiment_result = v.sentiment_result
+                            FROM (VALUES %s) AS v(id, sentiment_result)
+                            WHERE a.id = v.id
+                            RETURNING a.id
+                        ''', rows, template='(%s::integer, %s::text)', page_size=len(rows), fetch=True)
+
+                        conn.commit()
+            except psycopg2.Error as e:
+                print(f"❌ Mark analyzed error: {e}")
+                return 0
+
+            print(f"✅ {len(updated)} articles marked as analyzed")
+            return len(updated)
+
+        def mark_article_as_analyzed(self, article_id, sentiment_result=None):
+            """Marks article as analyzed"""
+            return self.mark_articles_as_analyzed([article_id], {article_id: sentiment_result}) == 1
+
+        def iter_articles(self, columns=None, processed_only=False, batch_size=EXPORT_BATCH_SIZE):
+            """Yields articles as dicts, newest first, through a server-side cursor (batch_size rows per fetch)"""
+            with self.connection() as conn:
+                column_sql = ', '.join(select_columns(columns, self._article_columns(conn)))
+
+                query = f"SELECT {column_sql} FROM articles"
+                if processed_only:
+                    query += " WHERE is_analyzed = TRUE"
+                query += " ORDER BY scraped_at DESC"
+
+                # A named cursor keeps the result on the server; rows arrive itersize at a time
+                with conn.cursor(name='articles_export', cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    cursor.itersize = batch_size
+                    cursor.execute(query)
+                    for row in cursor:
+                        yield dict(row)
+
+        def export_articles_to_json(self, filename="articles_export.json", processed_only=False,
+                                    columns=None, fmt=None, compress=None):
+            """Streams articles to a JSON / JSONL file (gzipped for .gz); returns the number exported"""
+            count = write_articles(self.iter_articles(columns, processed_only), filename, fmt, compress)
+
+            print(f"📤 Exported {count} articles to {filename}")
+            return count
+
+        def cleanup_old_analyzed_articles(self, days_to_keep=7, dry_run=False):
+            """Deletes old analyzed articles: drops expired partitions, then deletes in short batches"""
+            return PostgresRetention(self).run(days_to_keep, dry_run=dry_run)
+
         def get_database_stats(self):
             """Shows database statistics"""
             try:
-                with self.get_connection() as conn:
+                with self.connection() as conn:
                     with conn.cursor() as cursor:
                         # Total articles
                         cursor.execute("SELECT COUNT(*) FROM articles")
@@ -206,10 +1102,16 @@ class PostgreSQLDatabaseManager:
                         cursor.execute("SELECT COUNT(*) FROM articles WHERE is_analyzed = FALSE")
                         unanalyzed_articles = cursor.fetchone()[0]
 
+                        # Work queue by status
+                        cursor.execute("SELECT status, COUNT(*) FROM pending_urls GROUP BY status")
+                        pending_urls = dict(cursor.fetchall())
+
                         return {
                             'total_articles': total_articles,
                             'analyzed_articles': analyzed_articles,
-                            'unprocessed_articles': unanalyzed_articles  # ← THIS LINE
+                            'unprocessed_articles': unanalyzed_articles,  # ← THIS LINE
+                            'pending_urls': pending_urls,
+                            'connection_pool': self.pool.get_stats()
                         }
             except psycopg2.Error as e:
                 print(f"❌ Statistics error: {e}")
@@ -0,0 +1,126 @@
+"""
+Token-bucket rate limiter shared by all scrapers.
+
+Each host gets its own bucket that refills at `requests_per_second` and
+holds at most `burst_size` tokens. When `shared_state_file` is set the
+buckets live in a small SQLite file, so several run_scraper.py processes
+hitting the same host stay under one global request rate.
+"""
+
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+
+from config import RATE_LIMIT_CONFIG
+
+
+class TokenBucketRateLimiter:
+    def __init__(self, requests_per_second=None, burst_size=None, shared_state_file=None):
+        """Initializes the limiter (values default to RATE_LIMIT_CONFIG)"""
+        self.rate = requests_per_second or RATE_LIMIT_CONFIG['requests_per_second']
+        self.burst_size = burst_size or RATE_LIMIT_CONFIG['burst_size']
+        self.shared_state_file = shared_state_file
+
+        # In-process buckets: host -> (tokens, last refill timestamp)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+        if self.shared_state_file:
+            self._init_shared_state()
+
+    def _init_shared_state(self):
+        """Creates the table used to coordinate buckets between processes"""
+        with self._shared_connection() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+                    host TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+
+    def _shared_connection(self):
+        """Returns a connection to the shared state file"""
+        return sqlite3.connect(self.shared_state_file, timeout=30.0, isolation_level=None)
+
+    def _take_token(self, tokens, updated_at, now):
+        """Refills a bucket and takes one token; returns (new_tokens, wait_seconds)"""
+        tokens = min(self.burst_size, tokens + (now - updated_at) * self.rate)
+        tokens -= 1
+
+        # A negative balance is a reservation: the caller waits until it is paid back
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        return tokens, wait
+
+    def reserve(self, url_or_host):
+        """Reserves one request slot and returns how many seconds to wait before using it"""
+        host = _host_of(url_or_host)
+
+        if self.shared_state_file:
+            return self._reserve_shared(host)
+
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.get(host, (self.burst_size, now))
+            tokens, wait = self._take_token(tokens, updated_at, now)
+            self._buckets[host] = (tokens, now)
+            return wait
+
+    def _reserve_shared(self, host):
+        """Reserves a slot in the bucket stored in the shared SQLite file"""
+        conn = self._shared_connection()
+        try:
+            # BEGIN IMMEDIATE takes the write lock, so read-modify-write is atomic across processes
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM rate_limit_buckets WHERE host = ?", (host,)
+            ).fetchone()
+            tokens, updated_at = row if row else (self.burst_size, now)
+
+            tokens, wait = self._take_token(tokens, updated_at, now)
+            conn.execute('''
+                INSERT INTO rate_limit_buckets (host, tokens, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(host) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at
+            ''', (host, tokens, now))
+            conn.execute("COMMIT")
+            return wait
+        except Exception:
+            # BEGIN IMMEDIATE itself may have failed (database is locked); keep that error, not ROLLBACK's
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def acquire(self, url_or_host):
+        """Blocks until a request to the given host is allowed"""
+        wait = self.reserve(url_or_host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def _host_of(url_or_host):
+    """Returns the host part of a URL (or the value itself if it is already a host)"""
+    if '://' in url_or_host:
+        return urlparse(url_or_host).netloc.lower()
+    return url_or_host.lower()
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Returns the process-wide limiter configured from RATE_LIMIT_CONFIG"""
+    global _shared_limiter
+
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = TokenBucketRateLimiter(
+                shared_state_file=RATE_LIMIT_CONFIG['shared_state_file']
+            )
+        return _shared_limiter
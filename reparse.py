@@ -0,0 +1,186 @@
+"""
+Offline replay of the extraction pipeline over stored HTML pages.
+
+The capture side is DEBUG_CONFIG['save_html_files']: every downloaded
+article is written to DEBUG_CONFIG['html_dir'] together with a
+manifest.jsonl line that maps the file back to its URL. reparse_corpus()
+re-runs the extraction over such a directory (or a .zip / .tar.gz of it)
+in a process pool, writes the results to JSONL and/or the database and
+reports throughput and differences against the stored content.
+"""
+
+import json
+import re
+import tarfile
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+from config import DEBUG_CONFIG
+from pipeline import iter_parsed_pages
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+_manifest_lock = threading.Lock()
+
+
+def _file_name_for_url(url):
+    """Builds a readable, filesystem-safe file name from an article URL"""
+    slug = re.sub(r'^https?://', '', url).strip('/')
+    slug = re.sub(r'[^A-Za-z0-9._-]+', '_', slug)
+    return slug[:200] + '.html'
+
+
+def save_html_page(url, raw_html, directory=None):
+    """Stores one downloaded page and records it in the corpus manifest"""
+    directory = Path(directory or DEBUG_CONFIG['html_dir'])
+    directory.mkdir(parents=True, exist_ok=True)
+
+    file_name = _file_name_for_url(url)
+    (directory / file_name).write_bytes(raw_html)
+
+    entry = {'file': file_name, 'url': url, 'fetched_at': datetime.now().isoformat()}
+    with _manifest_lock, open(directory / MANIFEST_NAME, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def _read_manifest(lines):
+    """Returns {file name: url} from manifest lines (the last entry for a file wins)"""
+    urls = {}
+    for line in lines:
+        line = line.strip()
+        if line:
+            entry = json.loads(line)
+            urls[entry['file']] = entry['url']
+    return urls
+
+
+def iter_html_corpus(path):
+    """Yields (url, raw_html) for every page in a directory, .zip or .tar(.gz) corpus
+
+    Files missing from the manifest use their file name as the URL.
+    """
+    path = Path(path)
+
+    if path.is_dir():
+        manifest = path / MANIFEST_NAME
+        urls = _read_manifest(manifest.read_text(encoding='utf-8').splitlines()) if manifest.exists() else {}
+
+        for html_file in sorted(path.rglob('*.html')):
+            name = html_file.relative_to(path).as_posix()
+            yield urls.get(name, name), html_file.read_bytes()
+
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            manifest_name = next((n for n in names if n.endswith(MANIFEST_NAME)), None)
+            urls = {}
+            if manifest_name:
+                urls = _read_manifest(archive.read(manifest_name).decode('utf-8').splitlines())
+
+            for name in sorted(n for n in names if n.endswith('.html')):
+                yield urls.get(Path(name).name, name), archive.read(name)
+
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            members = [m for m in archive.getmembers() if m.isfile()]
+            manifest_member = next((m for m in members if m.name.endswith(MANIFEST_NAME)), None)
+            urls = {}
+            if manifest_member:
+                urls = _read_manifest(archive.extractfile(manifest_member).read().decode('utf-8').splitlines())
+
+            for member in sorted((m for m in members if m.name.endswith('.html')), key=lambda m: m.name):
+                yield urls.get(Path(member.name).name, member.name), archive.extractfile(member).read()
+
+    else:
+        raise ValueError(f"Unsupported corpus: {path} (expected a directory, .zip or .tar archive)")
+
+
+def _batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def reparse_corpus(path, output=None, db=None, compare_db=None, workers=None,
+                   parser_engine=None, batch_size=200):
+    """Re-extracts every stored page and returns a summary dict
+
+    output: JSONL file for the extracted articles
+    db: database manager to save new articles into
+    compare_db: database manager whose stored content is diffed against the new extraction
+    """
+    print(f"🔁 Re-parsing HTML corpus: {path}")
+
+    summary = {
+        'pages': 0, 'extracted': 0, 'failed': 0, 'saved': 0,
+        'unchanged': 0, 'changed': 0, 'not_in_db': 0, 'length_delta': 0,
+    }
+    changed_examples = []
+
+    out_file = open(output, 'w', encoding='utf-8') if output else None
+    start_time = time.perf_counter()
+
+    try:
+        parsed = iter_parsed_pages(iter_html_corpus(path), parse_workers=workers, parser_engine=parser_engine)
+
+        for batch in _batched(parsed, batch_size):
+            summary['pages'] += len(batch)
+            articles = [article_data for _, article_data in batch if article_data]
+            summary['extracted'] += len(articles)
+            summary['failed'] += len(batch) - len(articles)
+
+            if out_file:
+                for article_data in articles:
+                    out_file.write(json.dumps(article_data, ensure_ascii=False, default=str) + '\n')
+
+            if db and articles:
+                saved_count, _ = db.save_multiple_articles(articles)
+                summary['saved'] += saved_count
+
+            if compare_db and articles:
+                stored = compare_db.get_articles_by_urls([a['url'] for a in articles])
+                for article_data in articles:
+                    stored_article = stored.get(article_data['url'])
+                    if stored_article is None:
+                        summary['not_in_db'] += 1
+                    elif stored_article['content'] == article_data['content']:
+                        summary['unchanged'] += 1
+                    else:
+                        summary['changed'] += 1
+                        summary['length_delta'] += len(article_data['content']) - len(stored_article['content'])
+                        if len(changed_examples) < 5:
+                            changed_examples.append(
+                                (article_data['url'], len(stored_article['content']), len(article_data['content']))
+                            )
+
+            elapsed = time.perf_counter() - start_time
+            print(f"📊 {summary['pages']} pages, {summary['pages'] / elapsed:.1f} pages/sec")
+    finally:
+        if out_file:
+            out_file.close()
+
+    elapsed = time.perf_counter() - start_time
+    summary['seconds'] = round(elapsed, 3)
+    summary['pages_per_second'] = round(summary['pages'] / elapsed, 1) if elapsed > 0 else 0.0
+
+    print(f"\n🎉 Re-parse completed: {summary['pages']} pages in {elapsed:.1f}s "
+          f"({summary['pages_per_second']} pages/sec)")
+    print(f"   ✅ Extracted: {summary['extracted']}, ❌ Failed: {summary['failed']}")
+
+    if compare_db:
+        print(f"   🟰 Unchanged: {summary['unchanged']}, ✏️ Changed: {summary['changed']}, "
+              f"🆕 Not in DB: {summary['not_in_db']}")
+        if summary['changed']:
+            print(f"   📏 Average length change: {summary['length_delta'] / summary['changed']:+.0f} chars")
+        for url, old_length, new_length in changed_examples:
+            print(f"      {url} ({old_length} → {new_length} chars)")
+
+    return summary
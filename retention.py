@@ -0,0 +1,242 @@
+"""
+Retention of analyzed articles without one huge DELETE.
+
+Expired rows (analyzed and older than the cutoff) are deleted in chunks of
+RETENTION_CONFIG['batch_size'] rows, addressed by rowid (SQLite) or ctid
+(PostgreSQL), each chunk in its own short transaction with a short pause
+in between, so the scraper's inserts are never blocked for long and
+progress is printed as it goes.
+
+On a partitioned PostgreSQL articles table (see POSTGRES_PARTITION_CONFIG)
+whole monthly partitions that only hold expired rows are detached and
+dropped first; that costs the same no matter how big the archive is. The
+chunked delete then only runs on the partitions that are partly expired.
+"""
+
+import re
+import time
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta, timezone
+
+from config import RETENTION_CONFIG
+
+# pg_get_expr() of a range partition: FOR VALUES FROM ('2025-06-01') TO ('2025-07-01')
+PARTITION_BOUNDS_REGEX = re.compile(r"FROM \('(\d{4}-\d{2}-\d{2})'\) TO \('(\d{4}-\d{2}-\d{2})'\)")
+
+
+class BatchedRetention(ABC):
+    def __init__(self, db, batch_size=None, pause_seconds=None):
+        """Initializes the engine for a database manager (values default to RETENTION_CONFIG)"""
+        self.db = db
+        self.batch_size = batch_size or RETENTION_CONFIG['batch_size']
+        self.pause_seconds = RETENTION_CONFIG['pause_seconds'] if pause_seconds is None else pause_seconds
+
+    def run(self, days_to_keep=7, dry_run=False):
+        """Deletes analyzed articles older than days_to_keep; returns how many were (or would be) deleted"""
+        cutoff = self._cutoff(days_to_keep)
+
+        if dry_run:
+            count = self.count_expired(cutoff)
+            print(f"🔍 DRY RUN: {count} analyzed articles older than {days_to_keep} days would be deleted")
+            return count
+
+        start = time.perf_counter()
+        deleted = self.drop_expired_partitions(cutoff)
+
+        for table in self.tables_to_scan(cutoff):
+            while True:
+                batch_deleted = self.delete_batch(table, cutoff)
+                deleted += batch_deleted
+                if batch_deleted:
+                    print(f"   🗑️ {table}: -{batch_deleted} (total {deleted}, {time.perf_counter() - start:.1f}s)")
+                if batch_deleted < self.batch_size:
+                    break
+                time.sleep(self.pause_seconds)
+
+        print(f"🧹 Deleted {deleted} old analyzed articles in {time.perf_counter() - start:.1f}s")
+        return deleted
+
+    @abstractmethod
+    def _cutoff(self, days_to_keep):
+        """Cutoff for days_to_keep, in the form the backend compares against"""
+
+    @abstractmethod
+    def count_expired(self, cutoff):
+        """Number of analyzed articles older than the cutoff"""
+
+    def drop_expired_partitions(self, cutoff):
+        """Drops partitions that only hold expired rows; returns how many rows went with them"""
+        return 0
+
+    def tables_to_scan(self, cutoff):
+        """Tables that may still hold expired rows"""
+        return ['articles']
+
+    @abstractmethod
+    def delete_batch(self, table, cutoff):
+        """Deletes at most batch_size expired rows of table in one transaction; returns how many"""
+
+
+class SQLiteRetention(BatchedRetention):
+    """Retention for sqlite_database.DatabaseManager (expiry by analyzed_at)"""
+
+    def _cutoff(self, days_to_keep):
+        # analyzed_at is CURRENT_TIMESTAMP, i.e. UTC 'YYYY-MM-DD HH:MM:SS'
+        return (datetime.now(timezone.utc) - timedelta(days=days_to_keep)).strftime('%Y-%m-%d %H:%M:%S')
+
+    def count_expired(self, cutoff):
+        with self.db.connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM articles WHERE processed = TRUE AND analyzed_at < ?", (cutoff,)
+            ).fetchone()[0]
+
+    def delete_batch(self, table, cutoff):
+        with self.db.connection() as conn:
+            cursor = conn.execute(f'''
+                DELETE FROM {table} WHERE rowid IN (
+                    SELECT rowid FROM {table}
+                    WHERE processed = TRUE AND analyzed_at < ?
+                    LIMIT ?
+                )
+            ''', (cutoff, self.batch_size))
+            return cursor.rowcount
+
+
+class PostgresRetention(BatchedRetention):
+    """Retention for PostgreSQLDatabaseManager (expiry by scraped_at, like cleanup_articles.py)"""
+
+    def _cutoff(self, days_to_keep):
+        return datetime.now() - timedelta(days=days_to_keep)
+
+    def count_expired(self, cutoff):
+        with self.db.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM articles WHERE is_analyzed = TRUE AND scraped_at < %s", (cutoff,)
+                )
+                return cursor.fetchone()[0]
+
+    def _partitions(self):
+        """Returns [(name, lower bound, upper bound)] (bounds are None for DEFAULT), [] if articles is not partitioned"""
+        with self.db.connection() as conn:
+            with conn.cursor() as cursor:
+                if not self.db._articles_partitioned(cursor):
+                    return []
+                cursor.execute('''
+                    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+                    FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = 'articles'::regclass
+                    ORDER BY c.relname
+                ''')
+                partitions = []
+                for name, bound in cursor.fetchall():
+                    match = PARTITION_BOUNDS_REGEX.search(bound)
+                    if match:
+                        partitions.append((name, date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))))
+                    else:
+                        partitions.append((name, None, None))
+                return partitions
+
+    def drop_expired_partitions(self, cutoff):
+        """Drops month partitions with no article left to keep
+
+        The check holds the lock DETACH needs anyway, so no row can be written or
+        un-analyzed between the check and the drop. It stops at the first row to keep
+        (partial indexes), and dropped rows are counted from the planner's estimate
+        (pg_class.reltuples): an exact COUNT(*) would read the whole partition.
+        """
+        # Imported here: the SQLite side of this module must not need psycopg2
+        import psycopg2.errors
+
+        dropped_rows = 0
+
+        for name, _, upper_bound in self._partitions():
+            # Only months that ended before the cutoff day can be fully expired
+            if upper_bound is None or upper_bound > cutoff.date():
+                continue
+
+            try:
+                with self.db.connection() as conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SET LOCAL lock_timeout = %s", (f"{RETENTION_CONFIG['lock_timeout_ms']}ms",))
+                        # Parent first, the same order inserts take, so this cannot deadlock with them
+                        cursor.execute("LOCK TABLE articles IN ACCESS EXCLUSIVE MODE")
+                        # Empty months stay, so late articles of that month do not land in articles_default
+                        cursor.execute(f'''
+                            SELECT NOT EXISTS (SELECT 1 FROM {name})
+                                OR EXISTS (SELECT 1 FROM {name} WHERE is_analyzed = FALSE)
+                                OR EXISTS (SELECT 1 FROM {name} WHERE is_analyzed = TRUE AND scraped_at >= %s),
+                                (SELECT reltuples FROM pg_class WHERE oid = %s::regclass)
+                        ''', (cutoff, name))
+                        keep, estimated_rows = cursor.fetchone()
+                        if keep:
+                            continue
+
+                        cursor.execute(f"ALTER TABLE articles DETACH PARTITION {name}")
+                        cursor.execute(f"DROP TABLE {name}")
+            except psycopg2.errors.LockNotAvailable:
+                print(f"   ⏳ {name} is busy, left to the batched delete")
+                continue
+
+            # reltuples is -1 before the first ANALYZE
+            estimated_rows = max(int(estimated_rows), 0)
+            dropped_rows += estimated_rows
+            print(f"   🗂️ Dropped partition {name} (~{estimated_rows} articles)")
+
+        return dropped_rows
+
+    def tables_to_scan(self, cutoff):
+        partitions = self._partitions()
+        if not partitions:
+            return ['articles']
+        # ctid is only unique within one partition, so each one is cleaned on its own; months published
+        # after the cutoff cannot hold articles scraped before it
+        return [name for name, lower_bound, _ in partitions
+                if lower_bound is None or lower_bound <= cutoff.date()]
+
+    def delete_batch(self, table, cutoff):
+        with self.db.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f'''
+                    DELETE FROM {table} WHERE ctid = ANY(ARRAY(
+                        SELECT ctid FROM {table}
+                        WHERE is_analyzed = TRUE AND scraped_at < %s
+                        LIMIT %s
+                    ))
+                ''', (cutoff, self.batch_size))
+                return cursor.rowcount
+
+
+def test_retention(rows=25000):
+    """Batched delete on a temporary SQLite database (timing and correctness)"""
+    import contextlib
+    import io
+    import os
+    import tempfile
+
+    from sqlite_database import DatabaseManager
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = DatabaseManager(os.path.join(tmp, 'retention.db'))
+        with db.connection() as conn:
+            # Every third article is analyzed 30 days ago, the rest recently or not at all
+            conn.executemany('''
+                INSERT INTO articles (url, title, content, processed, analyzed_at)
+                VALUES (?, 'Title', 'Text', ?, datetime('now', ?))
+            ''', [(f"https://example.com/{i}", i % 3 != 2, '-30 days' if i % 3 == 0 else '-1 days')
+                  for i in range(rows)])
+
+        expected = len(range(0, rows, 3))
+        deleted = SQLiteRetention(db, batch_size=5000, pause_seconds=0).run(days_to_keep=7)
+
+        with db.connection() as conn:
+            left = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        db.close()
+
+    ok = deleted == expected and left == rows - expected
+    print("✅ Only the expired articles were deleted" if ok else f"❌ deleted {deleted}, expected {expected}")
+
+
+if __name__ == "__main__":
+    test_retention()
@@ -0,0 +1,212 @@
+"""
+Retry layer for page downloads.
+
+classify_error() splits failures into retryable ones (timeouts, connection
+resets, HTTP 429 and 5xx) and permanent ones (other HTTP errors such as
+404, parse errors). RetryPolicy retries the retryable ones up to
+SCRAPING_CONFIG['max_retries'] times with exponential backoff and full
+jitter, waits at least as long as a Retry-After header asks, and keeps
+attempt counters for the run summary.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+from config import SCRAPING_CONFIG, RETRY_CONFIG
+
+try:
+    import aiohttp
+
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Returns the seconds requested by a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _http_status_and_headers(error):
+    """Returns (status, headers) for HTTP errors from requests or aiohttp, else (None, None)"""
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code, error.response.headers
+    if AIOHTTP_AVAILABLE and isinstance(error, aiohttp.ClientResponseError):
+        return error.status, error.headers or {}
+    return None, None
+
+
+def classify_error(error):
+    """Returns (retryable, reason, retry_after_seconds) for a failed download"""
+    status, headers = _http_status_and_headers(error)
+    if status is not None:
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        return status in RETRYABLE_STATUS_CODES, f"HTTP {status}", retry_after
+
+    if isinstance(error, (requests.Timeout, asyncio.TimeoutError, TimeoutError)):
+        return True, 'timeout', None
+
+    if isinstance(error, (requests.ConnectionError, requests.exceptions.ChunkedEncodingError, ConnectionError)):
+        return True, 'connection error', None
+
+    if AIOHTTP_AVAILABLE and isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+        return True, 'connection error', None
+
+    # Everything else (invalid URLs, parse errors, ...) will fail the same way again
+    return False, type(error).__name__, None
+
+
+class RetryPolicy:
+    def __init__(self, max_retries=None, base_delay=None, max_delay=None, max_retry_after=None):
+        """Initializes the policy (values default to SCRAPING_CONFIG / RETRY_CONFIG)"""
+        self.max_retries = SCRAPING_CONFIG['max_retries'] if max_retries is None else max_retries
+        self.base_delay = RETRY_CONFIG['base_delay'] if base_delay is None else base_delay
+        self.max_delay = RETRY_CONFIG['max_delay'] if max_delay is None else max_delay
+        self.max_retry_after = RETRY_CONFIG['max_retry_after'] if max_retry_after is None else max_retry_after
+
+        self._stats = Counter()
+        self._reasons = Counter()
+        self._lock = threading.Lock()
+
+    def delay_for(self, retry_number, retry_after=None):
+        """Backoff before the given retry (1-based): full jitter, but never shorter than Retry-After"""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (retry_number - 1))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _next_delay(self, error, retry_number, description):
+        """Records a failed attempt; returns the delay before the next one or None to give up"""
+        retryable, reason, retry_after = classify_error(error)
+
+        with self._lock:
+            self._reasons[reason] += 1
+            if not retryable:
+                self._stats['permanent_failures'] += 1
+                return None
+            if retry_number > self.max_retries or (retry_after or 0) > self.max_retry_after:
+                self._stats['gave_up'] += 1
+                return None
+            self._stats['retries'] += 1
+
+        delay = self.delay_for(retry_number, retry_after)
+        print(f"🔁 Retry {retry_number}/{self.max_retries} for {description} in {delay:.1f}s ({reason})")
+        return delay
+
+    def _record(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def call(self, func, *args, description=None, **kwargs):
+        """Calls func, retrying retryable errors; re-raises the last error"""
+        self._record('calls')
+        retry_number = 0
+
+        while True:
+            self._record('attempts')
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                retry_number += 1
+                delay = self._next_delay(e, retry_number, description or getattr(func, '__name__', 'call'))
+                if delay is None:
+                    raise
+                time.sleep(delay)
+            else:
+                self._record('successes')
+                if retry_number:
+                    self._record('recovered')
+                return result
+
+    async def call_async(self, coro_func, *args, description=None, **kwargs):
+        """Coroutine version of call(); waits with asyncio.sleep"""
+        self._record('calls')
+        retry_number = 0
+
+        while True:
+            self._record('attempts')
+            try:
+                result = await coro_func(*args, **kwargs)
+            except Exception as e:
+                retry_number += 1
+                delay = self._next_delay(e, retry_number, description or getattr(coro_func, '__name__', 'call'))
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+            else:
+                self._record('successes')
+                if retry_number:
+                    self._record('recovered')
+                return result
+
+    def get_stats(self):
+        """Returns attempt counters and failure reasons"""
+        with self._lock:
+            stats = {key: self._stats[key] for key in
+                     ('calls', 'attempts', 'successes', 'retries', 'recovered', 'gave_up', 'permanent_failures')}
+            stats['failure_reasons'] = dict(self._reasons)
+        return stats
+
+
+_shared_policy = None
+_shared_policy_lock = threading.Lock()
+
+
+def get_retry_policy():
+    """Returns the process-wide retry policy (counters cover all scrapers in the process)"""
+    global _shared_policy
+
+    with _shared_policy_lock:
+        if _shared_policy is None:
+            _shared_policy = RetryPolicy()
+        return _shared_policy
+
+
+def test_retries():
+    """Fetches flaky pages from the local stub server (first 2 requests of each page fail with 503)"""
+    from stub_server import start_stub_server
+    from transport import SyncTransport
+
+    server, base_url, paths = start_stub_server(flaky=2)
+    policy = RetryPolicy(max_retries=3, base_delay=0.01)
+
+    try:
+        transport = SyncTransport(requests.Session(), retry_policy=policy)
+        results = [transport.fetch(base_url + path, timeout=10) for path in paths[:3]]
+        print(f"✅ Fetched {len(results)} flaky pages")
+
+        try:
+            transport.fetch(base_url + '/missing-page', timeout=10)
+        except requests.HTTPError as e:
+            print(f"✅ Not retried: {e.response.status_code}")
+    finally:
+        server.shutdown()
+
+    print(f"📊 Retry stats: {policy.get_stats()}")
+
+
+if __name__ == "__main__":
+    test_retries()
@@ -22,6 +22,12 @@ except ImportError:
 # Standard imports
 from scraper import CoinDeskScraper
 from postgres_database import PostgreSQLDatabaseManager as DatabaseManager
+from reparse import reparse_corpus
+from polling import AdaptivePollSchedule, watch
+from coordinator import ShardCoordinator, run_worker
+from html_cache import HtmlCache
+from article_export import read_sentiment_results, write_articles
+from config import WATCH_CONFIG
 
 
 def scrape_command(args):
@@ -45,6 +51,11 @@ def scrape_command(args):
     print(f"   ✅ New articles: {len(articles)}")
     print(f"   🕒 Time: {scrape_time:.1f} seconds")
 
+    retry_stats = scraper.transport.retry_policy.get_stats()
+    if retry_stats['retries'] or retry_stats['gave_up']:
+        print(f"   🔁 Retries: {retry_stats['retries']} ({retry_stats['recovered']} recovered, "
+              f"{retry_stats['gave_up']} gave up)")
+
     stats = scraper.db.get_database_stats()
     print(f"   📊 Total in database: {stats['total_articles']} articles")
     print(f"   📋 For analysis: {stats['unprocessed_articles']} articles")
@@ -78,7 +89,8 @@ def scrape_smart_command(args):
     articles = scraper.scrape_articles_smart(
         date_filter=args.date_filter,
         limit=args.limit,
-        save_to_db=True
+        save_to_db=True,
+        resume=args.resume
     )
     scrape_time = time.time() - start_time
 
@@ -86,6 +98,11 @@ def scrape_smart_command(args):
     print(f"   ✅ New articles: {len(articles)}")
     print(f"   🕒 Time: {scrape_time:.1f} seconds")
 
+    retry_stats = scraper.transport.retry_policy.get_stats()
+    if retry_stats['retries'] or retry_stats['gave_up']:
+        print(f"   🔁 Retries: {retry_stats['retries']} ({retry_stats['recovered']} recovered, "
+              f"{retry_stats['gave_up']} gave up)")
+
     if scraper.db:
         stats = scraper.db.get_database_stats()
         print(f"   📊 Total in database: {stats['total_articles']} articles")
@@ -197,16 +214,7 @@ def recommend_scraping_command(args):
     today = datetime.now().strftime('%Y-%m-%d')
 
     try:
-        import sqlite3
-        conn = sqlite3.connect(db.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT COUNT(*) FROM articles 
-            WHERE url LIKE ? OR published_date = ?
-        """, (f'%/{today.replace("-", "/")}/%', f'%{today}%'))
-
-        today_count = cursor.fetchone()[0]
+        today_count = db.count_articles_published_on(today)
 
         print(f"📅 Today is: {today}")
         print(f"📊 Articles from today: {today_count}")
@@ -230,8 +238,6 @@ def recommend_scraping_command(args):
             else:
                 print("   🎯 python run_scraper.py scrape --limit 10")
 
-        conn.close()
-
     except Exception as e:
         print(f"❌ Error: {e}")
 
@@ -240,12 +246,14 @@ def export_command(args):
     """Data export"""
     print("=== DATA EXPORT ===")
     db = DatabaseManager()
+    columns = [column.strip() for column in args.columns.split(',')] if args.columns else None
+    export_options = {'columns': columns, 'fmt': args.format, 'compress': args.gzip or None}
 
     if args.all:
-        count = db.export_articles_to_json(args.output)
+        count = db.export_articles_to_json(args.output, **export_options)
         print(f"📤 Exported {count} articles to {args.output}")
     else:
-        count = db.export_articles_to_json(args.output, processed_only=False)
+        count = db.export_articles_to_json(args.output, processed_only=False, **export_options)
         print(f"📤 Exported {count} unanalyzed articles to {args.output}")
 
 
@@ -266,26 +274,15 @@ def analyze_command(args):
     print("=== INTEGRATION WITH SENTIMENT ANALYZER ===")
     db = DatabaseManager()
 
-    unprocessed = db.get_unprocessed_articles(limit=args.limit)
+    # Streamed page by page, only the columns the analyzer needs
+    unprocessed = db.iter_unprocessed_articles(columns=['id', 'title', 'content', 'url'], limit=args.limit)
+    count = write_articles(unprocessed, 'articles_for_analysis.json')
 
-    if not unprocessed:
+    if not count:
         print("📋 No articles for analysis")
         return
 
-    articles_for_analysis = []
-    for article in unprocessed:
-        articles_for_analysis.append({
-            'id': article['id'],
-            'title': article['title'],
-            'content': article['content'],
-            'url': article['url']
-        })
-
-    import json
-    with open('articles_for_analysis.json', 'w', encoding='utf-8') as f:
-        json.dump(articles_for_analysis, f, ensure_ascii=False, indent=2)
-
-    print(f"📤 Exported {len(articles_for_analysis)} articles to articles_for_analysis.json")
+    print(f"📤 Exported {count} articles to articles_for_analysis.json")
 
 
 def mark_analyzed_command(args):
@@ -293,14 +290,98 @@ def mark_analyzed_command(args):
     print("=== MARKING ARTICLES AS ANALYZED ===")
     db = DatabaseManager()
 
-    if args.article_id:
+    if args.results:
+        results = read_sentiment_results(args.results)
+        count = db.mark_articles_as_analyzed(results.keys(), results)
+        print(f"✅ Marked {count} of {len(results)} articles from {args.results} as analyzed")
+    elif args.article_id:
         db.mark_article_as_analyzed(args.article_id)
         print(f"✅ Article {args.article_id} marked as analyzed")
     elif args.all_processed:
-        unprocessed = db.get_unprocessed_articles()
-        for article in unprocessed:
-            db.mark_article_as_analyzed(article['id'])
-        print(f"✅ Marked {len(unprocessed)} articles as analyzed")
+        article_ids = [article['id'] for article in db.iter_unprocessed_articles(columns=['id'])]
+        count = db.mark_articles_as_analyzed(article_ids)
+        print(f"✅ Marked {count} articles as analyzed")
+
+
+def reparse_command(args):
+    """Re-runs extraction over stored HTML pages (no network)"""
+    print("=== OFFLINE RE-PARSE ===")
+
+    if not args.output and not args.save_db and not args.compare_db:
+        print("⚠️ No output selected, only measuring throughput (use --output, --save-db or --compare-db)")
+
+    db = DatabaseManager() if args.save_db or args.compare_db else None
+
+    reparse_corpus(
+        args.input,
+        output=args.output,
+        db=db if args.save_db else None,
+        compare_db=db if args.compare_db else None,
+        workers=args.workers,
+        parser_engine=args.engine
+    )
+
+
+def watch_command(args):
+    """Keeps polling the main page and latest news, scraping new articles as they appear"""
+    print("=== COINDESK WATCH MODE ===")
+
+    if args.source in ('all', 'latest') and not LATEST_NEWS_AVAILABLE:
+        print("⚠️ Latest news scraper not available, watching the main page only")
+
+    # Created once: sessions, rate limiter and DB connections stay warm between polls
+    main_scraper = CoinDeskScraper(use_database=True) if args.source in ('all', 'main') else None
+    latest_scraper = None
+    if args.source in ('all', 'latest') and LATEST_NEWS_AVAILABLE:
+        latest_scraper = CoinDeskLatestNewsScraper(use_database=True)
+
+    # Unchanged listing pages are answered with 304 and not parsed again
+    if WATCH_CONFIG['use_html_cache']:
+        html_cache = HtmlCache()
+        for scraper in (main_scraper, latest_scraper):
+            if scraper and scraper.html_cache is None:
+                scraper.html_cache = html_cache
+
+    schedule = AdaptivePollSchedule(min_interval=args.min_interval, max_interval=args.max_interval)
+    watch(
+        main_scraper=main_scraper,
+        latest_scraper=latest_scraper,
+        schedule=schedule,
+        date_filter=args.date_filter,
+        limit=args.limit,
+        max_polls=args.max_polls
+    )
+
+
+def worker_command(args):
+    """Runs one queue worker; start it on several machines against the same database"""
+    if not LATEST_NEWS_AVAILABLE:
+        print("❌ Worker mode not available. Please add improved_latest_news_scraper.py")
+        return False
+
+    print("=== COINDESK QUEUE WORKER ===")
+
+    scraper = CoinDeskLatestNewsScraper(use_database=False)
+    if args.sqlite:
+        # Single-machine stand-in for the shared PostgreSQL database
+        from sqlite_database import DatabaseManager as SQLiteDatabaseManager
+        scraper.db = SQLiteDatabaseManager(args.sqlite)
+    else:
+        scraper.db = DatabaseManager()
+    scraper.use_database = True
+
+    if args.discover:
+        scraper.queue_new_articles(date_filter=args.date_filter, max_articles=args.discover)
+
+    coordinator = ShardCoordinator(scraper.db, worker_id=args.worker_id)
+    summary = run_worker(
+        scraper,
+        coordinator,
+        batch_size=args.batch_size,
+        max_articles=args.limit,
+        exit_when_idle=args.exit_when_idle
+    )
+    return summary['scraped']
 
 
 def main():
@@ -319,10 +400,25 @@ SMART SCRAPING:
   python run_scraper.py scrape-smart --date today --limit 10
   python run_scraper.py scrape-smart --date yesterday --limit 15
   python run_scraper.py scrape-smart --date 2025-06-09 --limit 20
+  python run_scraper.py scrape-smart --resume --limit 20
 
 STATUS:
   python run_scraper.py date-status --date today
   python run_scraper.py recommend
+
+WATCH:
+  python run_scraper.py watch --limit 10
+  python run_scraper.py watch --source latest --min-interval 30 --max-interval 600
+
+WORKERS (several processes or machines sharing one database):
+  python run_scraper.py worker --discover 40
+  python run_scraper.py worker --exit-when-idle
+  python run_scraper.py worker --sqlite crypto_news.db --exit-when-idle
+
+OFFLINE:
+  python run_scraper.py reparse --input html_pages --output reparsed.jsonl --compare-db
+  python run_scraper.py export --all --output articles.jsonl.gz --columns id,url,title,content
+  python run_scraper.py mark_analyzed --results sentiment_results.jsonl
         """
     )
 
@@ -339,6 +435,8 @@ STATUS:
         smart_parser.add_argument('--date', dest='date_filter', default='today')
         smart_parser.add_argument('--limit', type=int, default=10)
         smart_parser.add_argument('--verbose', action='store_true')
+        smart_parser.add_argument('--resume', action='store_true',
+                                  help='Continue with the queued URLs of earlier runs, without fetching listings')
 
     # Status
     status_parser = subparsers.add_parser('status', help='Database status')
@@ -356,6 +454,9 @@ STATUS:
     export_parser = subparsers.add_parser('export', help='Export')
     export_parser.add_argument('--output', default='articles.json')
     export_parser.add_argument('--all', action='store_true')
+    export_parser.add_argument('--format', choices=['json', 'jsonl'], help='Default: from the file extension')
+    export_parser.add_argument('--gzip', action='store_true', help='Gzip the output (default for .gz files)')
+    export_parser.add_argument('--columns', help='Comma-separated columns to export (default: all)')
 
     # Cleanup
     cleanup_parser = subparsers.add_parser('cleanup', help='Cleanup')
@@ -370,6 +471,37 @@ STATUS:
     mark_parser = subparsers.add_parser('mark_analyzed', help='Mark analyzed')
     mark_parser.add_argument('--article-id', type=int)
     mark_parser.add_argument('--all-processed', action='store_true')
+    mark_parser.add_argument('--results', metavar='FILE',
+                             help='JSONL with {"id": ..., "sentiment_result": ...} per analyzed article')
+
+    # Reparse
+    reparse_parser = subparsers.add_parser('reparse', help='Re-run extraction over saved HTML pages')
+    reparse_parser.add_argument('--input', default='html_pages', help='Directory, .zip or .tar.gz with HTML pages')
+    reparse_parser.add_argument('--output', help='Write extracted articles to this JSONL file')
+    reparse_parser.add_argument('--save-db', action='store_true', help='Save extracted articles to the database')
+    reparse_parser.add_argument('--compare-db', action='store_true', help='Diff against the stored content')
+    reparse_parser.add_argument('--workers', type=int, help='Parse processes (default: CPU count)')
+    reparse_parser.add_argument('--engine', choices=['bs4', 'lxml'], help='Parser engine override')
+
+    # Watch
+    watch_parser = subparsers.add_parser('watch', help='Keep polling and scrape new articles as they appear')
+    watch_parser.add_argument('--source', choices=['all', 'main', 'latest'], default='all')
+    watch_parser.add_argument('--date', dest='date_filter', default='today', help='Date filter for latest news')
+    watch_parser.add_argument('--limit', type=int, default=10, help='Max new articles per source and poll')
+    watch_parser.add_argument('--min-interval', type=float, help='Seconds between polls while news is coming in')
+    watch_parser.add_argument('--max-interval', type=float, help='Longest wait when nothing changes')
+    watch_parser.add_argument('--max-polls', type=int, help='Stop after this many polls (default: run forever)')
+
+    # Queue worker
+    worker_parser = subparsers.add_parser('worker', help='Scrape queued URLs together with other workers')
+    worker_parser.add_argument('--sqlite', metavar='PATH', help='Use a local SQLite file instead of PostgreSQL')
+    worker_parser.add_argument('--worker-id', help='Worker name (default: host:pid:random)')
+    worker_parser.add_argument('--discover', type=int, metavar='N',
+                               help='First queue up to N new links from latest news')
+    worker_parser.add_argument('--date', dest='date_filter', default='today', help='Date filter for --discover')
+    worker_parser.add_argument('--batch-size', type=int, help='URLs claimed per round')
+    worker_parser.add_argument('--limit', type=int, help='Stop after this many URLs (default: run forever)')
+    worker_parser.add_argument('--exit-when-idle', action='store_true', help='Stop when the queue is empty')
 
     args = parser.parse_args()
 
@@ -396,6 +528,12 @@ STATUS:
             analyze_command(args)
         elif args.command == 'mark_analyzed':
             mark_analyzed_command(args)
+        elif args.command == 'reparse':
+            reparse_command(args)
+        elif args.command == 'watch':
+            watch_command(args)
+        elif args.command == 'worker':
+            worker_command(args)
         else:
             print(f"❌ Unrecognized command: {args.command}")
             if not LATEST_NEWS_AVAILABLE:
@@ -1,6 +1,7 @@
 import requests
 from bs4 import BeautifulSoup
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urljoin
 import re
@@ -10,192 +11,70 @@ from config import (
     REQUEST_HEADERS,
     NEWS_URL_PATTERNS,
     SCRAPING_CONFIG,
+    RATE_LIMIT_CONFIG,
+    HTML_CACHE_CONFIG,
+    DEBUG_CONFIG,
     HTML_SELECTORS,
     is_valid_article_url,
     get_full_url
 )
 from postgres_database import PostgreSQLDatabaseManager
+from lxml_parser import parse_article
+from pipeline import ScrapePipeline
+from rate_limiter import get_rate_limiter
+from html_cache import HtmlCache
+from transport import create_transport
+from reparse import save_html_page
+from url_classifier import classify_url, is_article_url
+from boilerplate_filter import DEFAULT_FILTER
+
+
+class CoinDeskArticleParser:
+    """Extraction of article fields from raw HTML (no session, cache or database); parse workers use it alone"""
+
+    def build_article_data(self, article_url, raw_html):
+        """Parses raw HTML into article_data (CPU stage only); None if the article is too short"""
+        # Extract data
+        fields = self.extract_article_fields(raw_html)
+        title = fields['title']
+        content = fields['content']
+        date = fields['date']
+        author = fields['author']
+
+        # Check length
+        if len(content) < SCRAPING_CONFIG['min_article_length']:
+            print(f"⚠️  Article too short ({len(content)} chars)")
+            print(f"🔍 DEBUG first 200 chars: {content[:200]}")
+            return None
 
-
-class CoinDeskScraper:
-    def __init__(self, use_database=True):
-        print("🚀 Initializing CoinDesk Scraper...")
-        self.session = requests.Session()
-
-        # Use simpler headers
-        simple_headers = {
-            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Connection': 'keep-alive',
+        article_data = {
+            'url': article_url,
+            'title': title,
+            'content': content,
+            'date': date,
+            'author': author,
+            'scraped_at': datetime.now(),
+            'content_length': len(content)
         }
-        self.session.headers.update(simple_headers)
-        self.scraped_urls = set()
-
-        # Database integration
-        self.use_database = use_database
-        if use_database:
-            self.db = PostgreSQLDatabaseManager()
-        else:
-            self.db = None
-
-        print("✅ Scraper ready!")
 
-    def get_article_links(self):
-        """Finds all links to articles from the main page"""
-        print("🔍 Looking for articles on the main page...")
-
-        try:
-            response = self.session.get(
-                COINDESK_MAIN_PAGE,
-                timeout=SCRAPING_CONFIG['request_timeout']
-            )
-            response.raise_for_status()
+        print(f"✅ Successfully extracted article: {title[:50]}... ({len(content)} chars)")
+        return article_data
 
-            soup = BeautifulSoup(response.content, 'html.parser')
+    def extract_article_fields(self, raw_html):
+        """Extracts title, content, date and author with the configured parser engine"""
+        if SCRAPING_CONFIG['parser_engine'] == 'lxml':
+            # Single parse and single tree walk
+            return parse_article(raw_html, self._is_meaningful_paragraph)
 
-            # Look for all <a> tags with href
-            article_links = []
-            all_links = soup.find_all('a', href=True)
-
-            for link in all_links:
-                href = link['href']
-
-                # Make full URL
-                if href.startswith('/'):
-                    full_url = f"https://www.coindesk.com{href}"
-                elif href.startswith('http'):
-                    full_url = href
-                else:
-                    continue
-
-                # Improved URL validation
-                if self._is_valid_article_url_improved(href):
-                    title = self._extract_link_title(link)
-                    if title and len(title) > 15:
-                        article_links.append({
-                            'url': full_url,
-                            'title': title,
-                            'href': href
-                        })
-
-            # Remove duplicate URLs
-            unique_articles = []
-            seen_urls = set()
-            for article in article_links:
-                if article['url'] not in seen_urls:
-                    unique_articles.append(article)
-                    seen_urls.add(article['url'])
+        content_text = raw_html.decode('utf-8', errors='ignore')
+        soup = BeautifulSoup(content_text, 'html.parser')
 
-            print(f"📰 Found {len(unique_articles)} unique articles")
-
-            # DEBUG information
-            print("🔍 First 5 articles for verification:")
-            for i, article in enumerate(unique_articles[:5], 1):
-                print(f"  {i}. {article['title'][:60]}...")
-
-            return unique_articles
-
-        except Exception as e:
-            print(f"❌ Error extracting links: {str(e)}")
-            return []
-
-    def _is_valid_article_url_improved(self, href):
-        """Improved logic for validating article URLs"""
-
-        if not href or href in ['#', '/', '']:
-            return False
-
-        if href.startswith('http') and 'coindesk.com' not in href:
-            return False
-
-        if href.startswith('#') or href.startswith('mailto:') or href.startswith('tel:'):
-            return False
-
-        # Exclude system pages
-        exclude_patterns = [
-            '/newsletters/', '/podcasts/', '/events/', '/about/', '/careers/',
-            '/advertise/', '/price/', '/author/', '/tag/', '/sponsored-content/',
-            '/_next/', '/api/'
-        ]
-
-        for pattern in exclude_patterns:
-            if pattern in href:
-                return False
-
-        # Look for articles with year in URL or categories
-        date_patterns = [
-            r'/\d{4}/\d{2}/\d{2}/',  # /2025/06/09/
-            r'/2025/', r'/2024/'
-        ]
-
-        has_date = any(re.search(pattern, href) for pattern in date_patterns)
-
-        news_categories = ['/markets/', '/policy/', '/tech/', '/business/', '/layer2/', '/web3/']
-        has_category = any(category in href for category in news_categories)
-
-        return has_date or has_category
-
-    def _extract_link_title(self, link):
-        """Extracts title from link element"""
-        text = link.get_text().strip()
-        if text and len(text) > 5:
-            return ' '.join(text.split())
-
-        title_attr = link.get('title', '').strip()
-        if title_attr:
-            return title_attr
-
-        aria_label = link.get('aria-label', '').strip()
-        if aria_label:
-            return aria_label
-
-        return ""
-
-    def scrape_single_article(self, article_url):
-        """Extracts content of one article"""
-        print(f"📄 Scraping article: {article_url}")
-
-        try:
-            time.sleep(SCRAPING_CONFIG['delay_between_requests'])
-
-            response = self.session.get(
-                article_url,
-                timeout=SCRAPING_CONFIG['request_timeout']
-            )
-            response.raise_for_status()
-
-            content_text = response.content.decode('utf-8', errors='ignore')
-            soup = BeautifulSoup(content_text, 'html.parser')
-
-            # Extract data
-            title = self._extract_title_improved(soup)
-            content = self._extract_content_improved(soup)
-            date = self._extract_date_improved(soup)
-            author = self._extract_author_improved(soup)
-
-            # Check length
-            if len(content) < SCRAPING_CONFIG['min_article_length']:
-                print(f"⚠️  Article too short ({len(content)} chars)")
-                print(f"🔍 DEBUG first 200 chars: {content[:200]}")
-                return None
-
-            article_data = {
-                'url': article_url,
-                'title': title,
-                'content': content,
-                'date': date,
-                'author': author,
-                'scraped_at': datetime.now(),
-                'content_length': len(content)
-            }
-
-            print(f"✅ Successfully extracted article: {title[:50]}... ({len(content)} chars)")
-            return article_data
-
-        except Exception as e:
-            print(f"❌ Error scraping {article_url}: {str(e)}")
-            return None
+        return {
+            'title': self._extract_title_improved(soup),
+            'content': self._extract_content_improved(soup),
+            'date': self._extract_date_improved(soup),
+            'author': self._extract_author_improved(soup),
+        }
 
     def _extract_title_improved(self, soup):
         """Improved title extraction"""
@@ -298,25 +177,12 @@ class CoinDeskScraper:
 
     def _is_meaningful_paragraph(self, text):
         """Checks if paragraph is meaningful"""
-        if len(text) < 20:
-            return False
-
-        exclude_phrases = [
-            'Sign up', 'Subscribe', 'Newsletter', 'See all newsletters',
-            'Don\'t miss', 'By signing up', 'privacy policy', 'terms of use',
-            'Cookie', 'Advertisement', 'Sponsored', 'Follow us', 'Share this',
-            'Read more', 'Click here', 'Download', 'Watch', 'Listen'
-        ]
-
-        text_lower = text.lower()
-        for phrase in exclude_phrases:
-            if phrase.lower() in text_lower:
-                return False
+        reason = DEFAULT_FILTER.rejection_reason(text)
 
-        if text.count('.') < 1:
-            return False
+        if reason and DEBUG_CONFIG['log_rejected_paragraphs']:
+            print(f"🚫 Rejected paragraph ({reason}): {text[:60]}")
 
-        return True
+        return reason is None
 
     def _extract_date_improved(self, soup):
         """Improved date extraction"""
@@ -373,6 +239,156 @@ class CoinDeskScraper:
 
         return "Unknown author"
 
+
+class CoinDeskScraper(CoinDeskArticleParser):
+    def __init__(self, use_database=True):
+        print("🚀 Initializing CoinDesk Scraper...")
+        self.session = requests.Session()
+
+        # Use simpler headers
+        simple_headers = {
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+            'Connection': 'keep-alive',
+        }
+        self.session.headers.update(simple_headers)
+        self.scraped_urls = set()
+
+        # Sync (requests) or async (aiohttp) downloads, see SCRAPING_CONFIG['transport']
+        self.transport = create_transport(self.session)
+
+        # Per-host politeness budget shared by all fetch workers and scrapers
+        self.rate_limiter = get_rate_limiter()
+
+        # Raw HTML cache (conditional GET) and the last parsed main page
+        self.html_cache = HtmlCache() if HTML_CACHE_CONFIG['enabled'] else None
+        self._main_page_links = None
+
+        # Database integration
+        self.use_database = use_database
+        if use_database:
+            self.db = PostgreSQLDatabaseManager()
+        else:
+            self.db = None
+
+        print("✅ Scraper ready!")
+
+    def get_article_links(self):
+        """Finds all links to articles from the main page"""
+        print("🔍 Looking for articles on the main page...")
+
+        try:
+            result = self.transport.fetch(
+                COINDESK_MAIN_PAGE,
+                timeout=SCRAPING_CONFIG['request_timeout'],
+                cache=self.html_cache,
+                rate_limiter=self.rate_limiter
+            )
+
+            # Unchanged page: skip parsing and reuse the links from last time
+            if result.not_modified and self._main_page_links is not None:
+                print(f"♻️ Main page not modified, reusing {len(self._main_page_links)} articles")
+                return list(self._main_page_links)
+
+            soup = BeautifulSoup(result.content, 'html.parser')
+
+            # Look for all <a> tags with href
+            article_links = []
+            all_links = soup.find_all('a', href=True)
+
+            for link in all_links:
+                href = link['href']
+
+                # Make full URL
+                if href.startswith('/'):
+                    full_url = f"https://www.coindesk.com{href}"
+                elif href.startswith('http'):
+                    full_url = href
+                else:
+                    continue
+
+                # Improved URL validation (category and date in one regex match)
+                url_info = classify_url(href)
+                if url_info and (url_info.year or url_info.category):
+                    title = self._extract_link_title(link)
+                    if title and len(title) > 15:
+                        article_links.append({
+                            'url': full_url,
+                            'title': title,
+                            'href': href,
+                            'category': url_info.category
+                        })
+
+            # Remove duplicate URLs
+            unique_articles = []
+            seen_urls = set()
+            for article in article_links:
+                if article['url'] not in seen_urls:
+                    unique_articles.append(article)
+                    seen_urls.add(article['url'])
+
+            print(f"📰 Found {len(unique_articles)} unique articles")
+            self._main_page_links = unique_articles
+
+            # DEBUG information
+            print("🔍 First 5 articles for verification:")
+            for i, article in enumerate(unique_articles[:5], 1):
+                print(f"  {i}. {article['title'][:60]}...")
+
+            return unique_articles
+
+        except Exception as e:
+            print(f"❌ Error extracting links: {str(e)}")
+            return []
+
+    def _is_valid_article_url_improved(self, href):
+        """Improved logic for validating article URLs"""
+        return is_article_url(href)
+
+    def _extract_link_title(self, link):
+        """Extracts title from link element"""
+        text = link.get_text().strip()
+        if text and len(text) > 5:
+            return ' '.join(text.split())
+
+        title_attr = link.get('title', '').strip()
+        if title_attr:
+            return title_attr
+
+        aria_label = link.get('aria-label', '').strip()
+        if aria_label:
+            return aria_label
+
+        return ""
+
+    def scrape_single_article(self, article_url):
+        """Extracts content of one article"""
+        print(f"📄 Scraping article: {article_url}")
+
+        try:
+            raw_html = self.fetch_article_html(article_url)
+            return self.build_article_data(article_url, raw_html)
+
+        except Exception as e:
+            print(f"❌ Error scraping {article_url}: {str(e)}")
+            return None
+
+    def fetch_article_html(self, article_url):
+        """Downloads the raw HTML of one article (network stage only)"""
+        result = self.transport.fetch(
+            article_url,
+            timeout=SCRAPING_CONFIG['request_timeout'],
+            cache=self.html_cache,
+            rate_limiter=self.rate_limiter
+        )
+
+        # Capture for offline re-parsing
+        if DEBUG_CONFIG['save_html_files']:
+            save_html_page(article_url, result.content)
+
+        return result.content
+
     def scrape_multiple_articles(self, max_articles=None, save_to_db=True):
         """Scrapes multiple articles"""
         if max_articles is None:
@@ -390,16 +406,12 @@ class CoinDeskScraper:
         # Database filtering
         if self.db and save_to_db:
             print("🔍 Checking for duplicate URLs...")
-            new_article_links = []
-            skipped_count = 0
+            seen_urls = self.db.get_scraped_urls([link_info['url'] for link_info in article_links])
+            new_article_links = [link_info for link_info in article_links if link_info['url'] not in seen_urls]
+            skipped_count = len(article_links) - len(new_article_links)
 
-            for link_info in article_links:
-                url = link_info['url']
-                if not self.db.is_url_scraped_before(url):
-                    new_article_links.append(link_info)
-                else:
-                    skipped_count += 1
-                    self.db.record_scraped_url(url)
+            if seen_urls:
+                self.db.record_scraped_urls(seen_urls)
 
             print(f"📊 {len(new_article_links)} new articles, {skipped_count} already scraped")
             article_links = new_article_links
@@ -411,29 +423,41 @@ class CoinDeskScraper:
             print("ℹ️ All articles already scraped")
             return []
 
-        # Scraping
+        # Scraping (bounded concurrency, results are consumed in link order)
         scraped_articles = []
         successful_count = 0
         failed_count = 0
 
-        for i, link_info in enumerate(article_links, 1):
-            url = link_info['url']
-            print(f"\n[{i}/{len(article_links)}] {link_info['title'][:60]}...")
+        if SCRAPING_CONFIG['use_parse_pool']:
+            # Fetch threads -> process pool parse -> single batched DB writer
+            pipeline = ScrapePipeline(self)
+            scraped_articles = pipeline.run(article_links, save_to_db=bool(self.db and save_to_db))
+            successful_count = len(scraped_articles)
+            failed_count = len(article_links) - successful_count
+        else:
+            max_workers = max(1, min(SCRAPING_CONFIG['max_workers'], len(article_links)))
+            print(f"⚙️ Fetching with {max_workers} worker(s), "
+                  f"max {RATE_LIMIT_CONFIG['requests_per_second']} requests/sec per host")
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(self.scrape_single_article, [link['url'] for link in article_links])
+
+                for i, (link_info, article_data) in enumerate(zip(article_links, results), 1):
+                    print(f"\n[{i}/{len(article_links)}] {link_info['title'][:60]}...")
 
-            article_data = self.scrape_single_article(url)
-            if article_data:
-                scraped_articles.append(article_data)
-                successful_count += 1
+                    if article_data:
+                        scraped_articles.append(article_data)
+                        successful_count += 1
 
-                if self.db and save_to_db:
-                    self.db.save_article(article_data)
-            else:
-                failed_count += 1
-                print(f"❌ Failed to extract article {i}")
+                        if self.db and save_to_db:
+                            self.db.save_article(article_data)
+                    else:
+                        failed_count += 1
+                        print(f"❌ Failed to extract article {i}")
 
-            if i % 5 == 0:
-                print(f"📊 Progress: {i}/{len(article_links)} articles processed")
-                print(f"    ✅ Successful: {successful_count}, ❌ Failed: {failed_count}")
+                    if i % 5 == 0:
+                        print(f"📊 Progress: {i}/{len(article_links)} articles processed")
+                        print(f"    ✅ Successful: {successful_count}, ❌ Failed: {failed_count}")
 
         print(f"\n🎉 Scraping completed!")
         print(f"📊 Final result: {successful_count} successful, {failed_count} failed articles")
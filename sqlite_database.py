@@ -1,27 +1,122 @@
 import sqlite3
 import json
+import threading
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
+from article_export import EXPORT_BATCH_SIZE, select_columns, write_articles
+from config import DATABASE_CONFIG, QUEUE_CONFIG
+from migrations import SCHEMA_MIGRATIONS_TABLE_SQL, SQLITE_MIGRATIONS, pending_migrations
+from retention import SQLiteRetention
+from url_classifier import published_on_for
+
+# SQLite's default limit for host parameters in one statement is 999
+SQLITE_MAX_VARIABLES = 900
+
+# Per-connection settings (journal_mode=WAL is persistent and set in init_database)
+SQLITE_CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=1000",
+    "PRAGMA temp_store=memory",
+]
+
+UPSERT_SCRAPED_URL_SQL = '''
+    INSERT INTO scraped_urls (url) VALUES (?)
+    ON CONFLICT(url) DO UPDATE SET
+        last_seen_at = CURRENT_TIMESTAMP,
+        scrape_count = scrape_count + 1
+'''
+
+
+def _sql_published_on(url, published_date, scraped_at):
+    """SQL function: publish date as 'YYYY-MM-DD' (URL date, page date, else the scrape day)"""
+    return published_on_for(url, published_date, fallback=published_on_for(None, scraped_at)).isoformat()
+
 
 class DatabaseManager:
-    def __init__(self, db_path="crypto_news.db"):
+    def __init__(self, db_path="crypto_news.db", persistent=None):
         """Initializes database connection"""
         self.db_path = db_path
+
+        # Persistent mode keeps one long-lived connection per thread
+        if persistent is None:
+            persistent = DATABASE_CONFIG['sqlite_persistent_connection']
+        self.persistent = persistent
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
         print(f"🗄️ Initializing database: {db_path}")
         self.init_database()
         print("✅ Database ready!")
 
+    def _connect(self, timeout=30.0):
+        """Opens a new connection with the per-connection PRAGMAs applied"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=timeout,
+            cached_statements=DATABASE_CONFIG['sqlite_statement_cache_size'],
+            check_same_thread=False  # Each thread still gets its own connection; close() may run elsewhere
+        )
+        for pragma in SQLITE_CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        # Used by the published_on backfill migration
+        conn.create_function('published_on_for', 3, _sql_published_on, deterministic=True)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Yields a connection; commits on success and rolls back on error"""
+        if self.persistent:
+            conn = getattr(self._local, 'conn', None)
+            if conn is None:
+                conn = self._connect()
+                self._local.conn = conn
+                with self._connections_lock:
+                    self._connections.append(conn)
+
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        else:
+            conn = self._connect()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    def close(self):
+        """Closes all cached connections (persistent mode)"""
+        with self._connections_lock:
+            connections = self._connections
+            self._connections = []
+
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def init_database(self):
         """Creates tables if they don't exist"""
-        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
 
             # Settings for better concurrency
             cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.execute("PRAGMA synchronous=NORMAL")
-            cursor.execute("PRAGMA cache_size=1000")
-            cursor.execute("PRAGMA temp_store=memory")
 
             # Main table for articles
             cursor.execute('''
@@ -51,17 +146,85 @@ class DatabaseManager:
                 )
             ''')
 
-            # Indexes for performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_url ON articles(url)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_articles_processed ON articles(processed)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_scraped_urls_url ON scraped_urls(url)')
+            # Crawl watermark per listing feed (newest article seen by the last complete run)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS crawl_state (
+                    feed TEXT PRIMARY KEY,
+                    newest_url TEXT NOT NULL,
+                    newest_published_date TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Work queue: discovered URLs waiting to be fetched (survives crashed runs)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS pending_urls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT UNIQUE NOT NULL,
+                    title TEXT,
+                    source TEXT,
+                    status TEXT NOT NULL DEFAULT 'discovered',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires_at TIMESTAMP NULL,
+                    last_error TEXT,
+                    url_hash INTEGER,
+                    discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Queues created before sharding have no url_hash (those rows stay claimable by any shard)
+            pending_columns = {row[1] for row in cursor.execute("PRAGMA table_info(pending_urls)")}
+            if 'url_hash' not in pending_columns:
+                cursor.execute("ALTER TABLE pending_urls ADD COLUMN url_hash INTEGER")
+
+            # Live scraper workers sharing this database (heartbeats decide the shard assignment)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS scrape_workers (
+                    worker_id TEXT PRIMARY KEY,
+                    hostname TEXT,
+                    pid INTEGER,
+                    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    heartbeat_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # Indexes for performance (article indexes: see migrations.py)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_pending_urls_status ON pending_urls(status, id)')
+
+            self._apply_migrations(cursor)
 
             conn.commit()
 
+    def _apply_migrations(self, cursor):
+        """Applies the pending SQLITE_MIGRATIONS and records them in schema_migrations"""
+        cursor.execute(SCHEMA_MIGRATIONS_TABLE_SQL)
+        applied = {row[0] for row in cursor.execute("SELECT version FROM schema_migrations")}
+
+        for migration in pending_migrations(SQLITE_MIGRATIONS, applied):
+            cursor.execute("SAVEPOINT migration")
+            try:
+                for statement in migration.statements:
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (migration.version, migration.name)
+                )
+            except sqlite3.Error as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT migration")
+                cursor.execute("RELEASE SAVEPOINT migration")
+                if not migration.optional:
+                    raise
+                print(f"⚠️ Optional migration {migration.version} ({migration.name}) skipped: {str(e)}")
+                continue
+
+            cursor.execute("RELEASE SAVEPOINT migration")
+            print(f"🔧 Applied migration {migration.version}: {migration.name}")
+
     def is_article_exists(self, url):
         """Checks if article already exists in database"""
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT 1 FROM articles WHERE url = ?", (url,))
                 return cursor.fetchone() is not None
@@ -71,47 +234,279 @@ class DatabaseManager:
     def is_url_scraped_before(self, url):
         """Checks if URL has been scraped before"""
         try:
-            with sqlite3.connect(self.db_path, timeout=10.0) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT 1 FROM scraped_urls WHERE url = ?", (url,))
                 return cursor.fetchone() is not None
         except Exception:
             return False
 
-    def record_scraped_url(self, url):
-        """Records or updates URL in history - used separately"""
+    def get_scraped_urls(self, urls):
+        """Returns the subset of URLs that have been scraped before (one query per chunk)"""
+        urls = list(dict.fromkeys(urls))
+        seen_urls = set()
+
         try:
-            with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
 
-                # Check if it exists
-                cursor.execute("SELECT scrape_count FROM scraped_urls WHERE url = ?", (url,))
-                existing = cursor.fetchone()
-
-                if existing:
-                    # Update existing record
-                    cursor.execute('''
-                        UPDATE scraped_urls 
-                        SET last_seen_at = CURRENT_TIMESTAMP, 
-                            scrape_count = scrape_count + 1 
-                        WHERE url = ?
-                    ''', (url,))
-                else:
-                    # Insert new record
-                    cursor.execute('''
-                        INSERT INTO scraped_urls (url) VALUES (?)
-                    ''', (url,))
+                for start in range(0, len(urls), SQLITE_MAX_VARIABLES):
+                    chunk = urls[start:start + SQLITE_MAX_VARIABLES]
+                    placeholders = ','.join('?' * len(chunk))
+                    cursor.execute(f"SELECT url FROM scraped_urls WHERE url IN ({placeholders})", chunk)
+                    seen_urls.update(row[0] for row in cursor.fetchall())
+        except Exception as e:
+            print(f"❌ Error checking URLs: {str(e)}")
 
-                conn.commit()
+        return seen_urls
+
+    def record_scraped_url(self, url):
+        """Records or updates URL in history - used separately"""
+        try:
+            with self.connection() as conn:
+                conn.execute(UPSERT_SCRAPED_URL_SQL, (url,))
                 return True
         except Exception as e:
             print(f"❌ Error recording URL: {str(e)}")
             return False
 
+    def record_scraped_urls(self, urls):
+        """Records or updates many URLs in history in one transaction"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return True
+
+        try:
+            with self.connection() as conn:
+                conn.executemany(UPSERT_SCRAPED_URL_SQL, [(url,) for url in urls])
+                return True
+        except Exception as e:
+            print(f"❌ Error recording URLs: {str(e)}")
+            return False
+
+    def get_crawl_watermark(self, feed):
+        """Returns {'newest_url', 'newest_published_date'} for a listing feed or None"""
+        try:
+            with self.connection() as conn:
+                row = conn.execute(
+                    "SELECT newest_url, newest_published_date FROM crawl_state WHERE feed = ?", (feed,)
+                ).fetchone()
+        except Exception as e:
+            print(f"❌ Error reading crawl watermark: {str(e)}")
+            return None
+
+        if row is None:
+            return None
+        return {'newest_url': row[0], 'newest_published_date': row[1]}
+
+    def set_crawl_watermark(self, feed, newest_url, newest_published_date=None):
+        """Stores the newest article seen by a complete crawl of a listing feed"""
+        try:
+            with self.connection() as conn:
+                conn.execute('''
+                    INSERT INTO crawl_state (feed, newest_url, newest_published_date)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(feed) DO UPDATE SET
+                        newest_url = excluded.newest_url,
+                        newest_published_date = excluded.newest_published_date,
+                        updated_at = CURRENT_TIMESTAMP
+                ''', (feed, newest_url, newest_published_date))
+                return True
+        except Exception as e:
+            print(f"❌ Error saving crawl watermark: {str(e)}")
+            return False
+
+    def enqueue_pending_urls(self, links, source=None):
+        """Adds discovered links ({'url', 'title'}) to the work queue; returns how many were new"""
+        rows = [(link['url'], link.get('title'), source, zlib.crc32(link['url'].encode('utf-8')))
+                for link in links]
+        if not rows:
+            return 0
+
+        try:
+            with self.connection() as conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT INTO pending_urls (url, title, source, url_hash) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO NOTHING",
+                    rows
+                )
+                return conn.total_changes - before
+        except Exception as e:
+            print(f"❌ Error queueing URLs: {str(e)}")
+            return None
+
+    def claim_pending_urls(self, worker_id, limit=None, lease_seconds=None, max_attempts=None, shard=None):
+        """Leases up to `limit` queued URLs to a worker; returns [{'id', 'url', 'title', 'attempts'}]
+
+        Claimable: new URLs, URLs whose lease expired (crashed worker) and failed
+        URLs after QUEUE_CONFIG['retry_failed_after'], all below max_attempts.
+        Expired leases with no attempts left are marked failed.
+        shard=(index, count) only claims URLs with url_hash % count == index.
+        """
+        limit = limit or QUEUE_CONFIG['claim_batch_size']
+        lease_seconds = lease_seconds or QUEUE_CONFIG['lease_seconds']
+        max_attempts = max_attempts or QUEUE_CONFIG['max_attempts']
+
+        shard_sql = ''
+        shard_params = []
+        if shard and shard[1] > 1:
+            shard_sql = 'AND (url_hash IS NULL OR url_hash % ? = ?)'
+            shard_params = [shard[1], shard[0]]
+
+        try:
+            with self.connection() as conn:
+                # BEGIN IMMEDIATE takes the write lock, so two processes never claim the same rows
+                conn.execute("BEGIN IMMEDIATE")
+
+                # Out of attempts: an expired lease (or a released URL) would otherwise never leave the queue
+                conn.execute('''
+                    UPDATE pending_urls
+                    SET status = 'failed', last_error = COALESCE(last_error, 'lease expired, no attempts left'),
+                        lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE attempts >= ? AND (
+                        status = 'discovered'
+                        OR (status = 'in_progress' AND lease_expires_at < CURRENT_TIMESTAMP)
+                    )
+                ''', (max_attempts,))
+
+                rows = conn.execute(f'''
+                    SELECT id, url, title, attempts FROM pending_urls
+                    WHERE attempts < ? AND (
+                        status = 'discovered'
+                        OR (status = 'in_progress' AND lease_expires_at < CURRENT_TIMESTAMP)
+                        OR (status = 'failed' AND updated_at < datetime('now', ?))
+                    ) {shard_sql}
+                    ORDER BY id
+                    LIMIT ?
+                ''', [max_attempts, f"-{QUEUE_CONFIG['retry_failed_after']} seconds"] + shard_params + [limit]).fetchall()
+
+                if rows:
+                    placeholders = ','.join('?' * len(rows))
+                    conn.execute(f'''
+                        UPDATE pending_urls
+                        SET status = 'in_progress', lease_owner = ?, lease_expires_at = datetime('now', ?),
+                            attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                        WHERE id IN ({placeholders})
+                    ''', [worker_id, f"+{lease_seconds} seconds"] + [row[0] for row in rows])
+
+                return [{'id': row[0], 'url': row[1], 'title': row[2], 'attempts': row[3] + 1} for row in rows]
+        except Exception as e:
+            print(f"❌ Error claiming queued URLs: {str(e)}")
+            return []
+
+    def complete_pending_urls(self, urls, worker_id):
+        """Marks queued URLs leased by worker_id as done (URLs whose lease passed to another worker are left alone)"""
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return True
+
+        try:
+            with self.connection() as conn:
+                conn.executemany('''
+                    UPDATE pending_urls
+                    SET status = 'done', lease_owner = NULL, lease_expires_at = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE url = ? AND lease_owner = ? AND status = 'in_progress'
+                ''', [(url, worker_id) for url in urls])
+                return True
+        except Exception as e:
+            print(f"❌ Error completing queued URLs: {str(e)}")
+            return False
+
+    def fail_pending_url(self, url, worker_id, error=None):
+        """Marks a queued URL leased by worker_id as failed (it is retried later until max_attempts)"""
+        try:
+            with self.connection() as conn:
+                conn.execute('''
+                    UPDATE pending_urls
+                    SET status = 'failed', last_error = ?, lease_owner = NULL, lease_expires_at = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE url = ? AND lease_owner = ? AND status = 'in_progress'
+                ''', (error, url, worker_id))
+                return True
+        except Exception as e:
+            print(f"❌ Error failing queued URL: {str(e)}")
+            return False
+
+    def maintain_partitions(self, force=False):
+        """SQLite tables are not partitioned; nothing to maintain (see PostgreSQLDatabaseManager)"""
+        return False
+
+    def heartbeat_worker(self, worker_id, hostname=None, pid=None, timeout=None, lease_seconds=None):
+        """Registers / refreshes a worker and renews its leases; returns the ids of all live workers, sorted"""
+        lease_seconds = lease_seconds or QUEUE_CONFIG['lease_seconds']
+        try:
+            with self.connection() as conn:
+                conn.execute('''
+                    INSERT INTO scrape_workers (worker_id, hostname, pid) VALUES (?, ?, ?)
+                    ON CONFLICT(worker_id) DO UPDATE SET heartbeat_at = CURRENT_TIMESTAMP
+                ''', (worker_id, hostname, pid))
+                # A live worker keeps its URLs however slow the batch is
+                conn.execute('''
+                    UPDATE pending_urls SET lease_expires_at = datetime('now', ?)
+                    WHERE lease_owner = ? AND status = 'in_progress'
+                ''', (f"+{lease_seconds} seconds", worker_id))
+                rows = conn.execute(
+                    "SELECT worker_id FROM scrape_workers WHERE heartbeat_at >= datetime('now', ?) ORDER BY worker_id",
+                    (f"-{timeout} seconds",)
+                ).fetchall()
+                return [row[0] for row in rows]
+        except Exception as e:
+            print(f"❌ Error saving worker heartbeat: {str(e)}")
+            return []
+
+    def reap_dead_workers(self, timeout):
+        """Removes workers without a heartbeat for `timeout` seconds and releases their leases; returns their ids"""
+        try:
+            with self.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                dead = [row[0] for row in conn.execute(
+                    "SELECT worker_id FROM scrape_workers WHERE heartbeat_at < datetime('now', ?)",
+                    (f"-{timeout} seconds",)
+                ).fetchall()]
+
+                for start in range(0, len(dead), SQLITE_MAX_VARIABLES):
+                    chunk = dead[start:start + SQLITE_MAX_VARIABLES]
+                    placeholders = ','.join('?' * len(chunk))
+                    conn.execute(f'''
+                        UPDATE pending_urls
+                        SET status = 'discovered', lease_owner = NULL, lease_expires_at = NULL,
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE status = 'in_progress' AND lease_owner IN ({placeholders})
+                    ''', chunk)
+                    conn.execute(f"DELETE FROM scrape_workers WHERE worker_id IN ({placeholders})", chunk)
+
+                return dead
+        except Exception as e:
+            print(f"❌ Error reaping dead workers: {str(e)}")
+            return []
+
+    def unregister_worker(self, worker_id):
+        """Removes a worker and puts its unfinished URLs back in the queue"""
+        try:
+            with self.connection() as conn:
+                conn.execute('''
+                    UPDATE pending_urls
+                    SET status = 'discovered', lease_owner = NULL, lease_expires_at = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE status = 'in_progress' AND lease_owner = ?
+                ''', (worker_id,))
+                conn.execute("DELETE FROM scrape_workers WHERE worker_id = ?", (worker_id,))
+                return True
+        except Exception as e:
+            print(f"❌ Error removing worker: {str(e)}")
+            return False
+
+    def get_pending_stats(self):
+        """Returns the number of queued URLs per status"""
+        with self.connection() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM pending_urls GROUP BY status").fetchall()
+        return dict(rows)
+
     def save_article(self, article_data):
         """Saves article to database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.connection() as conn:
                 cursor = conn.cursor()
 
                 # Check if article already exists
@@ -119,47 +514,26 @@ class DatabaseManager:
                 if cursor.fetchone():
                     print(f"⚠️ Article already exists: {article_data['title'][:50]}...")
                     # Record in URL history
-                    self.record_scraped_url(article_data['url'])
+                    cursor.execute(UPSERT_SCRAPED_URL_SQL, (article_data['url'],))
                     return False
 
                 # Save the article
                 cursor.execute('''
                     INSERT INTO articles 
-                    (url, title, content, author, published_date, content_length)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                    (url, title, content, author, published_date, content_length, published_on)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     article_data['url'],
                     article_data['title'],
                     article_data['content'],
                     article_data['author'],
                     str(article_data['date']),
-                    article_data['content_length']
+                    article_data['content_length'],
+                    published_on_for(article_data['url'], article_data['date']).isoformat()
                 ))
 
-                # Record in URL history in separate transaction
-                conn.commit()
-
-            # Record URL history in separate connection
-            with sqlite3.connect(self.db_path) as conn2:
-                cursor2 = conn2.cursor()
-
-                # Check if URL exists
-                cursor2.execute("SELECT scrape_count FROM scraped_urls WHERE url = ?", (article_data['url'],))
-                existing = cursor2.fetchone()
-
-                if existing:
-                    cursor2.execute('''
-                        UPDATE scraped_urls 
-                        SET last_seen_at = CURRENT_TIMESTAMP, 
-                            scrape_count = scrape_count + 1 
-                        WHERE url = ?
-                    ''', (article_data['url'],))
-                else:
-                    cursor2.execute('''
-                        INSERT INTO scraped_urls (url) VALUES (?)
-                    ''', (article_data['url'],))
-
-                conn2.commit()
+                # Record URL history in the same transaction
+                cursor.execute(UPSERT_SCRAPED_URL_SQL, (article_data['url'],))
 
             print(f"✅ Saved article: {article_data['title'][:50]}...")
             return True
@@ -169,43 +543,130 @@ class DatabaseManager:
             return False
 
     def save_multiple_articles(self, articles):
-        """Saves multiple articles"""
+        """Saves multiple articles with one executemany (plus one URL history UPSERT)"""
         print(f"💾 Saving {len(articles)} articles to database...")
 
         saved_count = 0
         duplicate_count = 0
 
-        for article in articles:
-            if self.save_article(article):
-                saved_count += 1
-            else:
-                duplicate_count += 1
+        rows = [(
+            article['url'],
+            article['title'],
+            article['content'],
+            article['author'],
+            str(article['date']),
+            article['content_length'],
+            published_on_for(article['url'], article['date']).isoformat()
+        ) for article in articles]
+
+        if not rows:
+            return saved_count, duplicate_count
+
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+
+                # Duplicates are skipped by the UNIQUE(url) constraint; rowcount counts the inserted rows
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO articles 
+                    (url, title, content, author, published_date, content_length, published_on)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                inserted_count = cursor.rowcount
+
+                # URL history for every article, in the same transaction
+                urls = list(dict.fromkeys(article['url'] for article in articles))
+                cursor.executemany(UPSERT_SCRAPED_URL_SQL, [(url,) for url in urls])
+
+            saved_count = inserted_count
+            duplicate_count = len(rows) - saved_count
+
+        except Exception as e:
+            print(f"❌ Error saving articles: {str(e)}")
 
         print(f"📊 Result: {saved_count} new articles, {duplicate_count} duplicates")
         return saved_count, duplicate_count
 
-    def get_unprocessed_articles(self, limit=None):
-        """Returns unprocessed articles for analysis"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row  # For dictionary-like results
-            cursor = conn.cursor()
-
-            query = '''
-                SELECT id, url, title, content, author, published_date, content_length, scraped_at
-                FROM articles 
-                WHERE processed = FALSE 
-                ORDER BY scraped_at DESC
-            '''
+    def get_articles_by_urls(self, urls):
+        """Returns {url: article dict} for the stored articles among the given URLs"""
+        urls = list(dict.fromkeys(urls))
+        articles = {}
 
-            if limit:
-                query += f" LIMIT {limit}"
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
+
+            for start in range(0, len(urls), SQLITE_MAX_VARIABLES):
+                chunk = urls[start:start + SQLITE_MAX_VARIABLES]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f"""
+                    SELECT id, url, title, content, author, published_date, content_length
+                    FROM articles WHERE url IN ({placeholders})
+                """, chunk)
+                articles.update((row['url'], dict(row)) for row in cursor.fetchall())
+
+        return articles
+
+    def iter_unprocessed_articles(self, columns=None, batch_size=None, limit=None):
+        """Yields unprocessed articles, newest first, one keyset page of batch_size rows per query
+
+        Pages continue after the last (scraped_at, id), so marking articles as
+        analyzed between pages neither skips nor repeats any.
+        """
+        batch_size = batch_size or DATABASE_CONFIG['unprocessed_batch_size']
+        with self.connection() as conn:
+            available = self._article_columns(conn)
+        columns = select_columns(columns or ['id', 'url', 'title', 'content', 'author', 'published_date',
+                                             'content_length', 'scraped_at'], available)
+        keyset_columns = [column for column in ('scraped_at', 'id') if column not in columns]
+        column_sql = ', '.join(columns + keyset_columns)
+
+        last_key = None
+        yielded = 0
+        while limit is None or yielded < limit:
+            page_size = batch_size if limit is None else min(batch_size, limit - yielded)
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.row_factory = sqlite3.Row
+                if last_key is None:
+                    cursor.execute(f'''
+                        SELECT {column_sql} FROM articles
+                        WHERE processed = FALSE
+                        ORDER BY scraped_at DESC, id DESC
+                        LIMIT ?
+                    ''', (page_size,))
+                else:
+                    cursor.execute(f'''
+                        SELECT {column_sql} FROM articles
+                        WHERE processed = FALSE AND (scraped_at, id) < (?, ?)
+                        ORDER BY scraped_at DESC, id DESC
+                        LIMIT ?
+                    ''', (*last_key, page_size))
+                rows = cursor.fetchall()
+
+            if not rows:
+                break
+            last_key = (rows[-1]['scraped_at'], rows[-1]['id'])
+
+            for row in rows:
+                yield {column: row[column] for column in columns}
+            yielded += len(rows)
+            if len(rows) < page_size:
+                break
+
+    def get_unprocessed_articles(self, limit=None, columns=None):
+        """Returns unprocessed articles for analysis"""
+        return list(self.iter_unprocessed_articles(columns, limit=limit))
 
-            cursor.execute(query)
-            return [dict(row) for row in cursor.fetchall()]
+    def count_articles_published_on(self, day):
+        """Returns how many stored articles were published on a day (date or 'YYYY-MM-DD')"""
+        with self.connection() as conn:
+            row = conn.execute("SELECT COUNT(*) FROM articles WHERE published_on = ?", (str(day),)).fetchone()
+        return row[0]
 
     def mark_article_as_analyzed(self, article_id, sentiment_result=None):
         """Marks article as analyzed"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
 
             sentiment_json = json.dumps(sentiment_result) if sentiment_result else None
@@ -221,27 +682,38 @@ class DatabaseManager:
             conn.commit()
             print(f"✅ Article {article_id} marked as analyzed")
 
-    def cleanup_old_analyzed_articles(self, days_to_keep=7):
-        """Deletes old analyzed articles (scraped_urls remain!)"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+    def mark_articles_as_analyzed(self, article_ids, results=None):
+        """Marks articles as analyzed in one transaction; returns how many were updated
 
-            cursor.execute('''
-                DELETE FROM articles 
-                WHERE processed = TRUE 
-                AND analyzed_at IS NOT NULL 
-                AND datetime(analyzed_at) < datetime('now', '-{} days')
-            '''.format(days_to_keep))
+        results: optional {article_id: sentiment result}, stored as JSON
+        """
+        results = results or {}
+        rows = [(json.dumps(results[article_id]) if results.get(article_id) else None, article_id)
+                for article_id in dict.fromkeys(article_ids)]
+        if not rows:
+            return 0
 
-            deleted_count = cursor.rowcount
-            conn.commit()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE articles
+                SET processed = TRUE,
+                    analyzed_at = CURRENT_TIMESTAMP,
+                    sentiment_result = ?
+                WHERE id = ?
+            ''', rows)
+            updated = cursor.rowcount
 
-            print(f"🧹 Deleted {deleted_count} old analyzed articles")
-            return deleted_count
+        print(f"✅ {updated} articles marked as analyzed")
+        return updated
+
+    def cleanup_old_analyzed_articles(self, days_to_keep=7, dry_run=False):
+        """Deletes old analyzed articles in short batches (scraped_urls remain!)"""
+        return SQLiteRetention(self).run(days_to_keep, dry_run=dry_run)
 
     def get_database_stats(self):
         """Returns database statistics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn:
             cursor = conn.cursor()
 
             # Total articles
@@ -264,34 +736,50 @@ class DatabaseManager:
             cursor.execute("SELECT title, scraped_at FROM articles ORDER BY scraped_at DESC LIMIT 1")
             latest_article = cursor.fetchone()
 
+            # Work queue by status
+            cursor.execute("SELECT status, COUNT(*) FROM pending_urls GROUP BY status")
+            pending_urls = dict(cursor.fetchall())
+
             return {
                 'total_articles': total_articles,
                 'unprocessed_articles': unprocessed_articles,
                 'analyzed_articles': analyzed_articles,
                 'total_scraped_urls': total_scraped_urls,
-                'latest_article': latest_article
+                'latest_article': latest_article,
+                'pending_urls': pending_urls
             }
 
-    def export_articles_to_json(self, filename="articles_export.json", processed_only=False):
-        """Exports articles to JSON file"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+    def _article_columns(self, conn):
+        """Returns the column names of the articles table"""
+        return [row[1] for row in conn.execute("PRAGMA table_info(articles)")]
+
+    def iter_articles(self, columns=None, processed_only=False, batch_size=EXPORT_BATCH_SIZE):
+        """Yields articles as dicts, newest first, reading batch_size rows at a time"""
+        with self.connection() as conn:
+            column_sql = ', '.join(select_columns(columns, self._article_columns(conn)))
 
-            query = "SELECT * FROM articles"
+            query = f"SELECT {column_sql} FROM articles"
             if processed_only:
                 query += " WHERE processed = TRUE"
             query += " ORDER BY scraped_at DESC"
 
+            cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute(query)
-            articles = [dict(row) for row in cursor.fetchall()]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
 
-            # Save to JSON file
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(articles, f, ensure_ascii=False, indent=2, default=str)
+    def export_articles_to_json(self, filename="articles_export.json", processed_only=False,
+                                columns=None, fmt=None, compress=None):
+        """Streams articles to a JSON / JSONL file (gzipped for .gz); returns the number exported"""
+        count = write_articles(self.iter_articles(columns, processed_only), filename, fmt, compress)
 
-            print(f"📤 Exported {len(articles)} articles to {filename}")
-            return len(articles)
+        print(f"📤 Exported {count} articles to {filename}")
+        return count
 
 
 # Test function
@@ -334,6 +822,7 @@ def test_database():
     print(f"   Found: {len(unprocessed)} articles")
 
     # Clean up test database
+    db.close()
     Path("test_crypto_news.db").unlink(missing_ok=True)
     print("\n✅ Database test completed successfully!")
 
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stub for offline transport and scraper tests
+Usage: python stub_server.py [--port 8765] [--latency 0.05] [--flaky 2]
+
+Serves the benchmark fixture pages (benchmarks/fixtures) under the paths of
+their CoinDesk URLs, with HTTP/1.1 keep-alive, ETag / If-None-Match (304),
+an optional artificial latency per request and optional flaky pages
+(the first N requests of every page get 503 with Retry-After: 0).
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+FIXTURES_DIR = Path(__file__).parent / 'benchmarks' / 'fixtures'
+
+
+def load_stub_pages(fixtures_dir=None):
+    """Returns {path: html bytes} for every fixture in the manifest"""
+    fixtures_dir = Path(fixtures_dir or FIXTURES_DIR)
+    with open(fixtures_dir / 'manifest.json', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    pages = {}
+    for entry in manifest:
+        body = (fixtures_dir / entry['file']).read_bytes()
+        if entry['kind'] == 'main_page':
+            pages['/'] = body
+        elif entry['kind'] == 'latest_news':
+            pages.setdefault('/latest-crypto-news', body)
+        elif entry['url']:
+            pages[urlparse(entry['url']).path] = body
+    return pages
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_GET(self):
+        pages = self.server.pages
+        path = urlparse(self.path).path
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        body = pages.get(path)
+        if body is None:
+            self._send(404, b'Not found')
+            return
+
+        with self.server.lock:
+            self.server.request_counts[path] = self.server.request_counts.get(path, 0) + 1
+            failing = self.server.request_counts[path] <= self.server.flaky
+        if failing:
+            self._send(503, b'Service unavailable', retry_after='0')
+            return
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self._send(304, b'', etag)
+        else:
+            self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None, retry_after=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        if retry_after is not None:
+            self.send_header('Retry-After', retry_after)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, latency=0.0, fixtures_dir=None, flaky=0):
+    """Starts the stub in a daemon thread; returns (server, base_url, paths)"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.pages = load_stub_pages(fixtures_dir)
+    server.latency = latency
+    server.flaky = flaky
+    server.request_counts = {}
+    server.lock = threading.Lock()
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    return server, base_url, sorted(server.pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP stub serving the fixture pages")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Artificial delay per request (seconds)')
+    parser.add_argument('--fixtures', help='Fixture directory (default: benchmarks/fixtures)')
+    parser.add_argument('--flaky', type=int, default=0, help='Answer the first N requests of every page with 503')
+    args = parser.parse_args()
+
+    server, base_url, paths = start_stub_server(args.port, args.latency, args.fixtures, args.flaky)
+    print(f"🧪 Stub server running at {base_url} ({len(paths)} pages)")
+    for path in paths:
+        print(f"   {base_url}{path}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\n⏹️ Stub server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+HTTP transports used by the scrapers to download pages.
+
+Both transports have the same small interface:
+
+    transport.fetch(url, timeout, cache=None, rate_limiter=None) -> FetchResult
+    transport.close()
+
+SyncTransport is the classic requests.Session path (fetch_with_cache).
+AsyncTransport runs an aiohttp ClientSession on a background event loop:
+keep-alive connections are pooled across calls and hosts, every host has
+its own concurrency limit and rate-limit waits are asyncio.sleep() calls,
+so concurrent fetches from the scraper threads never block each other.
+Coroutines can use fetch_async() / fetch_many_async() directly.
+
+Both retry transient failures through a RetryPolicy (retry.py).
+"""
+
+import asyncio
+import threading
+import time
+
+from config import SCRAPING_CONFIG, ASYNC_TRANSPORT_CONFIG
+from html_cache import FetchResult, fetch_with_cache
+from rate_limiter import _host_of
+from retry import get_retry_policy
+
+try:
+    import aiohttp
+
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+class SyncTransport:
+    def __init__(self, session, retry_policy=None):
+        """Wraps an existing requests.Session"""
+        self.session = session
+        self.retry_policy = retry_policy or get_retry_policy()
+
+    def fetch(self, url, timeout, cache=None, rate_limiter=None):
+        """Downloads a URL (through the HTML cache if given), retrying transient errors"""
+        return self.retry_policy.call(
+            fetch_with_cache, self.session, url, timeout,
+            cache=cache, rate_limiter=rate_limiter, description=url
+        )
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncTransport:
+    def __init__(self, headers=None, per_host_limit=None, total_limit=None, keepalive_timeout=None,
+                 retry_policy=None):
+        """Initializes the transport; the event loop and connection pool start on first use"""
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is not installed (pip install aiohttp)")
+
+        # aiohttp negotiates its own Accept-Encoding (depends on the installed decoders)
+        self.headers = {k: v for k, v in (headers or {}).items() if k.lower() != 'accept-encoding'}
+        self.per_host_limit = per_host_limit or ASYNC_TRANSPORT_CONFIG['per_host_limit']
+        self.total_limit = total_limit or ASYNC_TRANSPORT_CONFIG['total_limit']
+        self.keepalive_timeout = keepalive_timeout or ASYNC_TRANSPORT_CONFIG['keepalive_timeout']
+        self.retry_policy = retry_policy or get_retry_policy()
+
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Only touched from the event loop thread
+        self._session = None
+        self._host_semaphores = {}
+
+    def _ensure_loop(self):
+        """Starts the background event loop thread once"""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.total_limit,
+                limit_per_host=self.per_host_limit,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(headers=self.headers, connector=connector)
+        return self._session
+
+    def _host_semaphore(self, url):
+        host = _host_of(url)
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def fetch_async(self, url, timeout, cache=None, rate_limiter=None):
+        """Coroutine version of fetch(); same cache, rate-limit and retry behaviour as the sync path"""
+        return await self.retry_policy.call_async(
+            self._fetch_once, url, timeout, cache=cache, rate_limiter=rate_limiter, description=url
+        )
+
+    async def _fetch_once(self, url, timeout, cache=None, rate_limiter=None):
+        """One download attempt"""
+        entry = cache.lookup(url) if cache else None
+
+        if entry and cache.is_fresh(entry):
+            return FetchResult(url, cache.read_body(entry), from_cache=True, not_modified=True)
+
+        headers = cache.conditional_headers(entry) if entry else {}
+
+        # Wait for the rate limiter without holding a connection slot
+        if rate_limiter:
+            wait = rate_limiter.reserve(url)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        async with self._host_semaphore(url):
+            async with self._get_session().get(
+                url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if entry and response.status == 304:
+                    cache.mark_revalidated(entry, response.headers)
+                    return FetchResult(url, cache.read_body(entry), from_cache=True, not_modified=True)
+
+                response.raise_for_status()
+                body = await response.read()
+                response_headers = response.headers
+
+        if cache:
+            cache.store(url, body, response_headers)
+
+        return FetchResult(url, body, from_cache=False, not_modified=False)
+
+    async def fetch_many_async(self, urls, timeout, cache=None, rate_limiter=None):
+        """Fetches URLs concurrently; returns FetchResult or the exception for each URL, in order"""
+        return await asyncio.gather(
+            *(self.fetch_async(url, timeout, cache=cache, rate_limiter=rate_limiter) for url in urls),
+            return_exceptions=True
+        )
+
+    def fetch(self, url, timeout, cache=None, rate_limiter=None):
+        """Blocking wrapper: runs fetch_async on the background loop (safe from any thread)"""
+        future = asyncio.run_coroutine_threadsafe(
+            self.fetch_async(url, timeout, cache=cache, rate_limiter=rate_limiter), self._ensure_loop()
+        )
+        return future.result()
+
+    def fetch_many(self, urls, timeout, cache=None, rate_limiter=None):
+        """Blocking wrapper around fetch_many_async"""
+        future = asyncio.run_coroutine_threadsafe(
+            self.fetch_many_async(urls, timeout, cache=cache, rate_limiter=rate_limiter), self._ensure_loop()
+        )
+        return future.result()
+
+    def close(self):
+        """Closes the pooled connections and stops the event loop"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+            self._session = None
+
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+
+
+def create_transport(session, kind=None):
+    """Returns the transport selected by SCRAPING_CONFIG['transport'] ('sync' or 'async')"""
+    kind = kind or SCRAPING_CONFIG['transport']
+
+    if kind == 'async':
+        if AIOHTTP_AVAILABLE:
+            return AsyncTransport(headers=dict(session.headers))
+        print("⚠️ aiohttp not installed, using the sync transport")
+
+    return SyncTransport(session)
+
+
+def test_transports():
+    """Fetches the benchmark fixtures from the local stub server with both transports"""
+    import requests
+    from stub_server import start_stub_server
+
+    server, base_url, paths = start_stub_server(latency=0.05)
+    urls = [base_url + path for path in paths]
+    print(f"🧪 Stub server at {base_url} with {len(urls)} pages (50 ms latency per request)")
+
+    try:
+        session = requests.Session()
+        start = time.perf_counter()
+        sync_bodies = [SyncTransport(session).fetch(url, timeout=10).content for url in urls]
+        print(f"   Sync transport: {time.perf_counter() - start:.2f}s")
+
+        if not AIOHTTP_AVAILABLE:
+            print("⚠️ aiohttp not installed, async transport skipped")
+            return
+
+        transport = AsyncTransport()
+        start = time.perf_counter()
+        results = transport.fetch_many(urls, timeout=10)
+        print(f"   Async transport: {time.perf_counter() - start:.2f}s")
+        transport.close()
+
+        errors = [r for r in results if isinstance(r, Exception)]
+        same = all(not isinstance(r, Exception) and r.content == body for r, body in zip(results, sync_bodies))
+        print("✅ Same content from both transports" if same and not errors else f"❌ Mismatch ({errors[:3]})")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_transports()
@@ -0,0 +1,105 @@
+"""
+Single-pass classification of CoinDesk hrefs found on listing pages.
+
+The include (NEWS_URL_PATTERNS) and exclude (EXCLUDE_PATTERNS) rules from
+config.py are compiled once into one anchored regex. The excludes are
+negative lookaheads and the category and date are optional lookaheads with
+named groups, so one match() call rejects an href or returns its category
+and date.
+"""
+
+import re
+from collections import namedtuple
+from datetime import date
+
+from config import NEWS_URL_PATTERNS, EXCLUDE_PATTERNS
+
+# category: 'markets', 'policy', ... or None; date: datetime.date from /YYYY/MM/DD/ or None
+UrlInfo = namedtuple('UrlInfo', ['category', 'date', 'year'])
+
+
+# Years accepted without /MM/DD/ (as the old scraper validators did); full dates are accepted for any year
+YEAR_ONLY_URL_YEARS = ('2024', '2025')
+
+
+def _alternation(patterns):
+    # Longest first so that overlapping literals match the most specific one
+    return '|'.join(re.escape(p) for p in sorted(patterns, key=len, reverse=True))
+
+
+def _segment_alternation(patterns):
+    # '/terms' matches the segment '/terms', '/terms/...' or '/terms?...', never a slug like '/terms-of-...'
+    return '|'.join(re.escape(p) + ('' if p.endswith('/') else r'(?=[/?#]|$)')
+                    for p in sorted(patterns, key=len, reverse=True))
+
+
+def _build_url_regex(categories, excludes):
+    """Compiles the include/exclude rules into one anchored regex"""
+    # '/path' excludes match a whole path segment anywhere, the others ('#', 'mailto:', 'tel:') only at the start
+    path_excludes = [p for p in excludes if p.startswith('/')]
+    prefix_excludes = [p for p in excludes if not p.startswith('/')]
+
+    parts = [
+        r'^(?!/?$)',  # empty href or the home page
+        r'(?!http(?!.*coindesk\.com))',  # external links
+    ]
+    if prefix_excludes:
+        parts.append(f'(?!{_alternation(prefix_excludes)})')
+    if path_excludes:
+        parts.append(f'(?!.*(?:{_segment_alternation(path_excludes)}))')
+
+    parts.append(f'(?:(?=.*?(?P<category>{_alternation(categories)})))?')
+    parts.append(r'(?:(?=.*?/(?P<year>20\d{2})/(?P<month>\d{2})/(?P<day>\d{2})/))?')
+    parts.append(f'(?:(?=.*?/(?P<year_only>{_alternation(YEAR_ONLY_URL_YEARS)})/))?')
+
+    return re.compile(''.join(parts))
+
+
+URL_REGEX = _build_url_regex(NEWS_URL_PATTERNS, EXCLUDE_PATTERNS)
+
+
+def classify_url(href):
+    """Returns UrlInfo for an href, or None if it is excluded"""
+    if not href:
+        return None
+
+    match = URL_REGEX.match(href)
+    if match is None:
+        return None
+
+    year = match.group('year') or match.group('year_only')
+    article_date = None
+    if match.group('day'):
+        try:
+            article_date = date(int(year), int(match.group('month')), int(match.group('day')))
+        except ValueError:
+            pass
+
+    category = match.group('category')
+    return UrlInfo(category.strip('/') if category else None, article_date, int(year) if year else None)
+
+
+def is_article_url(href):
+    """Checks if an href looks like a news article (has a date or a news category)"""
+    match = URL_REGEX.match(href) if href else None
+    return match is not None and (match.group('year') is not None or match.group('year_only') is not None
+                                  or match.group('category') is not None)
+
+
+URL_DATE_REGEX = re.compile(r'/(20\d{2})/(\d{2})/(\d{2})/')
+ISO_DATE_REGEX = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+
+def published_on_for(url, published_date=None, fallback=None):
+    """Returns the publish date of an article: date in the URL, else the page's date, else fallback (today)
+
+    published_date: date/datetime or the string stored in articles.published_date
+    """
+    for match in (URL_DATE_REGEX.search(url or ''), ISO_DATE_REGEX.match(str(published_date or ''))):
+        if match:
+            try:
+                return date(*map(int, match.groups()))
+            except ValueError:
+                pass
+
+    return fallback or date.today()